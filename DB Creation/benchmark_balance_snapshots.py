@@ -0,0 +1,84 @@
+import os
+import sys
+import time
+import pandas as pd
+from sqlalchemy import create_engine
+
+from loyalty_snapshots import balance_as_of, balances_as_of, day_end
+
+DB_PATH = "retail.db"
+SAMPLE_CUSTOMERS = 200
+
+
+def scan_balance(conn, customer_id: str, as_of) -> int:
+    total = conn.exec_driver_sql(
+        """
+        SELECT SUM(points_earned - points_redeemed + bonus_points) FROM loyalty_transactions
+        WHERE customer_id = ? AND event_date < ?
+        """,
+        (customer_id, day_end(as_of))
+    ).scalar()
+    return int(total or 0)
+
+
+def scan_balances(conn, as_of) -> pd.DataFrame:
+    return pd.read_sql(
+        """
+        SELECT customer_id, SUM(points_earned - points_redeemed + bonus_points) AS balance
+        FROM loyalty_transactions
+        WHERE event_date < ?
+        GROUP BY customer_id
+        """,
+        conn, params=(day_end(as_of),)
+    )
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    db_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), DB_PATH)
+    engine = create_engine(f"sqlite:///{db_path}")
+
+    with engine.connect() as conn:
+        first, last = conn.exec_driver_sql(
+            "SELECT MIN(event_date), MAX(event_date) FROM loyalty_transactions"
+        ).fetchone()
+        dates = pd.date_range(pd.Timestamp(first) + pd.Timedelta(days=14), last, freq="MS") + pd.Timedelta(days=14)
+        customers = [row[0] for row in conn.exec_driver_sql(
+            "SELECT customer_id FROM customer_master ORDER BY random() LIMIT ?", (SAMPLE_CUSTOMERS,)
+        )]
+        events = conn.exec_driver_sql("SELECT COUNT(*) FROM loyalty_transactions").scalar()
+
+        print("=" * 80)
+        print("POINT-IN-TIME LOYALTY BALANCES: SNAPSHOTS vs FULL SCAN")
+        print("=" * 80)
+        print(f"Ledger events: {events:,}, as-of dates: {len(dates)}, sampled customers: {len(customers)}\n")
+
+        point_scan = point_snap = bulk_scan = bulk_snap = 0.0
+        point_same = bulk_same = True
+        for as_of in dates:
+            for customer_id in customers:
+                expected, secs = timed(scan_balance, conn, customer_id, as_of)
+                point_scan += secs
+                result, secs = timed(balance_as_of, conn, customer_id, as_of)
+                point_snap += secs
+                point_same &= expected == result
+
+            expected, secs = timed(scan_balances, conn, as_of)
+            bulk_scan += secs
+            result, secs = timed(balances_as_of, conn, as_of)
+            bulk_snap += secs
+            expected = expected.set_index("customer_id")["balance"].sort_index()
+            result = result.set_index("customer_id")["balance"].sort_index()
+            bulk_same &= expected.astype(int).equals(result.astype(int))
+
+    point_queries = len(dates) * len(customers)
+    print(f"{'Query':<22} {'Full scan (ms)':>15} {'Snapshot (ms)':>14} {'Speedup':>9} {'Identical':>10}")
+    print(f"{'one customer':<22} {point_scan / point_queries * 1000:>15.3f} {point_snap / point_queries * 1000:>14.3f} "
+          f"{point_scan / point_snap:>8.1f}x {str(point_same):>10}")
+    print(f"{'all customers':<22} {bulk_scan / len(dates) * 1000:>15.1f} {bulk_snap / len(dates) * 1000:>14.1f} "
+          f"{bulk_scan / bulk_snap:>8.1f}x {str(bulk_same):>10}")
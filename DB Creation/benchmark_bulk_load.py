@@ -0,0 +1,55 @@
+import os
+import sys
+import tempfile
+import time
+from sqlalchemy import create_engine
+
+from bulk_loader import bulk_load
+from db_creation_kritika import (
+    CSV_PATH, INDEXES,
+    build_customer_analytics, build_customer_master, build_loyalty_transactions,
+    build_sales_transactions, create_schema, load_good_data, prepare_raw,
+)
+from dimensions import build_dimensions, encode_facts
+
+if __name__ == "__main__":
+    raw = prepare_raw(load_good_data(sys.argv[1] if len(sys.argv) > 1 else CSV_PATH))
+    sales = build_sales_transactions(raw)
+    dimensions = build_dimensions(sales)
+    tables = {
+        "customer_master": build_customer_master(raw),
+        **dimensions,
+        "sales_transactions": encode_facts(sales, dimensions),
+        "customer_analytics": build_customer_analytics(sales),
+        "loyalty_transactions": build_loyalty_transactions(sales),
+    }
+    total_rows = sum(len(df) for df in tables.values())
+
+    print("=" * 80)
+    print("SQLITE LOAD BENCHMARK")
+    print("=" * 80)
+    print(f"Rows across {len(tables)} tables: {total_rows:,}\n")
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        engine = create_engine(f"sqlite:///{os.path.join(out_dir, 'to_sql.db')}")
+        create_schema(engine)
+        start = time.perf_counter()
+        for name, df in tables.items():
+            df.to_sql(name, engine, if_exists="append", index=False)
+        with engine.begin() as conn:
+            for stmt in INDEXES:
+                conn.exec_driver_sql(stmt)
+        to_sql_secs = time.perf_counter() - start
+        engine.dispose()
+
+        print("bulk_load:")
+        engine = create_engine(f"sqlite:///{os.path.join(out_dir, 'bulk.db')}")
+        create_schema(engine)
+        start = time.perf_counter()
+        bulk_load(engine, tables, indexes=INDEXES)
+        bulk_secs = time.perf_counter() - start
+
+    print(f"\n{'Loader':<12} {'Seconds':>10} {'Rows/s':>12}")
+    print(f"{'to_sql':<12} {to_sql_secs:>10.2f} {total_rows/to_sql_secs:>12,.0f}")
+    print(f"{'bulk_load':<12} {bulk_secs:>10.2f} {total_rows/bulk_secs:>12,.0f}")
+    print(f"Speedup: {to_sql_secs/bulk_secs:.1f}x")
@@ -0,0 +1,113 @@
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from customer_360 import PARTS, Customer360
+
+DB_PATH = "retail.db"
+LOOKUPS = 20_000
+THREADS = 4
+ZIPF_EXPONENT = 1.2
+
+
+# Lookups skewed towards a few popular customers, the way support agents and
+# dashboards hit the same accounts over and over.
+def zipf_customers(customer_ids: list, n: int, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    ranks = rng.zipf(ZIPF_EXPONENT, size=n * 2)
+    ranks = ranks[ranks <= len(customer_ids)][:n] - 1
+    order = rng.permutation(len(customer_ids))
+    return [customer_ids[i] for i in order[ranks]]
+
+
+# The access pattern before this API: a new connection per request, every
+# statement compiled again, nothing cached.
+def connect_per_lookup(db_path: str, recent: int):
+    def lookup(customer_id):
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
+        view = {}
+        for part, sql in PARTS.items():
+            params = (customer_id, recent) if part == "transactions" else (customer_id,)
+            view[part] = [dict(row) for row in conn.execute(sql, params)]
+        conn.close()
+        return view
+    return lookup
+
+
+def run(lookup, customer_ids: list) -> dict:
+    def timed(customer_id):
+        start = time.perf_counter()
+        lookup(customer_id)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(THREADS) as pool:
+        latency = np.array(list(pool.map(timed, customer_ids))) * 1000
+    secs = time.perf_counter() - start
+    return {"p50": np.percentile(latency, 50), "p95": np.percentile(latency, 95), "per_sec": len(customer_ids) / secs}
+
+
+def check_invalidation(db_path: str, customer_id: str) -> bool:
+    api = Customer360(db_path)
+    before = api.loyalty_balance(customer_id)
+    writer = sqlite3.connect(db_path)
+    writer.execute(
+        "UPDATE customer_master SET total_loyalty_points = total_loyalty_points + 1 WHERE customer_id = ?",
+        (customer_id,)
+    )
+    writer.execute("INSERT INTO customer_change_log (customer_id) VALUES (?)", (customer_id,))
+    writer.commit()
+    after = api.loyalty_balance(customer_id)
+    writer.close()
+    api.close()
+    return after == before + 1
+
+
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), DB_PATH)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "retail.db")
+        shutil.copyfile(source, db_path)
+        with sqlite3.connect(db_path) as conn:
+            customer_ids = [row[0] for row in conn.execute("SELECT customer_id FROM customer_master")]
+        workload = zipf_customers(customer_ids, LOOKUPS)
+
+        print("=" * 80)
+        print("CUSTOMER 360 LOOKUPS")
+        print("=" * 80)
+        print(f"{LOOKUPS:,} lookups over {len(set(workload)):,} of {len(customer_ids):,} customers, "
+              f"{THREADS} threads, Zipf exponent {ZIPF_EXPONENT}\n")
+
+        uncached = Customer360(db_path, max_size=0)
+        cached = Customer360(db_path)
+        runs = {
+            "connect per lookup": run(connect_per_lookup(db_path, uncached.recent), workload),
+            "reused connections": run(uncached.customer_360, workload),
+            "reused + LRU cache": run(cached.customer_360, workload),
+        }
+        base = runs["connect per lookup"]["per_sec"]
+        print(f"{'Access path':<22} {'p50 (ms)':>9} {'p95 (ms)':>9} {'Lookups/s':>10} {'Speedup':>8}")
+        for name, result in runs.items():
+            print(f"{name:<22} {result['p50']:>9.3f} {result['p95']:>9.3f} {result['per_sec']:>10,.0f} "
+                  f"{result['per_sec'] / base:>7.1f}x")
+
+        stats = cached.stats()
+        print(f"\nCache: {stats['hit_rate']:.1%} hit rate, {stats['entries']:,} entries, "
+              f"{stats['evictions']:,} evictions")
+        for kind, latency in stats["latency"].items():
+            if latency["count"]:
+                print(f"   {kind:<5} {latency['count']:>7,} lookups  mean {latency['mean_ms']:.3f} ms  "
+                      f"p95 {latency['p95_ms']:.3f} ms")
+        same = all(cached.customer_360(c) == uncached.customer_360(c) for c in workload[:200])
+        print(f"Cached views match the database: {same}")
+        print(f"Write + change log invalidates the cached view: {check_invalidation(db_path, workload[0])}")
+        uncached.close()
+        cached.close()
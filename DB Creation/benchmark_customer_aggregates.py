@@ -0,0 +1,49 @@
+import sys
+import time
+import pandas as pd
+
+from customer_aggregates import aggregate_transactions, derive_analytics, merge_state
+from db_creation_kritika import CSV_PATH, build_sales_transactions, load_good_data, prepare_raw
+
+BATCH_DAYS = 30
+
+if __name__ == "__main__":
+    raw = prepare_raw(load_good_data(sys.argv[1] if len(sys.argv) > 1 else CSV_PATH))
+    sales = build_sales_transactions(raw).sort_values("date")
+    cutoff = sales["date"].max() - pd.Timedelta(days=BATCH_DAYS)
+    history = sales[sales["date"] <= cutoff]
+    batches = [batch for _, batch in sales[sales["date"] > cutoff].groupby("date")]
+
+    print("=" * 80)
+    print("CUSTOMER ANALYTICS: FULL REBUILD vs INCREMENTAL AGGREGATES")
+    print("=" * 80)
+    print(f"History rows: {len(history):,}, daily batches: {len(batches)} ({sum(map(len, batches)):,} rows)\n")
+
+    seen = history
+    full_secs = 0.0
+    for batch in batches:
+        seen = pd.concat([seen, batch])
+        start = time.perf_counter()
+        expected = derive_analytics(aggregate_transactions(seen), seen["date"].max())
+        full_secs += time.perf_counter() - start
+
+    state = aggregate_transactions(history)
+    incremental_secs = 0.0
+    for batch in batches:
+        start = time.perf_counter()
+        state = merge_state(state, aggregate_transactions(batch))
+        result = derive_analytics(state, batch["date"].max())
+        incremental_secs += time.perf_counter() - start
+
+    expected = expected.sort_values("customer_id").reset_index(drop=True)
+    result = result.sort_values("customer_id").reset_index(drop=True)
+    try:
+        pd.testing.assert_frame_equal(expected, result, check_dtype=False, rtol=1e-9)
+        identical = True
+    except AssertionError:
+        identical = False
+
+    print(f"{'Method':<14} {'Total (s)':>10} {'Per batch (ms)':>15}")
+    print(f"{'full rebuild':<14} {full_secs:>10.2f} {full_secs / len(batches) * 1000:>15.1f}")
+    print(f"{'incremental':<14} {incremental_secs:>10.2f} {incremental_secs / len(batches) * 1000:>15.1f}")
+    print(f"Speedup: {full_secs / incremental_secs:.1f}x, matches full rebuild: {identical}")
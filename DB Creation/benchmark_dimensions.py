@@ -0,0 +1,147 @@
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+from benchmark_queries import normalized
+
+DB_PATH = "retail.db"
+REPEATS = 10
+
+# sales_transactions as it was before dictionary encoding: the product and
+# lookup text repeated on every row, with the same secondary indexes on text.
+TEXT_COLUMNS = """
+    transaction_id, customer_id, date, year, month, time, total_purchases, amount, total_amount,
+    product_category, product_brand, product_type, shipping_method, payment_method, order_status,
+    ratings, feedback, ingestion_timestamp, data_quality_flag, reject_reason
+"""
+TEXT_LAYOUT = [
+    f"CREATE TABLE sales_text AS SELECT {TEXT_COLUMNS} FROM sales_transactions_wide",
+    "DROP VIEW sales_transactions_wide",
+    "DROP TABLE sales_transactions",
+    "ALTER TABLE sales_text RENAME TO sales_transactions",
+    "CREATE INDEX idx_sales_customer_date ON sales_transactions(customer_id, date)",
+    "CREATE INDEX idx_sales_period_category ON sales_transactions(year, month, product_category, total_amount)",
+    "CREATE INDEX idx_sales_status_date ON sales_transactions(order_status, date, total_amount)",
+]
+
+# Typical rollups, written once against the text columns and once against the
+# integer keys, aggregating on the key before joining to the dimension.
+ROLLUPS = {
+    "category_by_month": (
+        """
+        SELECT month, product_category, COUNT(*), SUM(total_amount)
+        FROM sales_transactions WHERE year = :year
+        GROUP BY month, product_category
+        """,
+        """
+        SELECT s.month, p.product_category, SUM(s.n), SUM(s.revenue)
+        FROM (
+            SELECT month, product_key, COUNT(*) AS n, SUM(total_amount) AS revenue
+            FROM sales_transactions WHERE year = :year
+            GROUP BY month, product_key
+        ) s
+        JOIN product_master p ON p.product_key = s.product_key
+        GROUP BY s.month, p.product_category
+        """,
+    ),
+    "brand_revenue": (
+        """
+        SELECT product_brand, COUNT(*), SUM(total_amount)
+        FROM sales_transactions
+        GROUP BY product_brand
+        """,
+        """
+        SELECT p.product_brand, SUM(s.n), SUM(s.revenue)
+        FROM (
+            SELECT product_key, COUNT(*) AS n, SUM(total_amount) AS revenue
+            FROM sales_transactions GROUP BY product_key
+        ) s
+        JOIN product_master p ON p.product_key = s.product_key
+        GROUP BY p.product_brand
+        """,
+    ),
+    "category_brand_status": (
+        """
+        SELECT product_category, product_brand, order_status, COUNT(*), SUM(total_amount)
+        FROM sales_transactions
+        GROUP BY product_category, product_brand, order_status
+        """,
+        """
+        SELECT p.product_category, p.product_brand, o.order_status, SUM(s.n), SUM(s.revenue)
+        FROM (
+            SELECT product_key, order_status_id, COUNT(*) AS n, SUM(total_amount) AS revenue
+            FROM sales_transactions GROUP BY product_key, order_status_id
+        ) s
+        JOIN product_master p ON p.product_key = s.product_key
+        JOIN order_statuses o ON o.order_status_id = s.order_status_id
+        GROUP BY p.product_category, p.product_brand, o.order_status
+        """,
+    ),
+}
+
+
+def sales_bytes(conn) -> int:
+    try:
+        return conn.execute(
+            """
+            SELECT SUM(pgsize) FROM dbstat
+            WHERE name = 'sales_transactions' OR name LIKE 'idx_sales_%'
+            """
+        ).fetchone()[0]
+    except sqlite3.OperationalError:
+        return None
+
+
+def timed(conn, sql: str, params: dict):
+    rows = conn.execute(sql, params).fetchall()
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        conn.execute(sql, params).fetchall()
+    return rows, (time.perf_counter() - start) / REPEATS * 1000
+
+
+if __name__ == "__main__":
+    db_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), DB_PATH)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        encoded_path = os.path.join(tmp, "encoded.db")
+        text_path = os.path.join(tmp, "text.db")
+        shutil.copyfile(db_path, encoded_path)
+        shutil.copyfile(db_path, text_path)
+
+        text = sqlite3.connect(text_path)
+        for stmt in TEXT_LAYOUT:
+            text.execute(stmt)
+        text.commit()
+        encoded = sqlite3.connect(encoded_path)
+        for conn in (text, encoded):
+            conn.execute("VACUUM")
+            conn.execute("ANALYZE")
+
+        year = encoded.execute("SELECT MAX(year) FROM sales_transactions").fetchone()[0]
+        rows = encoded.execute("SELECT COUNT(*) FROM sales_transactions").fetchone()[0]
+
+        print("=" * 80)
+        print("SALES FACTS: REPEATED TEXT vs DICTIONARY-ENCODED KEYS")
+        print("=" * 80)
+        print(f"Database: {db_path} ({rows:,} sales rows)\n")
+
+        print(f"{'Layout':<10} {'Database (MB)':>14} {'Sales + indexes (MB)':>21}")
+        for name, conn, path in (("text", text, text_path), ("encoded", encoded, encoded_path)):
+            size = sales_bytes(conn)
+            size = f"{size / 1024**2:>21.1f}" if size is not None else f"{'n/a':>21}"
+            print(f"{name:<10} {os.path.getsize(path) / 1024**2:>14.1f} {size}")
+        print(f"Database size: {os.path.getsize(encoded_path) / os.path.getsize(text_path):.0%} of the text layout")
+
+        print(f"\n{'Rollup':<24} {'Text (ms)':>10} {'Encoded (ms)':>13} {'Speedup':>9} {'Same rows':>10}")
+        for name, (text_sql, encoded_sql) in ROLLUPS.items():
+            expected, text_ms = timed(text, text_sql, {"year": year})
+            result, encoded_ms = timed(encoded, encoded_sql, {"year": year})
+            same = normalized(expected) == normalized(result)
+            print(f"{name:<24} {text_ms:>10.2f} {encoded_ms:>13.2f} {text_ms / encoded_ms:>8.1f}x {str(same):>10}")
+
+        text.close()
+        encoded.close()
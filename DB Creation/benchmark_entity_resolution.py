@@ -0,0 +1,86 @@
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine
+
+from entity_resolution import print_resolution_report, resolve_customers
+
+DB_PATH = "retail.db"
+TARGET_CUSTOMERS = 2_000_000
+DUPLICATE_RATE = 0.1
+
+
+def pairs(sizes: pd.Series) -> int:
+    return int((sizes * (sizes - 1) // 2).sum())
+
+
+def typo(names: pd.Series, rng) -> pd.Series:
+    def swap(name):
+        i = rng.integers(1, len(name) - 2)
+        return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+    return names.map(lambda name: swap(name) if len(name) > 4 else name)
+
+
+# Every synthetic person gets their own phone, email, address and zipcode, and
+# a name drawn from the real customers. DUPLICATE_RATE of them appear again
+# under a second customer id with a typo or title in the name, a reformatted
+# email and some fields missing.
+def scale_up(cm: pd.DataFrame, target: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    people = int(target / (1 + DUPLICATE_RATE))
+    picked = cm.iloc[rng.integers(len(cm), size=people)].reset_index(drop=True)
+    entity = np.arange(people)
+    people_df = pd.DataFrame({
+        "entity": entity,
+        "name": picked["name"].to_numpy(),
+        "email": pd.Series(picked["email"].str.split("@").str[0].to_numpy()) + "." + pd.Series(entity).astype(str) + "@gmail.com",
+        "phone": rng.integers(2_000_000_000, 9_999_999_999, size=people),
+        "address": pd.Series(rng.integers(1, 99_999, size=people)).astype(str) + " " + picked["address"].str.split(" ", n=1).str[1].to_numpy(),
+        "zipcode": pd.Series(rng.integers(1_000, 99_999, size=people)).astype(str),
+    })
+
+    dups = people_df.sample(frac=DUPLICATE_RATE, random_state=seed).reset_index(drop=True)
+    titled = rng.random(len(dups)) < 0.5
+    dups.loc[titled, "name"] = "Mr. " + dups.loc[titled, "name"]
+    dups.loc[~titled, "name"] = typo(dups.loc[~titled, "name"], rng)
+    dups["email"] = dups["email"].str.upper()
+    for col in ["email", "phone", "address"]:
+        dups.loc[rng.random(len(dups)) < 0.2, col] = None
+
+    customers = pd.concat([people_df, dups], ignore_index=True)
+    customers = customers.sample(frac=1, random_state=seed).reset_index(drop=True)
+    customers["customer_id"] = pd.Series(rng.permutation(len(customers)) + 1).astype(str)
+    customers["phone"] = customers["phone"].astype("Int64")
+    return customers
+
+
+if __name__ == "__main__":
+    db_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), DB_PATH)
+    target = int(sys.argv[2]) if len(sys.argv) > 2 else TARGET_CUSTOMERS
+    engine = create_engine(f"sqlite:///{db_path}")
+    with engine.connect() as conn:
+        cm = pd.read_sql("SELECT name, email, address FROM customer_master", conn).dropna()
+    customers = scale_up(cm, target)
+
+    print("=" * 80)
+    print("CUSTOMER ENTITY RESOLUTION WITH BLOCKING")
+    print("=" * 80)
+    print(f"Customer ids: {len(customers):,} for {customers['entity'].nunique():,} people "
+          f"(names drawn from {len(cm):,} real customers)\n")
+
+    start = time.perf_counter()
+    master, report = resolve_customers(customers)
+    secs = time.perf_counter() - start
+    print_resolution_report(report)
+
+    customers["master"] = master
+    predicted = pairs(customers.groupby("master").size())
+    correct = pairs(customers.groupby(["master", "entity"]).size())
+    actual = pairs(customers.groupby("entity").size())
+    all_pairs = len(customers) * (len(customers) - 1) // 2
+    print(f"\nPairs scored: {report.attrs['candidate_pairs']:,} of {all_pairs:,} possible "
+          f"({report.attrs['candidate_pairs'] / all_pairs:.2e})")
+    print(f"Precision: {correct / max(predicted, 1):.2%}   Recall: {correct / max(actual, 1):.2%}")
+    print(f"Total time: {secs:.1f}s ({len(customers) / secs:,.0f} customers/s)")
@@ -0,0 +1,163 @@
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+DB_PATH = "retail.db"
+REPEATS = 20
+
+# Access patterns the secondary indexes in db_creation_kritika.INDEXES are
+# built for, with the index each plan is expected to use.
+QUERIES = {
+    "customer_history": (
+        """
+        SELECT s.transaction_id, s.date, p.product_category, s.total_amount, o.order_status
+        FROM sales_transactions s
+        JOIN product_master p ON p.product_key = s.product_key
+        JOIN order_statuses o ON o.order_status_id = s.order_status_id
+        WHERE s.customer_id = :customer_id AND s.date >= :since
+        ORDER BY s.date
+        """,
+        "idx_sales_customer_date",
+    ),
+    "balance_at_date": (
+        """
+        SELECT balance_after
+        FROM loyalty_transactions
+        WHERE customer_id = :customer_id AND event_date <= :as_of
+        ORDER BY event_date DESC, transaction_id DESC
+        LIMIT 1
+        """,
+        "idx_loyalty_customer_date",
+    ),
+    "category_month_rollup": (
+        """
+        SELECT s.month, p.product_category, SUM(s.orders) AS orders, SUM(s.revenue) AS revenue
+        FROM (
+            SELECT month, product_key, COUNT(*) AS orders, SUM(total_amount) AS revenue
+            FROM sales_transactions
+            WHERE year = :year
+            GROUP BY month, product_key
+        ) s
+        JOIN product_master p ON p.product_key = s.product_key
+        GROUP BY s.month, p.product_category
+        """,
+        "idx_sales_period_category",
+    ),
+    "order_status_dashboard": (
+        """
+        SELECT o.order_status, COUNT(*) AS orders, SUM(s.total_amount) AS revenue
+        FROM sales_transactions s
+        JOIN order_statuses o ON o.order_status_id = s.order_status_id
+        WHERE s.date >= :since
+        GROUP BY o.order_status
+        """,
+        "idx_sales_status_date",
+    ),
+    "master_customer_ids": (
+        """
+        SELECT customer_id
+        FROM customer_master
+        WHERE master_customer_id = (
+            SELECT master_customer_id FROM customer_master WHERE customer_id = :customer_id
+        )
+        """,
+        "idx_customer_master_key",
+    ),
+    "pending_orders": (
+        """
+        SELECT s.transaction_id, s.customer_id, s.date, s.total_amount
+        FROM sales_transactions s
+        JOIN order_statuses o ON o.order_status_id = s.order_status_id
+        WHERE o.order_status = 'Pending' AND s.date >= :since
+        ORDER BY s.date
+        """,
+        "idx_sales_status_date",
+    ),
+}
+
+
+def query_params(conn) -> dict:
+    max_date, year = conn.execute("SELECT MAX(date), MAX(year) FROM sales_transactions").fetchone()
+    since = conn.execute(
+        "SELECT date(MAX(date), '-30 days') FROM sales_transactions"
+    ).fetchone()[0]
+    customer_id = conn.execute(
+        "SELECT customer_id FROM sales_transactions WHERE date >= ? "
+        "GROUP BY customer_id ORDER BY COUNT(*) DESC LIMIT 1",
+        (since,)
+    ).fetchone()[0]
+    return {"customer_id": customer_id, "since": since, "as_of": max_date, "year": year}
+
+
+# Sums are compared to 12 significant digits: plans that join in a different
+# order add the same values in a different order.
+def normalized(rows: list) -> list:
+    return sorted(
+        (tuple(float(f"{value:.12g}") if isinstance(value, float) else value for value in row) for row in rows),
+        key=repr
+    )
+
+
+def query_plan(conn, sql: str, params: dict) -> list:
+    return [row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+
+def time_query(conn, sql: str, params: dict, repeats: int = REPEATS):
+    rows = conn.execute(sql, params).fetchall()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        conn.execute(sql, params).fetchall()
+    return rows, (time.perf_counter() - start) / repeats
+
+
+def drop_secondary_indexes(conn) -> list:
+    names = [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL"
+    )]
+    for name in names:
+        conn.execute(f"DROP INDEX {name}")
+    conn.execute("ANALYZE")
+    return names
+
+
+if __name__ == "__main__":
+    db_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), DB_PATH)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        bare_path = os.path.join(tmp_dir, "no_indexes.db")
+        shutil.copyfile(db_path, bare_path)
+        indexed = sqlite3.connect(db_path)
+        bare = sqlite3.connect(bare_path)
+        dropped = drop_secondary_indexes(bare)
+        params = query_params(indexed)
+
+        print("=" * 80)
+        print("QUERY BENCHMARK")
+        print("=" * 80)
+        print(f"Database: {db_path}")
+        print(f"Secondary indexes: {', '.join(dropped) or 'none'}")
+        print(f"Parameters: {params}\n")
+
+        results = []
+        for name, (sql, expected_index) in QUERIES.items():
+            plan = query_plan(indexed, sql, params)
+            uses_index = any(expected_index in step for step in plan)
+            rows, indexed_secs = time_query(indexed, sql, params)
+            bare_rows, bare_secs = time_query(bare, sql, params)
+            results.append((name, len(rows), bare_secs, indexed_secs, normalized(rows) == normalized(bare_rows)))
+
+            print(f"{name}")
+            print(f"  without indexes: {' | '.join(query_plan(bare, sql, params))}")
+            print(f"  with indexes:    {' | '.join(plan)}")
+            if not uses_index:
+                print(f"  ⚠️  expected {expected_index}")
+
+        print(f"\n{'Query':<24} {'Rows':>8} {'No index (ms)':>14} {'Indexed (ms)':>13} {'Speedup':>9} {'Same rows':>10}")
+        for name, n_rows, bare_secs, indexed_secs, same in results:
+            print(f"{name:<24} {n_rows:>8,} {bare_secs*1000:>14.3f} {indexed_secs*1000:>13.3f} "
+                  f"{bare_secs/indexed_secs:>8.1f}x {str(same):>10}")
+        indexed.close()
+        bare.close()
@@ -0,0 +1,65 @@
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine
+
+from rfm_scoring import (
+    RFM_METRICS, SKETCH_K, edge_error_report, merge_sketches, rfm_edges, score_rfm, sketch_rfm,
+)
+
+DB_PATH = "retail.db"
+TARGET_CUSTOMERS = 2_000_000
+PARTITIONS = 16
+
+
+def scale_up(analytics: pd.DataFrame, target: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    picked = analytics.iloc[rng.integers(len(analytics), size=target)].reset_index(drop=True)
+    picked["customer_id"] = np.arange(target)
+    picked["recency"] = (picked["recency"] + rng.integers(-3, 4, size=target)).clip(lower=0)
+    picked["frequency"] = (picked["frequency"] + rng.integers(-1, 2, size=target)).clip(lower=1)
+    picked["monetary"] = picked["monetary"] * rng.uniform(0.9, 1.1, size=target)
+    return picked
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    db_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), DB_PATH)
+    target = int(sys.argv[2]) if len(sys.argv) > 2 else TARGET_CUSTOMERS
+    engine = create_engine(f"sqlite:///{db_path}")
+    with engine.connect() as conn:
+        analytics = pd.read_sql("SELECT customer_id, recency, frequency, monetary FROM customer_analytics", conn)
+    customers = scale_up(analytics, target)
+
+    print("=" * 80)
+    print("RFM QUINTILE EDGES: EXACT vs MERGED QUANTILE SKETCHES")
+    print("=" * 80)
+    print(f"Customers: {len(customers):,} (scaled from {len(analytics):,}), partitions: {PARTITIONS}, k = {SKETCH_K}\n")
+
+    exact, exact_secs = timed(rfm_edges, customers, "exact")
+    bounds = np.linspace(0, len(customers), PARTITIONS + 1).astype(int)
+    partitions = [customers.iloc[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+    parts, sketch_secs = timed(lambda: [sketch_rfm(part) for part in partitions])
+    merged, merge_secs = timed(merge_sketches, parts)
+    sketched, query_secs = timed(rfm_edges, customers, "sketch", merged)
+
+    report = edge_error_report(customers, sketched, exact)
+    print(report.to_string(index=False, float_format=lambda v: f"{v:,.4f}"))
+
+    exact_scores = score_rfm(customers[list(RFM_METRICS)].copy(), exact)
+    sketch_scores = score_rfm(customers[list(RFM_METRICS)].copy(), sketched)
+    kept = sum(merged[metric].size for metric in RFM_METRICS)
+
+    print(f"\nMax rank error: {report['rank_error'].max():.4%}")
+    print(f"Customers with a different rfm_score: {(exact_scores['rfm_score'] != sketch_scores['rfm_score']).mean():.4%}")
+    print(f"Customers with a different segment: {(exact_scores['segment'] != sketch_scores['segment']).mean():.4%}")
+    print(f"Sketch items kept: {kept:,} for {3 * len(customers):,} values")
+    print(f"Exact edges: {exact_secs:.2f}s, sketches: {sketch_secs:.2f}s build + {merge_secs * 1000:.1f}ms merge "
+          f"+ {query_secs * 1000:.1f}ms query")
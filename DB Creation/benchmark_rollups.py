@@ -0,0 +1,57 @@
+import os
+import sys
+import time
+import numpy as np
+from sqlalchemy import create_engine
+
+from rollups import rollup_query
+
+DB_PATH = "retail.db"
+REPEATS = 10
+
+# Dashboard tiles: group-by dimensions and equality filters. The last one has
+# no rollup with both country and brand, so it stays on the base tables.
+DASHBOARD = {
+    "revenue_by_month": (["year", "month"], {}),
+    "country_by_month": (["year", "month", "country"], {}),
+    "segment_by_status": (["customer_segment", "order_status"], {}),
+    "category_by_country": (["country", "product_category"], {}),
+    "brands_in_category": (["product_brand"], {"product_category": "Electronics"}),
+    "delivered_by_month": (["year", "month"], {"order_status": "Delivered"}),
+    "brand_by_country": (["country", "product_brand"], {}),
+}
+
+
+def timed(conn, group_by: list, filters: dict, source: str):
+    result = rollup_query(conn, group_by, filters, source)
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        rollup_query(conn, group_by, filters, source)
+    return result, (time.perf_counter() - start) / REPEATS * 1000
+
+
+def same_rows(a, b) -> bool:
+    if a.shape != b.shape:
+        return False
+    keys = [c for c in a.columns if c not in ("revenue", "avg_rating")]
+    a, b = a.sort_values(keys).reset_index(drop=True), b.sort_values(keys).reset_index(drop=True)
+    return a[keys].equals(b[keys]) and np.allclose(a[["revenue", "avg_rating"]], b[["revenue", "avg_rating"]], rtol=1e-9)
+
+
+if __name__ == "__main__":
+    db_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), DB_PATH)
+    engine = create_engine(f"sqlite:///{db_path}")
+
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql("SELECT COUNT(*) FROM sales_transactions").fetchone()[0]
+        print("=" * 80)
+        print("DASHBOARD QUERIES: ROLLUP TABLES vs BASE TABLES")
+        print("=" * 80)
+        print(f"Database: {db_path} ({rows:,} sales rows)\n")
+
+        print(f"{'Query':<22} {'Routed to':<40} {'Base (ms)':>10} {'Routed (ms)':>12} {'Speedup':>8} {'Same':>5}")
+        for name, (group_by, filters) in DASHBOARD.items():
+            expected, base_ms = timed(conn, group_by, filters, "base")
+            result, routed_ms = timed(conn, group_by, filters, "auto")
+            print(f"{name:<22} {result.attrs['source']:<40} {base_ms:>10.2f} {routed_ms:>12.2f} "
+                  f"{base_ms / routed_ms:>7.1f}x {str(same_rows(expected, result)):>5}")
@@ -0,0 +1,163 @@
+import sqlite3
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+BATCH_SIZE = 50_000
+
+# Applied for the duration of a bulk load: WAL lets each batch commit without
+# rewriting a rollback journal, synchronous=NORMAL only syncs at checkpoints,
+# and the large page cache keeps primary-key indexes in memory.
+LOAD_PRAGMAS = [
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -262144",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA foreign_keys = OFF",
+]
+
+FINISH_PRAGMAS = [
+    "PRAGMA wal_checkpoint(TRUNCATE)",
+    "PRAGMA journal_mode = DELETE",
+    "PRAGMA synchronous = FULL",
+]
+
+PROGRESS_DDL = """
+CREATE TABLE IF NOT EXISTS bulk_load_progress (
+    table_name VARCHAR PRIMARY KEY,
+    row_count INT,
+    rows_loaded INT,
+    finished_at TIMESTAMP
+);
+"""
+
+
+def sqlite_path(engine_or_path) -> str:
+    if isinstance(engine_or_path, str):
+        return engine_or_path
+    return engine_or_path.url.database
+
+
+def connect(db_path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    for pragma in LOAD_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def pending_load(engine_or_path) -> bool:
+    conn = sqlite3.connect(sqlite_path(engine_or_path))
+    try:
+        return conn.execute(
+            "SELECT COUNT(*) FROM bulk_load_progress WHERE finished_at IS NULL"
+        ).fetchone()[0] > 0
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        conn.close()
+
+
+def drop_tables(engine_or_path, names):
+    conn = sqlite3.connect(sqlite_path(engine_or_path))
+    with conn:
+        for name in list(names) + ["bulk_load_progress"]:
+            conn.execute(f'DROP TABLE IF EXISTS "{name}"')
+    conn.close()
+
+
+def sqlite_values(values: pd.Series) -> np.ndarray:
+    if pd.api.types.is_datetime64_any_dtype(values):
+        codes, uniques = pd.factorize(values)
+        formatted = np.append(uniques.strftime("%Y-%m-%d %H:%M:%S.%f").to_numpy(object), None)
+        return formatted[codes]
+    out = values.astype(object).to_numpy()
+    out[values.isna().to_numpy()] = None
+    return out
+
+
+def sqlite_rows(df: pd.DataFrame) -> list:
+    return list(zip(*(sqlite_values(df[col]) for col in df.columns)))
+
+
+def _start_progress(conn, tables):
+    conn.execute(PROGRESS_DDL)
+    conn.execute("BEGIN")
+    for name, df in tables.items():
+        conn.execute(
+            "INSERT OR IGNORE INTO bulk_load_progress (table_name, row_count, rows_loaded) VALUES (?, ?, 0)",
+            (name, len(df))
+        )
+    conn.execute("COMMIT")
+    return {
+        name: (rows_loaded, finished_at)
+        for name, rows_loaded, finished_at in conn.execute(
+            "SELECT table_name, rows_loaded, finished_at FROM bulk_load_progress"
+        )
+    }
+
+
+def _ensure_table(conn, name: str, df: pd.DataFrame):
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone()
+    if not exists:
+        conn.execute(pd.io.sql.get_schema(df, name))
+
+
+def load_table(conn, name: str, df: pd.DataFrame, start_row: int = 0, batch_size: int = BATCH_SIZE) -> int:
+    _ensure_table(conn, name, df)
+    columns = ", ".join(f'"{col}"' for col in df.columns)
+    placeholders = ", ".join("?" for _ in df.columns)
+    insert = f'INSERT INTO "{name}" ({columns}) VALUES ({placeholders})'
+
+    for start in range(start_row, len(df), batch_size):
+        batch = df.iloc[start:start + batch_size]
+        conn.execute("BEGIN")
+        conn.executemany(insert, sqlite_rows(batch))
+        conn.execute(
+            "UPDATE bulk_load_progress SET rows_loaded = ? WHERE table_name = ?",
+            (start + len(batch), name)
+        )
+        conn.execute("COMMIT")
+    conn.execute(
+        "UPDATE bulk_load_progress SET finished_at = ? WHERE table_name = ?",
+        (datetime.utcnow().isoformat(sep=" "), name)
+    )
+    return len(df) - start_row
+
+
+def bulk_load(engine_or_path, tables: dict, indexes=(), batch_size: int = BATCH_SIZE) -> dict:
+    conn = connect(sqlite_path(engine_or_path))
+    try:
+        progress = _start_progress(conn, tables)
+        stats = {}
+
+        for name, df in tables.items():
+            rows_loaded, finished_at = progress[name]
+            if finished_at is not None:
+                print(f"   {name:<24} already loaded ({rows_loaded:,} rows), skipping")
+                continue
+            if rows_loaded:
+                print(f"   {name:<24} resuming at row {rows_loaded:,}")
+            start = time.perf_counter()
+            rows = load_table(conn, name, df, rows_loaded, batch_size)
+            secs = time.perf_counter() - start
+            stats[name] = {"rows": rows, "seconds": secs, "rows_per_sec": rows / secs if secs else float("inf")}
+            print(f"   {name:<24} {rows:>10,} rows {secs:>8.2f}s {stats[name]['rows_per_sec']:>12,.0f} rows/s")
+
+        start = time.perf_counter()
+        for stmt in indexes:
+            conn.execute(stmt)
+        if indexes:
+            conn.execute("ANALYZE")
+            print(f"   {len(indexes)} secondary indexes built in {time.perf_counter() - start:.2f}s")
+
+        violations = conn.execute("PRAGMA foreign_key_check").fetchall()
+        if violations:
+            print(f"⚠️  {len(violations):,} foreign key violations")
+        for pragma in FINISH_PRAGMAS:
+            conn.execute(pragma)
+        return stats
+    finally:
+        conn.close()
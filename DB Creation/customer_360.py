@@ -0,0 +1,238 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+
+import numpy as np
+import pandas as pd
+
+DB_PATH = "retail.db"
+CACHE_SIZE = 10_000
+CACHE_TTL = 300.0
+RECENT_TRANSACTIONS = 10
+LATENCY_WINDOW = 10_000
+
+# One statement per part of the customer 360 view. The SQL strings never
+# change, so each thread's connection prepares them once and reuses them from
+# sqlite3's statement cache.
+PARTS = {
+    "profile": """
+        SELECT customer_id, master_customer_id, name, email, phone, address, city, state, zipcode,
+               country, age, gender, income, customer_segment, customer_since, last_purchase_date
+        FROM customer_master WHERE customer_id = ?
+    """,
+    "loyalty": """
+        SELECT total_loyalty_points AS balance, bonus_points, last_points_update
+        FROM customer_master WHERE customer_id = ?
+    """,
+    "analytics": "SELECT * FROM customer_analytics WHERE customer_id = ?",
+    "transactions": """
+        SELECT transaction_id, date, total_amount, product_category, product_brand, product_type, order_status
+        FROM sales_transactions_wide WHERE customer_id = ?
+        ORDER BY date DESC, transaction_id DESC LIMIT ?
+    """,
+}
+
+# Loaders append the customers they wrote to customer_change_log, and readers
+# drop those customers from their caches. A row without a customer_id covers
+# every customer, for one part or (part NULL) for all of them. The table
+# survives full rebuilds, which log a single all-customers row.
+CHANGE_LOG_DDL = """
+CREATE TABLE IF NOT EXISTS customer_change_log (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    customer_id VARCHAR,
+    part VARCHAR,
+    logged_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+
+def log_changes(conn, customer_ids=None, part=None):
+    if customer_ids is None:
+        rows = pd.DataFrame({"customer_id": [None], "part": [part]})
+    else:
+        rows = pd.DataFrame({"customer_id": pd.unique(pd.Series(list(customer_ids), dtype=object)), "part": part})
+    rows.to_sql("customer_change_log", conn, if_exists="append", index=False)
+    return len(rows)
+
+
+def reset_change_log(conn):
+    log_changes(conn)
+    conn.exec_driver_sql(
+        "DELETE FROM customer_change_log WHERE seq < (SELECT MAX(seq) FROM customer_change_log)"
+    )
+
+
+# Size-bounded LRU map whose entries also expire TTL seconds after they were
+# stored. Safe to share between threads.
+class LRUCache:
+    def __init__(self, max_size: int = CACHE_SIZE, ttl: float = CACHE_TTL, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.clock() - entry[1] >= self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[0]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, self.clock())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def discard(self, keys) -> int:
+        with self._lock:
+            removed = sum(self._entries.pop(key, None) is not None for key in keys)
+            self.invalidations += removed
+            return removed
+
+    def discard_where(self, predicate) -> int:
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                del self._entries[key]
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self) -> int:
+        return self.discard_where(lambda key: True)
+
+
+class Customer360:
+    def __init__(self, db_path: str = DB_PATH, max_size: int = CACHE_SIZE, ttl: float = CACHE_TTL,
+                 recent: int = RECENT_TRANSACTIONS):
+        self.db_path = db_path
+        self.recent = recent
+        self.cache = LRUCache(max_size, ttl)
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._last_seq = None
+        self._latency = {"hit": deque(maxlen=LATENCY_WINDOW), "miss": deque(maxlen=LATENCY_WINDOW)}
+
+    # Each thread gets its own read-only connection, opened on first use and
+    # kept until close(), which may run on another thread.
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False,
+                                   cached_statements=4 * len(PARTS))
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+            self._local.data_version = None
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    # PRAGMA data_version changes when another connection commits, so the
+    # change log is only read after a write.
+    def _sync(self, conn: sqlite3.Connection):
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._local.data_version:
+            return
+        self._local.data_version = version
+        with self._lock:
+            last_seq = self._last_seq
+            if last_seq is None:
+                self._last_seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM customer_change_log").fetchone()[0]
+                return
+            changes = conn.execute(
+                "SELECT seq, customer_id, part FROM customer_change_log WHERE seq > ? ORDER BY seq", (last_seq,)
+            ).fetchall()
+            if changes:
+                self._last_seq = changes[-1]["seq"]
+        for change in changes:
+            self.invalidate(None if change["customer_id"] is None else [change["customer_id"]], change["part"])
+
+    def invalidate(self, customer_ids=None, part=None) -> int:
+        parts = list(PARTS) if part is None else [part]
+        if customer_ids is None:
+            return self.cache.discard_where(lambda key: key[0] in parts)
+        return self.cache.discard([(p, str(customer_id)) for customer_id in customer_ids for p in parts])
+
+    def _fetch(self, conn: sqlite3.Connection, part: str, customer_id: str):
+        if part == "transactions":
+            return [dict(row) for row in conn.execute(PARTS[part], (customer_id, self.recent))]
+        row = conn.execute(PARTS[part], (customer_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def _part(self, conn: sqlite3.Connection, part: str, customer_id: str):
+        found, value = self.cache.get((part, customer_id))
+        if not found:
+            value = self._fetch(conn, part, customer_id)
+            self.cache.put((part, customer_id), value)
+        return found, value
+
+    def lookup(self, customer_id, parts=None) -> dict:
+        start = time.perf_counter()
+        conn = self._conn()
+        self._sync(conn)
+        customer_id = str(customer_id)
+        results = {part: self._part(conn, part, customer_id) for part in parts or PARTS}
+        hit = all(found for found, _ in results.values())
+        self._latency["hit" if hit else "miss"].append(time.perf_counter() - start)
+        return {part: value for part, (_, value) in results.items()}
+
+    def customer_360(self, customer_id) -> dict:
+        return {"customer_id": str(customer_id), **self.lookup(customer_id)}
+
+    def profile(self, customer_id) -> dict:
+        return self.lookup(customer_id, ["profile"])["profile"]
+
+    def analytics(self, customer_id) -> dict:
+        return self.lookup(customer_id, ["analytics"])["analytics"]
+
+    def recent_transactions(self, customer_id) -> list:
+        return self.lookup(customer_id, ["transactions"])["transactions"]
+
+    def loyalty_balance(self, customer_id) -> int:
+        loyalty = self.lookup(customer_id, ["loyalty"])["loyalty"]
+        return loyalty["balance"] if loyalty and loyalty["balance"] is not None else 0
+
+    def stats(self) -> dict:
+        cache = self.cache
+        lookups = cache.hits + cache.misses
+        latency = {}
+        for kind, samples in self._latency.items():
+            ms = np.array(samples) * 1000
+            latency[kind] = {
+                "count": len(ms),
+                "mean_ms": float(ms.mean()) if len(ms) else None,
+                "p95_ms": float(np.percentile(ms, 95)) if len(ms) else None,
+            }
+        return {
+            "entries": len(cache),
+            "hits": cache.hits,
+            "misses": cache.misses,
+            "hit_rate": cache.hits / lookups if lookups else None,
+            "evictions": cache.evictions,
+            "expirations": cache.expirations,
+            "invalidations": cache.invalidations,
+            "latency": latency,
+        }
+
+    def close(self):
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+        self._local = threading.local()
@@ -0,0 +1,162 @@
+import json
+import pandas as pd
+
+from rfm_scoring import (
+    add_to_sketches, build_sketches, load_sketches, rescore_customers, save_sketches, score_rfm,
+)
+
+# Running per-customer state behind customer_analytics. Every field can be
+# merged with a new batch without revisiting older transactions.
+STATE_COLUMNS = [
+    "customer_id", "txn_count", "amount_sum", "last_purchase_date",
+    "rating_sum", "rating_count", "product_types",
+]
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+
+def aggregate_transactions(st_df: pd.DataFrame) -> pd.DataFrame:
+    g = st_df.groupby("customer_id")
+    state = g.agg(
+        txn_count=("transaction_id", "nunique"),
+        amount_sum=("total_amount", "sum"),
+        last_purchase_date=("date", "max"),
+        rating_sum=("ratings", "sum"),
+        rating_count=("ratings", "count"),
+    )
+    types = st_df[["customer_id", "product_type"]].dropna().drop_duplicates()
+    state["product_types"] = types.groupby("customer_id")["product_type"].agg(frozenset)
+    state["product_types"] = state["product_types"].apply(lambda v: v if isinstance(v, frozenset) else frozenset())
+    state["rating_sum"] = state["rating_sum"].astype("int64")
+    return state.reset_index()[STATE_COLUMNS]
+
+
+def merge_state(state: pd.DataFrame, batch: pd.DataFrame) -> pd.DataFrame:
+    old = state.set_index("customer_id")
+    new = batch.set_index("customer_id")
+    old, new = old.align(new, join="outer")
+
+    merged = pd.DataFrame(index=old.index)
+    for col in ["txn_count", "amount_sum", "rating_sum", "rating_count"]:
+        merged[col] = old[col].fillna(0) + new[col].fillna(0)
+    merged["last_purchase_date"] = pd.concat(
+        [old["last_purchase_date"], new["last_purchase_date"]], axis=1
+    ).max(axis=1)
+    merged["product_types"] = [
+        (a if isinstance(a, frozenset) else frozenset()) | (b if isinstance(b, frozenset) else frozenset())
+        for a, b in zip(old["product_types"], new["product_types"])
+    ]
+    for col in ["txn_count", "rating_sum", "rating_count"]:
+        merged[col] = merged[col].astype("int64")
+    return merged.reset_index()[STATE_COLUMNS]
+
+
+def derive_analytics(state: pd.DataFrame, snapshot_date) -> pd.DataFrame:
+    base = pd.DataFrame({"customer_id": state["customer_id"]})
+    base["recency"] = (snapshot_date - state["last_purchase_date"]).dt.days
+    base["frequency"] = state["txn_count"]
+    base["monetary"] = state["amount_sum"].fillna(0)
+    base["product_diversity"] = state["product_types"].map(len)
+    base["avg_rating"] = (state["rating_sum"] / state["rating_count"].where(state["rating_count"] > 0)).fillna(0)
+    base["recency"] = base["recency"].fillna(base["recency"].max())
+
+    score_rfm(base)
+    base["clv_score"] = (
+        base["monetary"] * base["frequency"] / (base["recency"] + 1)
+    )
+
+    base["snapshot_date"] = snapshot_date
+
+    return base[[
+        "customer_id","recency","frequency","monetary",
+        "rfm_score","segment","product_diversity","avg_rating",
+        "clv_score","snapshot_date"
+    ]]
+
+
+def state_to_sql(state: pd.DataFrame) -> pd.DataFrame:
+    out = state.copy()
+    out["product_types"] = out["product_types"].map(lambda v: json.dumps(sorted(v)))
+    return out
+
+
+def read_state(conn, customer_ids=None) -> pd.DataFrame:
+    if customer_ids is None:
+        state = pd.read_sql("SELECT * FROM customer_aggregates", conn, parse_dates=["last_purchase_date"])
+    else:
+        pd.DataFrame({"customer_id": pd.unique(customer_ids)}).to_sql(
+            "_state_customers", conn, if_exists="replace", index=False
+        )
+        state = pd.read_sql(
+            """
+            SELECT a.* FROM customer_aggregates a
+            JOIN _state_customers c ON c.customer_id = a.customer_id
+            """,
+            conn, parse_dates=["last_purchase_date"]
+        )
+        conn.exec_driver_sql("DROP TABLE _state_customers")
+    state["product_types"] = state["product_types"].map(lambda v: frozenset(json.loads(v)))
+    return state[STATE_COLUMNS]
+
+
+def write_state(conn, state: pd.DataFrame, customer_ids):
+    pd.DataFrame({"customer_id": pd.unique(customer_ids)}).to_sql(
+        "_state_customers", conn, if_exists="replace", index=False
+    )
+    for table in ["customer_aggregates", "customer_analytics"]:
+        conn.exec_driver_sql(
+            f"DELETE FROM {table} WHERE customer_id IN (SELECT customer_id FROM _state_customers)"
+        )
+    conn.exec_driver_sql("DROP TABLE _state_customers")
+    state_to_sql(state).to_sql("customer_aggregates", conn, if_exists="append", index=False)
+
+
+def refresh_recency(conn, snapshot_date):
+    snapshot = snapshot_date.strftime(DATE_FORMAT)
+    conn.exec_driver_sql(
+        """
+        UPDATE customer_analytics
+        SET recency = (
+                SELECT CAST(julianday(?) - julianday(a.last_purchase_date) AS INTEGER)
+                FROM customer_aggregates a
+                WHERE a.customer_id = customer_analytics.customer_id
+            ),
+            snapshot_date = ?
+        """,
+        (snapshot, snapshot)
+    )
+    conn.exec_driver_sql(
+        "UPDATE customer_analytics SET recency = (SELECT MAX(recency) FROM customer_analytics) WHERE recency IS NULL"
+    )
+    conn.exec_driver_sql("UPDATE customer_analytics SET clv_score = monetary * frequency / (recency + 1)")
+
+
+# Keeps the stored RFM sketches in step with customer_aggregates: each touched
+# customer's old metrics are removed and the new ones added.
+def update_sketches(conn, before: pd.DataFrame, after: pd.DataFrame) -> dict:
+    sketches = load_sketches(conn)
+    if sketches is None or not add_to_sketches(sketches, before, after):
+        sketches = build_sketches(read_state(conn))
+    save_sketches(conn, sketches)
+    return sketches
+
+
+def apply_transactions(conn, new_st: pd.DataFrame, history: pd.DataFrame = None, rebuild_ids=(),
+                       rfm_method: str = "exact"):
+    rebuild_ids = pd.unique(pd.Series(list(rebuild_ids), dtype=object))
+    before = read_state(conn, pd.concat([new_st["customer_id"], pd.Series(rebuild_ids, dtype=object)]))
+    state = merge_state(before[before["customer_id"].isin(new_st["customer_id"])], aggregate_transactions(new_st))
+    if len(rebuild_ids):
+        rebuilt = aggregate_transactions(history[history["customer_id"].isin(rebuild_ids)])
+        state = pd.concat([state[~state["customer_id"].isin(rebuild_ids)], rebuilt], ignore_index=True)
+
+    write_state(conn, state, pd.concat([state["customer_id"], pd.Series(rebuild_ids, dtype=object)]))
+    snapshot_date = pd.Timestamp(
+        conn.exec_driver_sql("SELECT MAX(last_purchase_date) FROM customer_aggregates").scalar()
+    )
+    derive_analytics(state, snapshot_date).to_sql("customer_analytics", conn, if_exists="append", index=False)
+    refresh_recency(conn, snapshot_date)
+    # Quintile edges depend on every customer, so scores are redone globally.
+    sketches = update_sketches(conn, before, state)
+    rescore_customers(conn, rfm_method, sketches, snapshot_date)
+    return len(state), snapshot_date
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+from sqlalchemy import inspect
+
+# Dictionary tables for the repeated text in sales_transactions. Each distinct
+# natural key gets an integer key once: keys already in the database are kept,
+# and new values are numbered after the current maximum in sorted order, so
+# the same data always gets the same keys whatever order its rows arrive in.
+# The fact table stores only the integer keys.
+DIMENSIONS = {
+    "product_master": ("product_key", ["product_category", "product_brand", "product_type", "product_full_name"]),
+    "shipping_methods": ("shipping_method_id", ["shipping_method"]),
+    "payment_methods": ("payment_method_id", ["payment_method"]),
+    "order_statuses": ("order_status_id", ["order_status"]),
+}
+
+
+def assign_keys(values: pd.DataFrame, key: str, natural: list, existing: pd.DataFrame = None) -> pd.DataFrame:
+    if existing is None:
+        existing = pd.DataFrame({key: pd.Series(dtype="int64"), **{col: pd.Series(dtype=object) for col in natural}})
+    distinct = values[natural].drop_duplicates()
+    known = distinct.merge(existing[natural], on=natural, how="left", indicator=True)
+    new = known.loc[known["_merge"] == "left_only", natural].sort_values(natural, na_position="last")
+    start = int(existing[key].max()) + 1 if len(existing) else 1
+    new.insert(0, key, np.arange(start, start + len(new), dtype="int64"))
+    out = pd.concat([existing, new], ignore_index=True)
+    out[key] = out[key].astype("int64")
+    return out
+
+
+# Keys from an earlier build are reused, unless the table predates integer
+# keys (product_master used to hold "P000001" strings).
+def read_dimensions(conn) -> dict:
+    tables = set(inspect(conn).get_table_names())
+    dims = {name: pd.read_sql(f"SELECT * FROM {name}", conn) for name in DIMENSIONS if name in tables}
+    return {
+        name: dim for name, dim in dims.items()
+        if DIMENSIONS[name][0] in dim and pd.api.types.is_integer_dtype(dim[DIMENSIONS[name][0]])
+    }
+
+
+def build_dimensions(st_df: pd.DataFrame, existing: dict = None) -> dict:
+    existing = existing or {}
+    dims = {
+        name: assign_keys(st_df, key, natural, existing.get(name))
+        for name, (key, natural) in DIMENSIONS.items()
+    }
+    products = dims["product_master"]
+    products["is_active"] = products["is_active"].fillna(True).astype(bool) if "is_active" in products else True
+    return dims
+
+
+def new_members(dims: dict, existing: dict) -> dict:
+    return {
+        name: dim[~dim[DIMENSIONS[name][0]].isin(existing[name][DIMENSIONS[name][0]])] if name in existing else dim
+        for name, dim in dims.items()
+    }
+
+
+def encode_facts(st_df: pd.DataFrame, dims: dict) -> pd.DataFrame:
+    facts = st_df
+    for name, (key, natural) in DIMENSIONS.items():
+        keys = facts[natural].merge(dims[name][[key] + natural], on=natural, how="left")[key]
+        if keys.isna().any():
+            raise ValueError(f"{int(keys.isna().sum())} rows have no {key} in {name}")
+        position = facts.columns.get_loc(natural[0])
+        facts = facts.drop(columns=natural)
+        facts.insert(position, key, keys.to_numpy(dtype="int64"))
+    return facts
+
+
+# The fact table joined back to its dimensions, with the text columns it
+# had before they were dictionary-encoded.
+WIDE_VIEW = """
+CREATE VIEW sales_transactions_wide AS
+SELECT s.*,
+       p.product_category, p.product_brand, p.product_type, p.product_full_name,
+       sm.shipping_method, pm.payment_method, os.order_status
+FROM sales_transactions s
+JOIN product_master p ON p.product_key = s.product_key
+JOIN shipping_methods sm ON sm.shipping_method_id = s.shipping_method_id
+JOIN payment_methods pm ON pm.payment_method_id = s.payment_method_id
+JOIN order_statuses os ON os.order_status_id = s.order_status_id
+"""
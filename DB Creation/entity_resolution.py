@@ -0,0 +1,252 @@
+import os
+import re
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ETL_Pipeline'))
+from ETL import standardize_phone_vectorized
+
+# Customers are only compared with others that share a blocking key, so the
+# work grows with the size of the blocks instead of with the square of the
+# customer count. Blocks larger than MAX_BLOCK_SIZE (placeholder emails,
+# shared office phones) are skipped rather than compared all-pairs.
+BLOCKING_KEYS = ["phone", "email", "zip_name"]
+MAX_BLOCK_SIZE = 100
+NAME_PREFIX = 4
+
+# A candidate pair scores the weighted agreement of the fields both records
+# have. It is a match when the score reaches MATCH_THRESHOLD and the names are
+# at least NAME_MIN_SIMILARITY alike, so relatives sharing a phone or an
+# address stay separate customers.
+FIELD_WEIGHTS = {"phone": 2.0, "email": 2.0, "name": 3.0, "address": 2.0, "zipcode": 1.0}
+MATCH_THRESHOLD = 0.7
+NAME_MIN_SIMILARITY = 0.5
+
+NAME_AFFIXES = {"mr", "mrs", "ms", "miss", "dr", "md", "dds", "dvm", "phd", "jr", "sr", "ii", "iii", "iv"}
+MISSING = {"", "<NA>", "nan", "None"}
+EMAIL_PATTERN = re.compile(r"([^@\s]+)@([^@\s]+)")
+SIGNATURE_WIDTH = 48
+SIGNATURE_CHUNK = 200_000
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _map_unique(series: pd.Series, fn) -> np.ndarray:
+    codes, uniques = pd.factorize(series)
+    mapped = np.array([fn(value) for value in uniques] + [None], dtype=object)
+    return mapped[codes]
+
+
+def _text(value):
+    text = str(value).strip()
+    return None if text in MISSING else text
+
+
+def name_key(value):
+    words = re.sub(r"[^a-z\s]", " ", str(value).lower()).split()
+    return " ".join(w for w in words if w not in NAME_AFFIXES) or None
+
+
+def email_key(value):
+    match = EMAIL_PATTERN.fullmatch(str(value).strip().lower())
+    if match is None:
+        return None
+    local, domain = match.groups()
+    local = local.split("+")[0].replace(".", "")
+    return f"{domain}|{local}" if local and domain else None
+
+
+def address_key(value):
+    return re.sub(r"[^a-z0-9]+", " ", str(value).lower()).strip() or None
+
+
+def _as_text(series: pd.Series) -> pd.Series:
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype("Int64").astype(object).where(series.notna(), None)
+    return series
+
+
+def normalize_customers(cm: pd.DataFrame) -> pd.DataFrame:
+    phone = standardize_phone_vectorized(pd.Series(_map_unique(_as_text(cm["phone"]), _text), index=cm.index))
+    name = _map_unique(cm["name"], name_key)
+    zipcode = _map_unique(_as_text(cm["zipcode"]), _text)
+    has_both = pd.notna(zipcode) & pd.notna(name)
+    zip_name = np.full(len(cm), None, dtype=object)
+    zip_name[has_both] = [f"{z}|{n[:NAME_PREFIX]}" for z, n in zip(zipcode[has_both], name[has_both])]
+    return pd.DataFrame({
+        "phone": phone.astype(object).where(phone.notna(), None),
+        "email": _map_unique(cm["email"], email_key),
+        "name": name,
+        "address": _map_unique(cm["address"], address_key),
+        "zipcode": zipcode,
+        "zip_name": zip_name,
+    }, index=cm.index)
+
+
+# Each string becomes a 64-bit set of its character bigrams, so Jaccard
+# similarity of two strings is popcount(a & b) / popcount(a | b). Strings are
+# cut at SIGNATURE_WIDTH characters.
+def bigram_signatures(series: pd.Series) -> np.ndarray:
+    codes, uniques = pd.factorize(series)
+    signatures = np.zeros(len(uniques), dtype=np.uint64)
+    for start in range(0, len(uniques), SIGNATURE_CHUNK):
+        block = np.array([f" {u} " for u in uniques[start:start + SIGNATURE_CHUNK]], dtype=f"U{SIGNATURE_WIDTH}")
+        chars = block.view(np.uint32).reshape(len(block), SIGNATURE_WIDTH).astype(np.uint64)
+        present = (chars[:, :-1] != 0) & (chars[:, 1:] != 0)
+        with np.errstate(over="ignore"):
+            bigram = (chars[:, :-1] * np.uint64(0x9E3779B97F4A7C15)) ^ (chars[:, 1:] * np.uint64(0xC2B2AE3D27D4EB4F))
+            bits = np.left_shift(np.uint64(1), (bigram * np.uint64(0x165667B19E3779F9)) >> np.uint64(58))
+        signatures[start:start + len(block)] = np.bitwise_or.reduce(np.where(present, bits, np.uint64(0)), axis=1)
+    return np.where(codes >= 0, signatures[codes], np.uint64(0))
+
+
+def _popcount(values: np.ndarray) -> np.ndarray:
+    return POPCOUNT[values.view(np.uint8)].reshape(len(values), 8).sum(axis=1)
+
+
+def jaccard(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    union = _popcount(a | b)
+    return np.divide(_popcount(a & b), union, out=np.zeros(len(a)), where=union > 0)
+
+
+def block_pairs(keys: pd.Series, max_block: int = MAX_BLOCK_SIZE):
+    codes = pd.factorize(keys)[0]
+    sizes = np.bincount(codes[codes >= 0]) if (codes >= 0).any() else np.empty(0, dtype=int)
+    usable = np.flatnonzero((sizes >= 2) & (sizes <= max_block))
+    members = np.flatnonzero(np.isin(codes, usable))
+    members = members[np.argsort(codes[members], kind="stable")]
+    block = codes[members]
+
+    left, right = [], []
+    starts = np.arange(len(members))
+    for offset in range(1, max_block):
+        starts = starts[starts + offset < len(members)]
+        starts = starts[block[starts] == block[starts + offset]]
+        if not len(starts):
+            break
+        left.append(members[starts])
+        right.append(members[starts + offset])
+    left = np.concatenate(left) if left else np.empty(0, dtype=np.int64)
+    right = np.concatenate(right) if right else np.empty(0, dtype=np.int64)
+    stats = {"blocks": len(usable), "skipped_blocks": int((sizes > max_block).sum())}
+    return np.minimum(left, right), np.maximum(left, right), stats
+
+
+def score_pairs(norm: pd.DataFrame, left: np.ndarray, right: np.ndarray, signatures=None):
+    signatures = signatures or {col: bigram_signatures(norm[col]) for col in ["name", "address"]}
+    total = np.zeros(len(left))
+    weight = np.zeros(len(left))
+    for field, w in FIELD_WEIGHTS.items():
+        values = norm[field].to_numpy(dtype=object)
+        known = pd.notna(values[left]) & pd.notna(values[right])
+        if field in signatures:
+            similarity = jaccard(signatures[field][left], signatures[field][right])
+        else:
+            similarity = (values[left] == values[right]).astype(float)
+        total += np.where(known, w * similarity, 0.0)
+        weight += np.where(known, w, 0.0)
+        if field == "name":
+            name_similarity = np.where(known, similarity, 0.0)
+    score = np.divide(total, weight, out=np.zeros(len(left)), where=weight > 0)
+    return score, (score >= MATCH_THRESHOLD) & (name_similarity >= NAME_MIN_SIMILARITY)
+
+
+# Connected components by min-label propagation with pointer jumping. Labels
+# start from `labels`, so clusters found by earlier runs are kept and only
+# joined together by the new edges.
+def connected_labels(labels: np.ndarray, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    parent = labels.copy()
+    while True:
+        before = parent.copy()
+        low = np.minimum(parent[left], parent[right])
+        np.minimum.at(parent, parent[left], low)
+        np.minimum.at(parent, parent[right], low)
+        while True:
+            jumped = parent[parent]
+            if np.array_equal(jumped, parent):
+                break
+            parent = jumped
+        if np.array_equal(parent, before):
+            return parent
+
+
+def resolve_customers(cm: pd.DataFrame, master_ids: pd.Series = None, new: pd.Series = None):
+    start = time.perf_counter()
+    index = cm.index
+    ids = pd.to_numeric(cm["customer_id"], errors="coerce")
+    order = np.argsort(ids.to_numpy(), kind="stable")
+    cm = cm.iloc[order]
+    customer_ids = cm["customer_id"].to_numpy(dtype=object)
+    norm = normalize_customers(cm)
+
+    # Positions follow numeric customer id, so the smallest position in a
+    # cluster is its smallest customer id: the master key does not depend on
+    # row order, and only changes if a customer with a lower id joins.
+    labels = np.arange(len(cm))
+    if master_ids is not None:
+        known = master_ids.iloc[order].to_numpy(dtype=object)
+        position = pd.Series(labels, index=customer_ids)
+        existing = pd.notna(known) & pd.Series(known).isin(position.index).to_numpy()
+        labels[existing] = position.loc[known[existing]].to_numpy()
+    new_rows = np.ones(len(cm), dtype=bool) if new is None else new.iloc[order].to_numpy(dtype=bool)
+
+    report = []
+    seen = np.empty(0, dtype=np.int64)
+    for key in BLOCKING_KEYS:
+        left, right, stats = block_pairs(norm[key])
+        keep = new_rows[left] | new_rows[right]
+        left, right = left[keep], right[keep]
+        pair_ids = left.astype(np.int64) * len(cm) + right
+        fresh = ~np.isin(pair_ids, seen)
+        seen = np.union1d(seen, pair_ids)
+        report.append({"blocking_key": key, **stats, "candidate_pairs": len(left), "new_pairs": int(fresh.sum())})
+
+    left, right = np.divmod(seen, len(cm)) if len(cm) else (seen, seen)
+    score, matched = score_pairs(norm, left, right)
+    labels = connected_labels(labels, left[matched], right[matched])
+
+    report = pd.DataFrame(report)
+    report.attrs.update({
+        "customers": len(cm),
+        "candidate_pairs": len(seen),
+        "matched_pairs": int(matched.sum()),
+        "master_customers": len(np.unique(labels)),
+        "secs": time.perf_counter() - start,
+    })
+    master = np.empty(len(cm), dtype=object)
+    master[order] = customer_ids[labels]
+    return pd.Series(master, index=index, name="master_customer_id"), report
+
+
+def print_resolution_report(report: pd.DataFrame):
+    print(f"🔹 Entity resolution: {report.attrs['customers']:,} customer ids → "
+          f"{report.attrs['master_customers']:,} master customers ({report.attrs['secs']:.2f}s)")
+    for row in report.itertuples():
+        print(f"   {row.blocking_key:<10} {row.candidate_pairs:>12,} candidate pairs "
+              f"({row.new_pairs:,} new) from {row.blocks:,} blocks, {row.skipped_blocks:,} oversized skipped")
+    print(f"   {report.attrs['candidate_pairs']:,} distinct pairs scored, {report.attrs['matched_pairs']:,} matched")
+
+
+# Incremental loads insert customers without a master key. They are resolved
+# against everyone already loaded; pairs between two old customers were
+# scored by earlier runs and are not generated again.
+def refresh_master_keys(conn):
+    cm = pd.read_sql(
+        "SELECT customer_id, master_customer_id, name, email, phone, address, zipcode FROM customer_master", conn
+    )
+    master, report = resolve_customers(cm, cm["master_customer_id"], cm["master_customer_id"].isna())
+    changed = cm[master != cm["master_customer_id"]].assign(master_customer_id=master)
+    changed[["customer_id", "master_customer_id"]].to_sql("_master_keys", conn, if_exists="replace", index=False)
+    conn.exec_driver_sql(
+        """
+        UPDATE customer_master
+        SET master_customer_id = k.master_customer_id
+        FROM _master_keys k
+        WHERE k.customer_id = customer_master.customer_id
+        """
+    )
+    conn.exec_driver_sql("DROP TABLE _master_keys")
+    report.attrs["updated"] = len(changed)
+    report.attrs["updated_ids"] = changed["customer_id"].tolist()
+    return report
@@ -0,0 +1,408 @@
+import sys
+import time
+import uuid
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine
+
+# loyalty_transactions is an append-only ledger. Each event changes a
+# customer's balance by points_earned - points_redeemed + bonus_points, and
+# customer_master.total_loyalty_points holds the balance after the latest
+# event. A reversal stores the negated amounts of the event it cancels.
+EVENT_TYPES = ["EARN", "REDEEM", "BONUS", "REVERSAL"]
+ID_PREFIXES = {"EARN": "L", "REDEEM": "D", "BONUS": "B", "REVERSAL": "R"}
+LEDGER_COLUMNS = [
+    "loyalty_txn_id", "customer_id", "transaction_id", "points_earned",
+    "points_redeemed", "bonus_points", "balance_after", "event_date",
+    "event_type",
+]
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+# Events that are not derived from sales (redemptions, bonuses and
+# reversals) are also written to loyalty_event_log when they are appended.
+# Nothing rewrites or drops the log, so check_ledger can tell when a rebuild
+# of the ledger lost one of them.
+EVENT_LOG_COLUMNS = [
+    "loyalty_txn_id", "customer_id", "transaction_id", "points_earned",
+    "points_redeemed", "bonus_points", "event_date", "event_type",
+]
+EVENT_LOG_DDL = """
+CREATE TABLE IF NOT EXISTS loyalty_event_log (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    loyalty_txn_id VARCHAR,
+    customer_id VARCHAR,
+    transaction_id VARCHAR,
+    points_earned INT,
+    points_redeemed INT,
+    bonus_points INT,
+    event_date DATE,
+    event_type VARCHAR,
+    logged_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+
+def points_delta(ledger: pd.DataFrame) -> pd.Series:
+    return ledger["points_earned"] - ledger["points_redeemed"] + ledger["bonus_points"]
+
+
+def earn_events(st_df: pd.DataFrame) -> pd.DataFrame:
+    events = st_df[["customer_id", "transaction_id", "date"]].rename(columns={"date": "event_date"})
+    events["event_type"] = "EARN"
+    events["points"] = st_df["total_amount"].fillna(0).floordiv(10).astype(int)
+    return events.sort_values(["customer_id", "event_date", "transaction_id"])
+
+
+def current_balances(ledger: pd.DataFrame) -> pd.DataFrame:
+    g = ledger.assign(delta=points_delta(ledger)).groupby("customer_id")
+    return pd.DataFrame({
+        "total_loyalty_points": g["delta"].sum(),
+        "bonus_points": g["bonus_points"].sum(),
+        "last_points_update": g["event_date"].max(),
+    }).reset_index()
+
+
+def with_balances(cm_df: pd.DataFrame, ledger: pd.DataFrame) -> pd.DataFrame:
+    balances = current_balances(ledger).set_index("customer_id")
+    cm = cm_df.copy()
+    ids = cm["customer_id"]
+    cm["total_loyalty_points"] = ids.map(balances["total_loyalty_points"]).fillna(0).astype(int)
+    cm["bonus_points"] = ids.map(balances["bonus_points"]).fillna(0).astype(int)
+    cm["last_points_update"] = ids.map(balances["last_points_update"])
+    return cm
+
+
+def table_exists(conn, name: str) -> bool:
+    return conn.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone() is not None
+
+
+# Ledgers written before the log existed seed it with their recorded events.
+def ensure_event_log(conn):
+    if table_exists(conn, "loyalty_event_log"):
+        return
+    conn.exec_driver_sql(EVENT_LOG_DDL)
+    if table_exists(conn, "loyalty_transactions"):
+        columns = ", ".join(EVENT_LOG_COLUMNS)
+        conn.exec_driver_sql(
+            f"""
+            INSERT INTO loyalty_event_log ({columns})
+            SELECT {columns} FROM loyalty_transactions WHERE event_type != 'EARN' ORDER BY rowid
+            """
+        )
+
+
+def current_balance(conn, customer_id: str) -> int:
+    row = conn.exec_driver_sql(
+        "SELECT total_loyalty_points FROM customer_master WHERE customer_id = ?", (customer_id,)
+    ).fetchone()
+    return row[0] if row and row[0] is not None else 0
+
+
+def read_balances(conn, customer_ids) -> pd.DataFrame:
+    pd.DataFrame({"customer_id": pd.unique(customer_ids)}).to_sql(
+        "_ledger_customers", conn, if_exists="replace", index=False
+    )
+    balances = pd.read_sql(
+        """
+        SELECT c.customer_id, m.total_loyalty_points, m.bonus_points, m.last_points_update
+        FROM _ledger_customers c
+        LEFT JOIN customer_master m ON m.customer_id = c.customer_id
+        """,
+        conn, parse_dates=["last_points_update"]
+    )
+    conn.exec_driver_sql("DROP TABLE _ledger_customers")
+    balances["total_loyalty_points"] = balances["total_loyalty_points"].fillna(0).astype(int)
+    balances["bonus_points"] = balances["bonus_points"].fillna(0).astype(int)
+    return balances
+
+
+def write_balances(conn, balances: pd.DataFrame):
+    if balances.empty:
+        return
+    conn.exec_driver_sql(
+        """
+        UPDATE customer_master
+        SET total_loyalty_points = ?, bonus_points = ?, last_points_update = ?
+        WHERE customer_id = ?
+        """,
+        [
+            (int(points), int(bonus), None if pd.isna(updated) else updated.strftime(DATE_FORMAT), customer_id)
+            for customer_id, points, bonus, updated in balances[
+                ["customer_id", "total_loyalty_points", "bonus_points", "last_points_update"]
+            ].itertuples(index=False)
+        ]
+    )
+
+
+def _reversal_rows(conn, events: pd.DataFrame) -> pd.DataFrame:
+    pd.DataFrame({"loyalty_txn_id": events["reverses"]}).to_sql(
+        "_reversed_events", conn, if_exists="replace", index=False
+    )
+    originals = pd.read_sql(
+        """
+        SELECT l.* FROM loyalty_transactions l
+        JOIN _reversed_events r ON r.loyalty_txn_id = l.loyalty_txn_id
+        """,
+        conn
+    ).set_index("loyalty_txn_id")
+    already_reversed = pd.read_sql(
+        """
+        SELECT r.loyalty_txn_id FROM _reversed_events r
+        JOIN loyalty_transactions l ON l.loyalty_txn_id = 'R' || r.loyalty_txn_id
+        """,
+        conn
+    )["loyalty_txn_id"]
+    conn.exec_driver_sql("DROP TABLE _reversed_events")
+
+    if len(already_reversed) or events["reverses"].duplicated().any():
+        raise ValueError("Events can only be reversed once")
+
+    missing = ~events["reverses"].isin(originals.index)
+    if missing.any():
+        raise ValueError(f"Cannot reverse unknown events: {events.loc[missing, 'reverses'].tolist()}")
+    original = originals.loc[events["reverses"]]
+    if original["event_type"].eq("REVERSAL").any():
+        raise ValueError("Reversals cannot be reversed")
+    if (original["customer_id"].to_numpy() != events["customer_id"].to_numpy()).any():
+        raise ValueError("A reversal must belong to the same customer as the event it reverses")
+
+    rows = events[["customer_id", "event_date", "event_type"]].copy()
+    rows["loyalty_txn_id"] = ID_PREFIXES["REVERSAL"] + events["reverses"]
+    rows["transaction_id"] = original["transaction_id"].to_numpy()
+    for col in ["points_earned", "points_redeemed", "bonus_points"]:
+        rows[col] = -original[col].to_numpy()
+    return rows
+
+
+def ledger_rows(conn, events: pd.DataFrame) -> pd.DataFrame:
+    unknown = ~events["event_type"].isin(EVENT_TYPES)
+    if unknown.any():
+        raise ValueError(f"Unknown event types: {sorted(events.loc[unknown, 'event_type'].unique())}")
+
+    is_reversal = events["event_type"].eq("REVERSAL")
+    rows = events.loc[~is_reversal, ["customer_id", "event_date", "event_type"]].copy()
+    # reversals take their amounts from the event they cancel, so a batch of
+    # only reversals has no points column
+    points = events.get("points", pd.Series(0, index=events.index))[~is_reversal].astype(int)
+    rows["points_earned"] = points.where(rows["event_type"].eq("EARN"), 0)
+    rows["points_redeemed"] = points.where(rows["event_type"].eq("REDEEM"), 0)
+    rows["bonus_points"] = points.where(rows["event_type"].eq("BONUS"), 0)
+    transaction_id = events.get("transaction_id", pd.Series(None, index=events.index, dtype=object))
+    rows["transaction_id"] = transaction_id[~is_reversal]
+    rows["loyalty_txn_id"] = [
+        ID_PREFIXES[event_type] + (tid if isinstance(tid, str) else uuid.uuid4().hex)
+        for event_type, tid in zip(rows["event_type"], rows["transaction_id"])
+    ]
+    if is_reversal.any():
+        rows = pd.concat([rows, _reversal_rows(conn, events[is_reversal])])
+    return rows.loc[events.index]
+
+
+def append_events(conn, events: pd.DataFrame) -> pd.DataFrame:
+    if events.empty:
+        return pd.DataFrame(columns=LEDGER_COLUMNS)
+    events = events.reset_index(drop=True)
+    events["event_date"] = pd.to_datetime(events["event_date"])
+    rows = ledger_rows(conn, events)
+    rows = rows.sort_values(["event_date"], kind="stable")
+
+    balances = read_balances(conn, rows["customer_id"]).set_index("customer_id")
+    last_update = rows["customer_id"].map(balances["last_points_update"])
+    late = rows["event_date"] < last_update
+    if (late & rows["event_type"].ne("EARN")).any():
+        raise ValueError(f"{late.sum():,} events are dated before the customer's latest ledger entry")
+    merged = None
+    if late.any():
+        # EARN events for back-dated sales, such as rows promoted from
+        # quarantine, are merged into their customers' ledgers in date order.
+        late_ids = rows.loc[late, "customer_id"].unique()
+        merging = rows["customer_id"].isin(late_ids)
+        current = read_ledger(conn, late_ids)
+        next_seq = current["seq"].max() + 1
+        new = rows[merging].assign(seq=next_seq + np.arange(merging.sum()))
+        merged = rewrite_ledger(conn, late_ids, pd.concat([current, new], ignore_index=True))
+        merged = merged[merged["loyalty_txn_id"].isin(new["loyalty_txn_id"])][LEDGER_COLUMNS]
+        rows = rows[~merging]
+        if rows.empty:
+            return merged
+
+    delta = points_delta(rows)
+    rows["balance_after"] = rows["customer_id"].map(balances["total_loyalty_points"]) + delta.groupby(rows["customer_id"]).cumsum()
+    overdrawn = rows["event_type"].eq("REDEEM") & (rows["balance_after"] < 0)
+    if overdrawn.any():
+        raise ValueError(f"{overdrawn.sum():,} redemptions exceed the available balance")
+
+    rows = rows[LEDGER_COLUMNS]
+    ensure_event_log(conn)
+    rows.to_sql("loyalty_transactions", conn, if_exists="append", index=False)
+    recorded = rows["event_type"].ne("EARN")
+    if recorded.any():
+        rows.loc[recorded, EVENT_LOG_COLUMNS].to_sql("loyalty_event_log", conn, if_exists="append", index=False)
+
+    latest = rows.groupby("customer_id").agg(
+        total_loyalty_points=("balance_after", "last"),
+        bonus_points=("bonus_points", "sum"),
+        last_points_update=("event_date", "max"),
+    ).reset_index()
+    latest["bonus_points"] += latest["customer_id"].map(balances["bonus_points"])
+    write_balances(conn, latest)
+    return rows if merged is None else pd.concat([merged, rows], ignore_index=True)
+
+
+# Only EARN events are derived from sales_transactions; redemptions, bonuses
+# and reversals are recorded facts. Rebuilding customers re-derives their EARN
+# rows and merges them with the recorded events, in event date order and then
+# by seq, the position in the ledger. A re-derived EARN row keeps the
+# position of the row it replaces.
+def read_ledger(conn, customer_ids) -> pd.DataFrame:
+    pd.DataFrame({"customer_id": pd.unique(customer_ids)}).to_sql(
+        "_ledger_customers", conn, if_exists="replace", index=False
+    )
+    ledger = pd.read_sql(
+        """
+        SELECT l.rowid AS seq, l.* FROM loyalty_transactions l
+        JOIN _ledger_customers c ON c.customer_id = l.customer_id
+        """,
+        conn, parse_dates=["event_date"]
+    )
+    conn.exec_driver_sql("DROP TABLE _ledger_customers")
+    return ledger
+
+
+def ordered_ledger(ledger: pd.DataFrame) -> pd.DataFrame:
+    ledger = ledger.sort_values(["customer_id", "event_date", "seq"], kind="stable").reset_index(drop=True)
+    ledger["balance_after"] = points_delta(ledger).astype("int64").groupby(ledger["customer_id"]).cumsum()
+    return ledger
+
+
+def rewrite_ledger(conn, customer_ids, ledger: pd.DataFrame):
+    ledger = ordered_ledger(ledger)
+    pd.DataFrame({"customer_id": pd.unique(customer_ids)}).to_sql(
+        "_ledger_customers", conn, if_exists="replace", index=False
+    )
+    conn.exec_driver_sql(
+        "DELETE FROM loyalty_transactions WHERE customer_id IN (SELECT customer_id FROM _ledger_customers)"
+    )
+    conn.exec_driver_sql(
+        """
+        UPDATE customer_master
+        SET total_loyalty_points = 0, bonus_points = 0, last_points_update = NULL
+        WHERE customer_id IN (SELECT customer_id FROM _ledger_customers)
+        """
+    )
+    conn.exec_driver_sql("DROP TABLE _ledger_customers")
+    ledger[LEDGER_COLUMNS].to_sql("loyalty_transactions", conn, if_exists="append", index=False)
+    write_balances(conn, current_balances(ledger))
+    return ledger
+
+
+# Recorded events of the ledger being replaced by a full build, in the order
+# they were appended: from the event log, or from the ledger itself when it
+# predates the log.
+def recorded_events(conn) -> pd.DataFrame:
+    columns = ", ".join(EVENT_LOG_COLUMNS)
+    if table_exists(conn, "loyalty_event_log"):
+        query = f"SELECT {columns} FROM loyalty_event_log ORDER BY seq"
+    elif table_exists(conn, "loyalty_transactions"):
+        query = f"SELECT {columns} FROM loyalty_transactions WHERE event_type != 'EARN' ORDER BY rowid"
+    else:
+        return pd.DataFrame(columns=EVENT_LOG_COLUMNS)
+    return pd.read_sql(query, conn, parse_dates=["event_date"])
+
+
+# Merges recorded events into a ledger of EARN rows derived from sales.
+# Events of customers or transactions missing from the build are left out;
+# they stay in the event log.
+def with_recorded_events(earn_ledger: pd.DataFrame, recorded: pd.DataFrame, customer_ids, transaction_ids) -> pd.DataFrame:
+    known = recorded["customer_id"].isin(customer_ids) & (
+        recorded["transaction_id"].isna() | recorded["transaction_id"].isin(transaction_ids)
+    )
+    earn = earn_ledger.assign(seq=np.arange(len(earn_ledger)))
+    if known.any():
+        kept = recorded[known].assign(seq=len(earn) + np.arange(known.sum()))
+        earn = pd.concat([earn, kept], ignore_index=True)
+    ledger = ordered_ledger(earn)[LEDGER_COLUMNS]
+    ledger.attrs["carried_events"] = int(known.sum())
+    ledger.attrs["skipped_events"] = int((~known).sum())
+    return ledger
+
+
+def replace_history(conn, customer_ids, earn_ledger: pd.DataFrame):
+    current = read_ledger(conn, customer_ids)
+    recorded = current[current["event_type"].ne("EARN")]
+    earn = earn_ledger[earn_ledger["event_type"].eq("EARN")].copy()
+    earn["seq"] = earn["loyalty_txn_id"].map(current.set_index("loyalty_txn_id")["seq"])
+    new = earn["seq"].isna()
+    next_seq = current["seq"].max() + 1 if len(current) else 0
+    earn.loc[new, "seq"] = next_seq + np.arange(new.sum())
+    return rewrite_ledger(conn, customer_ids, pd.concat([earn, recorded], ignore_index=True))
+
+
+def recorded_totals(conn, table: str) -> pd.DataFrame:
+    return pd.read_sql(
+        f"""
+        SELECT customer_id, COUNT(*) AS events, SUM(points_earned) AS points_earned,
+               SUM(points_redeemed) AS points_redeemed, SUM(bonus_points) AS bonus_points
+        FROM {table} WHERE event_type != 'EARN' GROUP BY customer_id
+        """,
+        conn
+    ).set_index("customer_id")
+
+
+def check_ledger(conn) -> dict:
+    ledger = pd.read_sql(
+        """
+        SELECT customer_id, loyalty_txn_id, points_earned, points_redeemed, bonus_points, balance_after
+        FROM loyalty_transactions ORDER BY rowid
+        """,
+        conn
+    )
+    running = points_delta(ledger).groupby(ledger["customer_id"]).cumsum()
+    chain_breaks = ledger[running != ledger["balance_after"]]
+
+    replayed = running.groupby(ledger["customer_id"]).last().rename("replayed")
+    stored = pd.read_sql(
+        "SELECT customer_id, total_loyalty_points FROM customer_master", conn
+    ).set_index("customer_id")["total_loyalty_points"].fillna(0)
+    balances = pd.concat([replayed, stored], axis=1).fillna(0)
+    mismatched = balances[balances["replayed"] != balances["total_loyalty_points"]]
+
+    # Per customer, the recorded events in the ledger must add up to the log.
+    in_ledger = recorded_totals(conn, "loyalty_transactions")
+    if table_exists(conn, "loyalty_event_log"):
+        logged = recorded_totals(conn, "loyalty_event_log")
+    else:
+        logged = in_ledger.iloc[:0]
+    difference = in_ledger.sub(logged, fill_value=0)
+    lost = difference[(difference != 0).any(axis=1)]
+
+    return {
+        "events": len(ledger),
+        "customers": ledger["customer_id"].nunique(),
+        "chain_breaks": chain_breaks,
+        "balance_mismatches": mismatched.reset_index(),
+        "recorded_event_mismatches": lost.reset_index(),
+    }
+
+
+if __name__ == "__main__":
+    db_url = sys.argv[1] if len(sys.argv) > 1 else "sqlite:///retail.db"
+    engine = create_engine(db_url)
+
+    print("🔹 Replaying loyalty ledger...")
+    start = time.perf_counter()
+    with engine.connect() as conn:
+        report = check_ledger(conn)
+    secs = time.perf_counter() - start
+    print(f"   {report['events']:,} events for {report['customers']:,} customers "
+          f"replayed in {secs:.2f}s ({report['events'] / secs:,.0f} events/s)")
+    print(f"   balance_after mismatches: {len(report['chain_breaks']):,}")
+    print(f"   current balance mismatches: {len(report['balance_mismatches']):,}")
+    print(f"   customers whose recorded events differ from the event log: {len(report['recorded_event_mismatches']):,}")
+    if len(report["chain_breaks"]) or len(report["balance_mismatches"]) or len(report["recorded_event_mismatches"]):
+        print(report["balance_mismatches"].head(20).to_string(index=False))
+        print(report["recorded_event_mismatches"].head(20).to_string(index=False))
+        print("❌ Ledger is inconsistent")
+        sys.exit(1)
+    print("✅ Ledger, current balances and recorded events are consistent")
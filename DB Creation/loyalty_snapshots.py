@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+
+from loyalty_ledger import DATE_FORMAT, points_delta
+
+# Month-end balances for every customer with ledger activity up to that date.
+# A balance as of day D is the latest snapshot on or before D plus the ledger
+# events after it, up to and including D.
+SNAPSHOT_FREQ = "ME"
+
+
+def snapshot_dates(first, last) -> pd.DatetimeIndex:
+    return pd.date_range(pd.Timestamp(first).normalize(), pd.Timestamp(last).normalize(), freq=SNAPSHOT_FREQ)
+
+
+def day_end(as_of) -> str:
+    return (pd.Timestamp(as_of).normalize() + pd.Timedelta(days=1)).strftime(DATE_FORMAT)
+
+
+def build_snapshots(ledger: pd.DataFrame, dates: pd.DatetimeIndex, opening: pd.Series = None) -> pd.DataFrame:
+    columns = ["customer_id", "snapshot_date", "balance"]
+    if len(dates) == 0:
+        return pd.DataFrame(columns=columns)
+    days = pd.to_datetime(ledger["event_date"]).dt.normalize()
+    bucket = np.searchsorted(dates.values, days.values, side="left")
+    in_range = bucket < len(dates)
+
+    grouped = points_delta(ledger)[in_range].groupby(
+        [ledger["customer_id"][in_range].to_numpy(), bucket[in_range]]
+    )
+    changes = grouped.sum().unstack(fill_value=0).reindex(columns=range(len(dates)), fill_value=0)
+    events = grouped.size().unstack(fill_value=0).reindex(columns=range(len(dates)), fill_value=0)
+    balances = changes.cumsum(axis=1)
+    active = events.cumsum(axis=1).gt(0)
+
+    if opening is not None and len(opening):
+        customers = balances.index.union(opening.index)
+        balances = balances.reindex(customers, fill_value=0).add(opening.reindex(customers, fill_value=0), axis=0)
+        active = active.reindex(customers, fill_value=False)
+        active.loc[opening.index] = True
+
+    balances.columns = dates
+    active.columns = dates
+    snapshots = balances.stack()[active.stack()]
+    snapshots.index.names = ["customer_id", "snapshot_date"]
+    return snapshots.astype(int).rename("balance").reset_index()[columns]
+
+
+def take_snapshots(conn, since=None) -> int:
+    first, last = conn.exec_driver_sql(
+        "SELECT MIN(event_date), MAX(event_date) FROM loyalty_transactions"
+    ).fetchone()
+    if last is None:
+        return 0
+    dates = snapshot_dates(since if since is not None else first, last)
+    if len(dates) == 0:
+        return 0
+
+    base = conn.exec_driver_sql(
+        "SELECT MAX(snapshot_date) FROM loyalty_balance_snapshots WHERE snapshot_date < ?",
+        (dates[0].strftime(DATE_FORMAT),)
+    ).scalar()
+    opening = None
+    if base is not None:
+        opening = pd.read_sql(
+            "SELECT customer_id, balance FROM loyalty_balance_snapshots WHERE snapshot_date = ?",
+            conn, params=(base,)
+        ).set_index("customer_id")["balance"]
+    ledger = pd.read_sql(
+        """
+        SELECT customer_id, event_date, points_earned, points_redeemed, bonus_points
+        FROM loyalty_transactions
+        WHERE event_date >= ? AND event_date < ?
+        """,
+        conn, params=(day_end(base) if base is not None else first, day_end(dates[-1])), parse_dates=["event_date"]
+    )
+
+    snapshots = build_snapshots(ledger, dates, opening)
+    conn.exec_driver_sql(
+        "DELETE FROM loyalty_balance_snapshots WHERE snapshot_date >= ?", (dates[0].strftime(DATE_FORMAT),)
+    )
+    snapshots.to_sql("loyalty_balance_snapshots", conn, if_exists="append", index=False)
+    return len(snapshots)
+
+
+def balance_as_of(conn, customer_id: str, as_of) -> int:
+    return conn.exec_driver_sql(
+        """
+        WITH snapshot AS (
+            SELECT snapshot_date, balance FROM loyalty_balance_snapshots
+            WHERE customer_id = :customer_id AND snapshot_date <= :as_of_day
+            ORDER BY snapshot_date DESC LIMIT 1
+        )
+        SELECT COALESCE((SELECT balance FROM snapshot), 0) + COALESCE((
+            SELECT SUM(points_earned - points_redeemed + bonus_points) FROM loyalty_transactions
+            WHERE customer_id = :customer_id
+              AND event_date >= COALESCE((SELECT strftime('%Y-%m-%d 00:00:00.000000', snapshot_date, '+1 day') FROM snapshot), '')
+              AND event_date < :day_end
+        ), 0)
+        """,
+        {
+            "customer_id": customer_id,
+            "as_of_day": pd.Timestamp(as_of).normalize().strftime(DATE_FORMAT),
+            "day_end": day_end(as_of),
+        }
+    ).scalar()
+
+
+def balances_as_of(conn, as_of) -> pd.DataFrame:
+    as_of_day = pd.Timestamp(as_of).normalize().strftime(DATE_FORMAT)
+    base = conn.exec_driver_sql(
+        "SELECT MAX(snapshot_date) FROM loyalty_balance_snapshots WHERE snapshot_date <= ?", (as_of_day,)
+    ).scalar()
+    snapshot = pd.read_sql(
+        "SELECT customer_id, balance FROM loyalty_balance_snapshots WHERE snapshot_date = ?",
+        conn, params=(base,)
+    ).set_index("customer_id")["balance"]
+    recent = pd.read_sql(
+        """
+        SELECT customer_id, SUM(points_earned - points_redeemed + bonus_points) AS balance
+        FROM loyalty_transactions
+        WHERE event_date >= ? AND event_date < ?
+        GROUP BY customer_id
+        """,
+        conn, params=(day_end(base) if base is not None else "", day_end(as_of))
+    ).set_index("customer_id")["balance"]
+    balances = snapshot.add(recent, fill_value=0).astype(int)
+    return balances.rename("balance").reset_index()
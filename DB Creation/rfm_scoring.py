@@ -0,0 +1,284 @@
+import json
+import numpy as np
+import pandas as pd
+
+RFM_QUANTILES = [0.2, 0.4, 0.6, 0.8]
+RFM_METRICS = {"recency": True, "frequency": False, "monetary": False}
+SKETCH_K = 400
+
+# Thresholds on R + F + M (3-15), as in the loyalty notebook's _segment_customer.
+SEGMENTS = [
+    (13, "Champions"),
+    (10, "Loyal Customers"),
+    (7, "Potential Loyalists"),
+    (5, "At Risk"),
+    (0, "Lost"),
+]
+
+
+# KLL-style quantile sketch. Items at level h stand for 2**h values; a full
+# level is sorted and every other item is promoted, so the sketch keeps
+# O(k log(n/k)) items with rank error around 1/k. Sketches built on separate
+# partitions merge into one that describes all of them.
+class QuantileSketch:
+    def __init__(self, k: int = SKETCH_K, seed: int = 0):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                leftover = items[len(items) - len(items) % 2:]
+                items = items[:len(items) - len(items) % 2]
+                promoted = items[self._rng.integers(2)::2]
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+                self.levels[level] = leftover
+            level += 1
+
+    def update(self, values) -> "QuantileSketch":
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        self.n += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def quantiles(self, qs) -> np.ndarray:
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2 ** h) for h, items in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        items, cumulative = items[order], np.cumsum(weights[order])
+        ranks = np.asarray(qs) * cumulative[-1]
+        return items[np.minimum(np.searchsorted(cumulative, ranks, side="left"), len(items) - 1)]
+
+    def rank(self, values, side: str = "left") -> np.ndarray:
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2 ** h) for h, items in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        cumulative = np.concatenate([[0], np.cumsum(weights[order])])
+        return cumulative[np.searchsorted(items[order], values, side=side)]
+
+    @property
+    def size(self) -> int:
+        return sum(len(items) for items in self.levels)
+
+    def to_json(self) -> str:
+        return json.dumps([items.tolist() for items in self.levels])
+
+    @classmethod
+    def from_json(cls, levels: str, n: int, k: int = SKETCH_K) -> "QuantileSketch":
+        sketch = cls(k)
+        sketch.levels = [np.asarray(items, dtype=float) for items in json.loads(levels)]
+        sketch.n = n
+        return sketch
+
+
+def exact_edges(values, qs=RFM_QUANTILES) -> np.ndarray:
+    values = np.asarray(values, dtype=float)
+    return np.quantile(values[~np.isnan(values)], qs)
+
+
+def sketch_rfm(analytics: pd.DataFrame, k: int = SKETCH_K) -> dict:
+    return {metric: QuantileSketch(k).update(analytics[metric]) for metric in RFM_METRICS}
+
+
+def merge_sketches(parts) -> dict:
+    parts = list(parts)
+    merged = parts[0]
+    for part in parts[1:]:
+        for metric in RFM_METRICS:
+            merged[metric].merge(part[metric])
+    return merged
+
+
+def rfm_edges(analytics: pd.DataFrame, method: str = "exact", sketches: dict = None) -> dict:
+    if method == "exact":
+        return {metric: exact_edges(analytics[metric]) for metric in RFM_METRICS}
+    if method == "sketch":
+        sketches = sketches or sketch_rfm(analytics)
+        return {metric: sketches[metric].quantiles(RFM_QUANTILES) for metric in RFM_METRICS}
+    raise ValueError(f"Unknown RFM edge method: {method}")
+
+
+def quintile_scores(values, edges, reverse: bool = False) -> np.ndarray:
+    scores = np.searchsorted(edges, np.asarray(values, dtype=float), side="left") + 1
+    return 6 - scores if reverse else scores
+
+
+def segment_names(rfm_score) -> np.ndarray:
+    rfm_score = np.asarray(rfm_score)
+    return np.select(
+        [rfm_score >= threshold for threshold, _ in SEGMENTS], [name for _, name in SEGMENTS], SEGMENTS[-1][1]
+    )
+
+
+def score_rfm(analytics: pd.DataFrame, edges: dict = None, method: str = "exact") -> pd.DataFrame:
+    if edges is None:
+        edges = rfm_edges(analytics, method)
+    rfm_score = sum(
+        quintile_scores(analytics[metric], edges[metric], reverse)
+        for metric, reverse in RFM_METRICS.items()
+    )
+    analytics["rfm_score"] = rfm_score
+    analytics["segment"] = segment_names(rfm_score)
+    return analytics
+
+
+def rescore_customers(conn, method: str = "exact", sketches: dict = None, snapshot_date=None) -> dict:
+    if method == "sketch" and sketches is not None:
+        edges = sketched_edges(sketches, snapshot_date)
+        score_in_db(conn, edges)
+        return edges
+    analytics = pd.read_sql("SELECT customer_id, recency, frequency, monetary FROM customer_analytics", conn)
+    edges = rfm_edges(analytics, method)
+    score_rfm(analytics, edges)
+    analytics[["customer_id", "rfm_score", "segment"]].to_sql("_rfm_scores", conn, if_exists="replace", index=False)
+    conn.exec_driver_sql(
+        """
+        UPDATE customer_analytics
+        SET rfm_score = s.rfm_score, segment = s.segment
+        FROM _rfm_scores s
+        WHERE s.customer_id = customer_analytics.customer_id
+        """
+    )
+    conn.exec_driver_sql("DROP TABLE _rfm_scores")
+    return edges
+
+
+# Incremental loads keep RFM sketches in rfm_sketches, so edges are read off
+# them instead of re-sorting every customer. A sketch cannot delete, so when a
+# customer's metrics change, the old values go into a second "removed" sketch
+# and ranks are taken as added minus removed. That error grows with the
+# removals, so the sketches are rebuilt from customer_aggregates once removals
+# pass REBUILD_RATIO of the customers. Recency moves with the snapshot date,
+# so it is sketched as the negated last purchase day and shifted when read.
+REBUILD_RATIO = 0.5
+EPOCH = pd.Timestamp("1970-01-01")
+SKETCH_PARTS = ["added", "removed"]
+SKETCH_DDL = """
+CREATE TABLE IF NOT EXISTS rfm_sketches (
+    metric VARCHAR,
+    part VARCHAR,
+    n INT,
+    levels TEXT,
+    PRIMARY KEY(metric, part)
+);
+"""
+
+
+def sketch_values(state: pd.DataFrame) -> dict:
+    return {
+        "recency": -(state["last_purchase_date"] - EPOCH).dt.days,
+        "frequency": state["txn_count"],
+        "monetary": state["amount_sum"].fillna(0),
+    }
+
+
+def build_sketches(state: pd.DataFrame, k: int = SKETCH_K) -> dict:
+    values = sketch_values(state)
+    return {metric: (QuantileSketch(k).update(values[metric]), QuantileSketch(k)) for metric in RFM_METRICS}
+
+
+def add_to_sketches(sketches: dict, before: pd.DataFrame, after: pd.DataFrame) -> bool:
+    old, new = sketch_values(before), sketch_values(after)
+    for metric, (added, removed) in sketches.items():
+        added.update(new[metric])
+        removed.update(old[metric])
+    return all(removed.n <= REBUILD_RATIO * (added.n - removed.n) for added, removed in sketches.values())
+
+
+def save_sketches(conn, sketches: dict):
+    conn.exec_driver_sql(SKETCH_DDL)
+    conn.exec_driver_sql("DELETE FROM rfm_sketches")
+    conn.exec_driver_sql(
+        "INSERT INTO rfm_sketches (metric, part, n, levels) VALUES (?, ?, ?, ?)",
+        [(metric, part, sketch.n, sketch.to_json())
+         for metric, pair in sketches.items() for part, sketch in zip(SKETCH_PARTS, pair)]
+    )
+
+
+def load_sketches(conn):
+    exists = conn.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'rfm_sketches'"
+    ).fetchone()
+    if exists is None:
+        return None
+    stored = {
+        (metric, part): QuantileSketch.from_json(levels, n)
+        for metric, part, n, levels in conn.exec_driver_sql("SELECT metric, part, n, levels FROM rfm_sketches")
+    }
+    if len(stored) != len(RFM_METRICS) * len(SKETCH_PARTS):
+        return None
+    return {metric: tuple(stored[(metric, part)] for part in SKETCH_PARTS) for metric in RFM_METRICS}
+
+
+def signed_quantiles(added: QuantileSketch, removed: QuantileSketch, qs) -> np.ndarray:
+    items = np.unique(np.concatenate(added.levels))
+    ranks = np.maximum.accumulate(added.rank(items, side="right") - removed.rank(items, side="right"))
+    targets = np.asarray(qs) * (added.n - removed.n)
+    return items[np.minimum(np.searchsorted(ranks, targets, side="left"), len(items) - 1)]
+
+
+def sketched_edges(sketches: dict, snapshot_date) -> dict:
+    edges = {metric: signed_quantiles(added, removed, RFM_QUANTILES) for metric, (added, removed) in sketches.items()}
+    edges["recency"] = edges["recency"] + (pd.Timestamp(snapshot_date) - EPOCH).days
+    return edges
+
+
+# The same scores as score_rfm, computed in place: a missing value sorts
+# above every edge, as it does in np.searchsorted.
+def score_in_db(conn, edges: dict):
+    terms, params = [], []
+    for metric, reverse in RFM_METRICS.items():
+        above = " + ".join(f"COALESCE({metric} > ?, 1)" for _ in RFM_QUANTILES)
+        terms.append(f"(5 - ({above}))" if reverse else f"(1 + {above})")
+        params += [float(edge) for edge in edges[metric]]
+    segment = " ".join(f"WHEN rfm_score >= {threshold} THEN '{name}'" for threshold, name in SEGMENTS[:-1])
+    conn.exec_driver_sql(f"UPDATE customer_analytics SET rfm_score = {' + '.join(terms)}", tuple(params))
+    conn.exec_driver_sql(f"UPDATE customer_analytics SET segment = CASE {segment} ELSE '{SEGMENTS[-1][1]}' END")
+
+
+def edge_error_report(analytics: pd.DataFrame, sketch_edges: dict, exact: dict = None) -> pd.DataFrame:
+    exact = exact or rfm_edges(analytics, "exact")
+    rows = []
+    for metric, reverse in RFM_METRICS.items():
+        values = np.sort(analytics[metric].dropna().to_numpy(dtype=float))
+        changed = (
+            quintile_scores(analytics[metric], exact[metric], reverse)
+            != quintile_scores(analytics[metric], sketch_edges[metric], reverse)
+        ).mean()
+        for q, exact_edge, sketch_edge in zip(RFM_QUANTILES, exact[metric], sketch_edges[metric]):
+            # Tied values share a rank interval; q inside it is no error.
+            low = np.searchsorted(values, sketch_edge, side="left")
+            high = np.searchsorted(values, sketch_edge, side="right")
+            rows.append({
+                "metric": metric,
+                "quantile": q,
+                "exact_edge": exact_edge,
+                "sketch_edge": sketch_edge,
+                "abs_error": abs(sketch_edge - exact_edge),
+                "rel_error": abs(sketch_edge - exact_edge) / abs(exact_edge) if exact_edge else np.nan,
+                "rank_error": max(low / len(values) - q, q - high / len(values), 0),
+                "scores_changed": changed,
+            })
+    return pd.DataFrame(rows)
@@ -0,0 +1,80 @@
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+
+from loyalty_ledger import append_events, check_ledger, current_balance
+
+
+@pytest.fixture
+def conn():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            """
+            CREATE TABLE customer_master (
+                customer_id VARCHAR PRIMARY KEY,
+                total_loyalty_points INT,
+                bonus_points INT,
+                last_points_update DATE
+            )
+            """
+        )
+        conn.exec_driver_sql(
+            """
+            CREATE TABLE loyalty_transactions (
+                loyalty_txn_id VARCHAR PRIMARY KEY,
+                customer_id VARCHAR,
+                transaction_id VARCHAR,
+                points_earned INT,
+                points_redeemed INT,
+                bonus_points INT,
+                balance_after INT,
+                event_date DATE,
+                event_type VARCHAR
+            )
+            """
+        )
+        conn.exec_driver_sql("INSERT INTO customer_master VALUES ('C1', 0, 0, NULL), ('C2', 0, 0, NULL)")
+        yield conn
+
+
+def assert_consistent(conn):
+    report = check_ledger(conn)
+    assert report["chain_breaks"].empty
+    assert report["balance_mismatches"].empty
+    assert report["recorded_event_mismatches"].empty
+
+
+def test_reversal_only_batch(conn):
+    append_events(conn, pd.DataFrame({
+        "customer_id": ["C1", "C2"], "transaction_id": ["T1", "T2"],
+        "event_date": ["2024-01-01", "2024-01-01"], "event_type": ["EARN", "EARN"], "points": [100, 40],
+    }))
+    spent = append_events(conn, pd.DataFrame({
+        "customer_id": ["C1", "C2"], "event_date": ["2024-01-02", "2024-01-02"],
+        "event_type": ["REDEEM", "BONUS"], "points": [30, 5],
+    }))
+    rows = append_events(conn, pd.DataFrame({
+        "customer_id": ["C1", "C2"], "event_date": ["2024-01-03", "2024-01-03"],
+        "event_type": ["REVERSAL", "REVERSAL"], "reverses": spent["loyalty_txn_id"].tolist(),
+    }))
+
+    assert rows["balance_after"].tolist() == [100, 40]
+    assert current_balance(conn, "C1") == 100
+    assert current_balance(conn, "C2") == 40
+    assert_consistent(conn)
+
+
+def test_reversal_cannot_repeat(conn):
+    append_events(conn, pd.DataFrame({
+        "customer_id": ["C1"], "transaction_id": ["T1"], "event_date": ["2024-01-01"],
+        "event_type": ["EARN"], "points": [100],
+    }))
+    reversal = pd.DataFrame({
+        "customer_id": ["C1"], "event_date": ["2024-01-02"], "event_type": ["REVERSAL"], "reverses": ["LT1"],
+    })
+    append_events(conn, reversal)
+    with pytest.raises(ValueError):
+        append_events(conn, reversal)
+    assert current_balance(conn, "C1") == 0
+    assert_consistent(conn)
@@ -0,0 +1,59 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+
+from eda_plots import boxplot_jobs, category_jobs, correlation_job, histogram_jobs, render_plots
+
+TOP_CATEGORIES = 20
+
+
+def eda_jobs(df):
+    numeric_cols = list(df.select_dtypes(include=[np.number]).columns)
+    cat_cols = [c for c in df.columns if c not in numeric_cols and df[c].nunique(dropna=False) < 200]
+    jobs = histogram_jobs(df, numeric_cols, bins=50) + boxplot_jobs(df, numeric_cols)
+    jobs += category_jobs(df, cat_cols, top_n=TOP_CATEGORIES)
+    if len(numeric_cols) > 1:
+        jobs.append(correlation_job(df, numeric_cols)[0])
+    return jobs
+
+
+def timed_render(df, plots_dir, workers):
+    start = time.perf_counter()
+    run = render_plots(eda_jobs(df), plots_dir, n_workers=workers)
+    run["secs"] = time.perf_counter() - start
+    return run
+
+
+if __name__ == "__main__":
+    df = pd.read_csv(sys.argv[1])
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    plots_dir = tempfile.mkdtemp(prefix="eda_plots_")
+
+    print("=" * 80)
+    print("EDA PLOTS: COLD RENDER vs CACHED RERUN")
+    print("=" * 80)
+    print(f"Rows: {len(df):,}, workers: {workers}\n")
+
+    try:
+        runs = []
+        if workers > 1:
+            runs.append(("cold, 1 worker", timed_render(df, plots_dir, 1)))
+            shutil.rmtree(plots_dir)
+        runs.append((f"cold, {workers} workers", timed_render(df, plots_dir, workers)))
+        runs.append(("warm rerun", timed_render(df, plots_dir, workers)))
+        col = df.select_dtypes(include=[np.number]).columns[-1]
+        df.loc[df.index[0], col] = df[col].max() + 1
+        runs.append((f"after editing {col}", timed_render(df, plots_dir, workers)))
+    finally:
+        shutil.rmtree(plots_dir, ignore_errors=True)
+
+    print(f"{'Run':<28} {'Rendered':>9} {'Skipped':>8} {'Time (s)':>9}")
+    for name, run in runs:
+        print(f"{name:<28} {run['rendered']:>9} {run['skipped']:>8} {run['secs']:>9.2f}")
+    cold, warm = runs[-3][1], runs[-2][1]
+    print(f"\nWarm rerun (hashing included) is {cold['secs'] / warm['secs']:.0f}x faster than a cold render")
+    print(f"matplotlib imported by this process: {'matplotlib' in sys.modules}")
@@ -0,0 +1,94 @@
+import sys
+import time
+import resource
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+from stream_profiler import CHUNKSIZE, _date_columns, parse_dates_vectorized, profile_csv
+
+QUANTILES = [0.25, 0.5, 0.75]
+
+
+def exact_stats(path):
+    start = time.perf_counter()
+    df = pd.read_csv(path)
+    for col in _date_columns(df.columns):
+        df[col + '_parsed'] = parse_dates_vectorized(df[col])
+    numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+    categorical_cols = df.select_dtypes(include=['object']).columns.tolist()
+    stats = {
+        'unique': df.nunique(),
+        'memory_mb': df.memory_usage(deep=True).sum() / 1024**2,
+        'quantiles': {col: df[col].quantile(QUANTILES).to_numpy() for col in numeric_cols},
+        'values': {col: np.sort(df[col].dropna().to_numpy()) for col in numeric_cols},
+        'skew': df[numeric_cols].skew(),
+        'corr': df[numeric_cols].corr(),
+        'top': {col: df[col].value_counts().head(10) for col in categorical_cols},
+        'duplicates': int(df.duplicated().sum()),
+    }
+    stats['secs'] = time.perf_counter() - start
+    stats['peak_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return stats
+
+
+def stream_stats(path, chunksize):
+    start = time.perf_counter()
+    p = profile_csv(path, chunksize)
+    stats = {
+        'unique': pd.Series({col: p.unique(col) for col in p.all_columns}),
+        'quantiles': {col: np.array([p.quantile(col, q) for q in QUANTILES]) for col in p.numeric_cols},
+        'skew': pd.Series(p.moments.skew(), index=p.numeric_cols),
+        'corr': pd.DataFrame(p.correlation.matrix(), index=p.numeric_cols, columns=p.numeric_cols),
+        'top': {col: p.top[col].top(10) for col in p.categorical_cols},
+        'duplicates': p.duplicate_rows,
+        'memory_mb': p.parsed_memory / 1024**2,
+    }
+    stats['secs'] = time.perf_counter() - start
+    stats['peak_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return stats
+
+
+def rank_distance(values, estimates):
+    low = np.searchsorted(values, estimates, side='left') / len(values)
+    high = np.searchsorted(values, estimates, side='right') / len(values)
+    return np.maximum.reduce([low - QUANTILES, np.subtract(QUANTILES, high), np.zeros(len(QUANTILES))])
+
+
+def isolated(fn, *args):
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        return pool.submit(fn, *args).result()
+
+
+if __name__ == "__main__":
+    path = sys.argv[1]
+    chunksize = int(sys.argv[2]) if len(sys.argv) > 2 else CHUNKSIZE
+
+    exact = isolated(exact_stats, path)
+    stream = isolated(stream_stats, path, chunksize)
+
+    print("=" * 80)
+    print("EDA PROFILE: IN-MEMORY vs SINGLE-PASS STREAMING")
+    print("=" * 80)
+    print(f"{'Method':<12} {'Time (s)':>9} {'Peak RSS (MB)':>14}")
+    print(f"{'in-memory':<12} {exact['secs']:>9.2f} {exact['peak_mb']:>14.0f}")
+    print(f"{'streaming':<12} {stream['secs']:>9.2f} {stream['peak_mb']:>14.0f}   (chunks of {chunksize:,})")
+
+    unique_error = (stream['unique'] - exact['unique'][stream['unique'].index]).abs() / exact['unique'][stream['unique'].index]
+    rank_error = max(
+        rank_distance(exact['values'][col], stream['quantiles'][col]).max() for col in stream['quantiles']
+    )
+    # a near-unique column can have no value the summary can vouch for, and
+    # then its top value counts as missed
+    top_match = np.mean([
+        len(stream['top'][col]) > 0 and stream['top'][col].index[0] == exact['top'][col].index[0]
+        and stream['top'][col].iloc[0] == exact['top'][col].iloc[0]
+        for col in stream['top'] if len(exact['top'][col])
+    ])
+    print(f"\nDistinct counts (HyperLogLog): max error {unique_error.max():.2%}, mean {unique_error.mean():.2%}")
+    print(f"Quartiles (sketch): max rank error {rank_error:.3%}")
+    print(f"Skewness: max abs difference {(stream['skew'] - exact['skew']).abs().max():.2e}")
+    print(f"Correlation: max abs difference {(stream['corr'] - exact['corr']).abs().max().max():.2e}")
+    print(f"Most frequent value and count exact for {top_match:.0%} of categorical columns")
+    print(f"Duplicate rows: {stream['duplicates']:,} (exact {exact['duplicates']:,})")
+    print(f"Data size in memory: {exact['memory_mb']:,.0f} MB")
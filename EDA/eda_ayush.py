@@ -1,336 +1,283 @@
+import os
+import sys
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+from stream_profiler import CHUNKSIZE, profile_csv
+
 pd.set_option('display.max_columns', None)
 pd.set_option('display.max_rows', 100)
 pd.set_option('display.float_format', lambda x: '%.2f' % x)
 
-plt.style.use('seaborn-v0_8-darkgrid')
-sns.set_palette("husl")
-
-def parse_date_robust(date_str):
-    if pd.isna(date_str) or str(date_str).strip() == '':
-        return pd.NaT
-    
-    date_formats = [
-        '%m-%d-%y',
-        '%d-%m-%y',
-        '%m/%d/%y',
-        '%d/%m/%y',
-        '%m-%d-%Y',
-        '%d-%m-%Y',
-        '%m/%d/%Y',
-        '%d/%m/%Y',
-        '%Y-%m-%d',
-        '%Y/%m/%d',
-        '%d.%m.%Y',
-        '%d.%m.%y',
-        '%Y%m%d',
-        '%m%d%Y',
-        '%b %d, %Y',
-        '%B %d, %Y',
-        '%d %b %Y',
-        '%d %B %Y',
-    ]
-    
-    for fmt in date_formats:
-        try:
-            parsed = pd.to_datetime(date_str, format=fmt)
-            if fmt.endswith('%y') and parsed.year > 2050:
-                parsed = parsed.replace(year=parsed.year - 100)
-            return parsed
-        except:
-            continue
-    
-    try:
-        return pd.to_datetime(date_str, infer_datetime_format=True)
-    except:
-        return pd.NaT
-
-print("COMPREHENSIVE EXPLORATORY DATA ANALYSIS")
-print("Retail Transactional Dataset")
-print(f"Analysis Start Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-
-df = pd.read_csv('/kaggle/input/retail-transactional-dataset/retail_data.csv')
-
-print("SECTION 1: DATASET OVERVIEW")
-print(f"\nRows: {df.shape[0]:,}")
-print(f"Columns: {df.shape[1]}")
-print(f"Memory Usage: {df.memory_usage(deep=True).sum() / 1024**2:.2f} MB")
-print(f"Duplicate Rows: {df.duplicated().sum():,} ({df.duplicated().sum()/len(df)*100:.2f}%)")
-
-print("SECTION 2: COLUMN INFORMATION")
-
-column_info = pd.DataFrame({
-    'Column': df.columns,
-    'Data Type': df.dtypes.values,
-    'Non-Null': [df[col].count() for col in df.columns],
-    'Null Count': [df[col].isnull().sum() for col in df.columns],
-    'Null %': [f"{(df[col].isnull().sum()/len(df)*100):.2f}%" for col in df.columns],
-    'Unique': [df[col].nunique() for col in df.columns],
-})
-print("\n" + column_info.to_string(index=False))
-
-print("SECTION 3: DATA PREVIEW")
-print("\nFirst 5 Rows:")
-print(df.head())
-print("\nLast 5 Rows:")
-print(df.tail())
-print("\nRandom 5 Rows:")
-print(df.sample(min(5, len(df))))
-
-print("SECTION 4: DATE/TIME STANDARDIZATION")
-
-date_cols = [col for col in df.columns if any(keyword in col.lower() for keyword in ['date', 'time', 'timestamp'])]
-
-if date_cols:
-    for col in date_cols:
-        print(f"\nProcessing: {col}")
-        print("-"*80)
-        
-        original_sample = df[col].head(10)
-        print(f"Original Format Sample:\n{original_sample}")
-        
-        df[col + '_parsed'] = df[col].apply(parse_date_robust)
-        
-        parsed_count = df[col + '_parsed'].notna().sum()
-        unparsed_count = df[col + '_parsed'].isna().sum() - df[col].isna().sum()
-        
-        print(f"\nSuccessfully Parsed: {parsed_count:,} ({parsed_count/len(df)*100:.2f}%)")
-        print(f"Failed to Parse: {unparsed_count:,} ({unparsed_count/len(df)*100:.2f}%)")
-        
-        if unparsed_count > 0:
-            print(f"\nUnparseable Date Samples:")
-            unparsed_mask = df[col + '_parsed'].isna() & df[col].notna()
-            print(df.loc[unparsed_mask, col].head(10))
-        
-        print(f"\nStandardized Format Sample:")
-        print(df[col + '_parsed'].head(10))
-        
-        if df[col + '_parsed'].notna().any():
-            print(f"\nDate Range:")
-            print(f"  Earliest: {df[col + '_parsed'].min()}")
-            print(f"  Latest: {df[col + '_parsed'].max()}")
-            print(f"  Span: {(df[col + '_parsed'].max() - df[col + '_parsed'].min()).days} days")
-            
-            current_time = pd.Timestamp.now()
-            future_dates = df[col + '_parsed'] > current_time
-            if future_dates.any():
-                print(f"\n⚠️  Future Dates Detected: {future_dates.sum():,} records")
-                print(f"Sample Future Dates:")
-                print(df.loc[future_dates, [col, col + '_parsed']].head())
-else:
-    print("\nNo date/time columns detected")
-
-print("SECTION 5: MISSING VALUES ANALYSIS")
-
-missing_data = pd.DataFrame({
-    'Column': df.columns,
-    'Missing': df.isnull().sum(),
-    'Missing %': (df.isnull().sum() / len(df) * 100).round(2),
-})
-missing_data = missing_data[missing_data['Missing'] > 0].sort_values('Missing', ascending=False)
-
-if len(missing_data) > 0:
-    print(f"\nColumns with Missing Values: {len(missing_data)}")
-    print(missing_data.to_string(index=False))
-    print(f"\nTotal Missing Cells: {df.isnull().sum().sum():,}")
-    print(f"Overall Missing %: {(df.isnull().sum().sum() / (df.shape[0] * df.shape[1]) * 100):.2f}%")
-else:
-    print("\n✓ No missing values found")
-
-print("SECTION 6: STATISTICAL SUMMARY")
-
-numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-
-if numeric_cols:
-    print("\nNumerical Columns:")
-    print(df[numeric_cols].describe().T)
-    
-    print("\nAdvanced Statistics:")
-    advanced_stats = pd.DataFrame({
-        'Column': numeric_cols,
-        'Median': [df[col].median() for col in numeric_cols],
-        'Variance': [df[col].var() for col in numeric_cols],
-        'Skewness': [df[col].skew() for col in numeric_cols],
-        'Kurtosis': [df[col].kurtosis() for col in numeric_cols],
-        'IQR': [df[col].quantile(0.75) - df[col].quantile(0.25) for col in numeric_cols]
+INPUT_PATH = '/kaggle/input/retail-transactional-dataset/retail_data.csv'
+PROBLEMATIC_PATH = '/kaggle/working/problematic_rows.csv'
+
+
+def print_report(p):
+    n = p.rows
+    numeric_cols = p.numeric_cols
+    categorical_cols = p.categorical_cols
+
+    print("SECTION 1: DATASET OVERVIEW")
+    print(f"\nRows: {n:,}")
+    print(f"Columns: {len(p.columns)}")
+    print(f"Memory Usage: {p.memory / 1024**2:.2f} MB")
+    print(f"Duplicate Rows: {p.duplicate_rows:,} ({p.duplicate_rows/n*100:.2f}%)")
+
+    print("SECTION 2: COLUMN INFORMATION")
+
+    # Distinct counts are HyperLogLog estimates (standard error ~0.8%) unless a column
+    # has few enough values to be counted exactly.
+    unique = {col: p.unique(col) for col in p.all_columns}
+    nulls = p.nulls
+    column_info = pd.DataFrame({
+        'Column': p.columns,
+        'Data Type': p.dtypes.values,
+        'Non-Null': [n - nulls[col] for col in p.columns],
+        'Null Count': [nulls[col] for col in p.columns],
+        'Null %': [f"{(nulls[col]/n*100):.2f}%" for col in p.columns],
+        'Unique (approx.)': [unique[col] for col in p.columns],
     })
-    print(advanced_stats.to_string(index=False))
-
-categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
-categorical_cols = [col for col in categorical_cols if '_parsed' not in col]
-
-if categorical_cols:
-    print("Categorical Columns:")
-    cat_summary = pd.DataFrame({
-        'Column': categorical_cols,
-        'Unique': [df[col].nunique() for col in categorical_cols],
-        'Most Frequent': [df[col].mode()[0] if len(df[col].mode()) > 0 else 'N/A' for col in categorical_cols],
-        'Frequency': [df[col].value_counts().iloc[0] if len(df[col]) > 0 else 0 for col in categorical_cols],
-        'Frequency %': [f"{(df[col].value_counts().iloc[0]/len(df)*100):.2f}%" if len(df[col]) > 0 else "0%" for col in categorical_cols]
+    print("\n" + column_info.to_string(index=False))
+
+    print("SECTION 3: DATA PREVIEW")
+    print("\nFirst 5 Rows:")
+    print(p.head)
+    print("\nLast 5 Rows:")
+    print(p.tail)
+    print("\nRandom 5 Rows:")
+    print(p.sample)
+
+    print("SECTION 4: DATE/TIME STANDARDIZATION")
+
+    if p.date_cols:
+        for col in p.date_cols:
+            stats = p.dates[col]
+            print(f"\nProcessing: {col}")
+            print("-"*80)
+
+            print(f"Original Format Sample:\n{stats['original_sample']}")
+
+            print(f"\nSuccessfully Parsed: {stats['parsed']:,} ({stats['parsed']/n*100:.2f}%)")
+            print(f"Failed to Parse: {stats['unparsed']:,} ({stats['unparsed']/n*100:.2f}%)")
+
+            if stats['unparsed'] > 0:
+                print(f"\nUnparseable Date Samples:")
+                print(pd.concat(stats['unparsed_sample']).head(10))
+
+            print(f"\nStandardized Format Sample:")
+            print(stats['parsed_sample'])
+
+            if pd.notna(stats['min']):
+                print(f"\nDate Range:")
+                print(f"  Earliest: {stats['min']}")
+                print(f"  Latest: {stats['max']}")
+                print(f"  Span: {(stats['max'] - stats['min']).days} days")
+
+                if stats['future']:
+                    print(f"\n⚠️  Future Dates Detected: {stats['future']:,} records")
+                    print(f"Sample Future Dates:")
+                    print(pd.concat(stats['future_sample']).head())
+    else:
+        print("\nNo date/time columns detected")
+
+    print("SECTION 5: MISSING VALUES ANALYSIS")
+
+    missing_data = pd.DataFrame({
+        'Column': p.all_columns,
+        'Missing': nulls,
+        'Missing %': (nulls / n * 100).round(2),
     })
-    print(cat_summary.to_string(index=False))
-
-print("SECTION 7: DATA QUALITY ISSUES")
-
-problematic_rows = pd.DataFrame(index=df.index)
-problematic_rows['issues'] = ''
-issue_summary = {}
-
-missing_rows = df.isnull().any(axis=1)
-if missing_rows.any():
-    count = missing_rows.sum()
-    issue_summary['Missing Values'] = count
-    problematic_rows.loc[missing_rows, 'issues'] += 'Missing values; '
-    print(f"\nRows with Missing Values: {count:,} ({count/len(df)*100:.2f}%)")
-
-duplicates = df.duplicated(keep=False)
-if duplicates.any():
-    count = duplicates.sum()
-    issue_summary['Duplicates'] = count
-    problematic_rows.loc[duplicates, 'issues'] += 'Duplicate; '
-    print(f"Duplicate Rows: {count:,} ({count/len(df)*100:.2f}%)")
-
-for col in numeric_cols:
-    negative_vals = df[col] < 0
-    if negative_vals.any():
-        count = negative_vals.sum()
-        if 'Negative Values' not in issue_summary:
-            issue_summary['Negative Values'] = 0
-        issue_summary['Negative Values'] += count
-        problematic_rows.loc[negative_vals, 'issues'] += f'Negative {col}; '
-        print(f"Negative Values in '{col}': {count:,} ({count/len(df)*100:.2f}%)")
-
-critical_cols = [col for col in numeric_cols if any(kw in col.lower() for kw in ['price', 'amount', 'quantity', 'total', 'cost'])]
-for col in critical_cols:
-    zero_vals = df[col] == 0
-    if zero_vals.any():
-        count = zero_vals.sum()
-        if 'Zero Values' not in issue_summary:
-            issue_summary['Zero Values'] = 0
-        issue_summary['Zero Values'] += count
-        problematic_rows.loc[zero_vals, 'issues'] += f'Zero {col}; '
-        print(f"Zero Values in '{col}': {count:,} ({count/len(df)*100:.2f}%)")
-
-print("Outlier Detection (IQR Method, 3*IQR threshold):")
-for col in numeric_cols:
-    Q1 = df[col].quantile(0.25)
-    Q3 = df[col].quantile(0.75)
-    IQR = Q3 - Q1
-    outliers = ((df[col] < (Q1 - 3 * IQR)) | (df[col] > (Q3 + 3 * IQR)))
-    if outliers.any():
-        count = outliers.sum()
-        print(f"  {col}: {count:,} outliers ({count/len(df)*100:.2f}%)")
-
-for col in categorical_cols:
-    empty_strings = df[col].astype(str).str.strip() == ''
-    if empty_strings.any():
-        count = empty_strings.sum()
-        if 'Empty Strings' not in issue_summary:
-            issue_summary['Empty Strings'] = 0
-        issue_summary['Empty Strings'] += count
-        problematic_rows.loc[empty_strings, 'issues'] += f'Empty {col}; '
-        print(f"Empty Strings in '{col}': {count:,}")
+    missing_data = missing_data[missing_data['Missing'] > 0].sort_values('Missing', ascending=False)
 
-print("DATA QUALITY SUMMARY")
-total_problematic = (problematic_rows['issues'] != '').sum()
-print(f"\nProblematic Rows: {total_problematic:,} ({total_problematic/len(df)*100:.2f}%)")
-print(f"Clean Rows: {len(df) - total_problematic:,} ({(len(df)-total_problematic)/len(df)*100:.2f}%)")
-
-if issue_summary:
-    print("\nIssue Breakdown:")
-    for issue, count in sorted(issue_summary.items(), key=lambda x: x[1], reverse=True):
-        print(f"  {issue}: {count:,}")
-
-if total_problematic > 0:
-    print("Sample Problematic Rows (First 10):")
-    problematic_df = df[problematic_rows['issues'] != ''].copy()
-    problematic_df['Data_Quality_Issues'] = problematic_rows.loc[problematic_rows['issues'] != '', 'issues']
-    print(problematic_df.head(10))
-    
-    problematic_df.to_csv('/kaggle/working/problematic_rows.csv', index=False)
-    print(f"\n✓ Saved to: /kaggle/working/problematic_rows.csv")
-
-print("SECTION 8: UNIQUE VALUES & CARDINALITY")
-
-unique_analysis = pd.DataFrame({
-    'Column': df.columns,
-    'Unique': [df[col].nunique() for col in df.columns],
-    'Unique %': [f"{(df[col].nunique()/len(df)*100):.2f}%" for col in df.columns],
-    'Cardinality': ['High' if df[col].nunique()/len(df) > 0.5 else 'Medium' if df[col].nunique()/len(df) > 0.05 else 'Low' for col in df.columns]
-})
-print("\n" + unique_analysis.sort_values('Unique', ascending=False).to_string(index=False))
-
-print("Value Distributions (Low Cardinality Columns):")
-for col in categorical_cols:
-        print(f"\n{col} ({df[col].nunique()} unique values):")
-        value_counts = df[col].value_counts()
-        value_pcts = df[col].value_counts(normalize=True) * 100
-        for val, count in value_counts.head(10).items():
-            print(f"  {str(val):<30} : {count:>8,} ({value_pcts[val]:>6.2f}%)")
-        if df[col].nunique() > 10:
-            print(f"  ... and {df[col].nunique() - 10} more values")
-
-if len(numeric_cols) > 1:
-    print("SECTION 9: CORRELATION ANALYSIS")
-    
-    corr_matrix = df[numeric_cols].corr()
-    print("\nCorrelation Matrix:")
-    print(corr_matrix)
-    
-    print("\nHighly Correlated Pairs (|r| > 0.7):")
-    high_corr = []
-    for i in range(len(corr_matrix.columns)):
-        for j in range(i+1, len(corr_matrix.columns)):
-            corr_val = corr_matrix.iloc[i, j]
-            if abs(corr_val) > 0.7:
-                high_corr.append((corr_matrix.columns[i], corr_matrix.columns[j], corr_val))
-    
-    if high_corr:
-        for col1, col2, corr in sorted(high_corr, key=lambda x: abs(x[2]), reverse=True):
-            print(f"  {col1} ↔ {col2}: {corr:.3f}")
+    if len(missing_data) > 0:
+        print(f"\nColumns with Missing Values: {len(missing_data)}")
+        print(missing_data.to_string(index=False))
+        print(f"\nTotal Missing Cells: {nulls.sum():,}")
+        print(f"Overall Missing %: {(nulls.sum() / (n * len(p.all_columns)) * 100):.2f}%")
     else:
-        print("  None found")
-
-print("SECTION 10: DISTRIBUTION CHARACTERISTICS")
-
-for col in numeric_cols:
-    print(f"\n{col}:")
-    print(f"  Range: [{df[col].min():.2f}, {df[col].max():.2f}]")
-    print(f"  Mean: {df[col].mean():.2f}, Median: {df[col].median():.2f}")
-    print(f"  Std Dev: {df[col].std():.2f}")
-    print(f"  Skewness: {df[col].skew():.2f} ({'Right-skewed' if df[col].skew() > 0 else 'Left-skewed' if df[col].skew() < 0 else 'Symmetric'})")
-    print(f"  Kurtosis: {df[col].kurtosis():.2f} ({'Heavy-tailed' if df[col].kurtosis() > 0 else 'Light-tailed'})")
-
-print("SECTION 11: FINAL SUMMARY & RECOMMENDATIONS")
-
-print(f"\nDataset: {len(df):,} rows × {len(df.columns)} columns")
-print(f"Numerical Columns: {len(numeric_cols)}")
-print(f"Categorical Columns: {len(categorical_cols)}")
-print(f"Memory: {df.memory_usage(deep=True).sum() / 1024**2:.2f} MB")
-
-quality_score = ((len(df) - total_problematic) / len(df)) * 100
-print(f"\nData Quality Score: {quality_score:.2f}%")
-print(f"Clean Rows: {len(df) - total_problematic:,}")
-print(f"Problematic Rows: {total_problematic:,}")
-
-print("\nRecommendations:")
-if missing_rows.any():
-    print(f"  1. Handle {missing_rows.sum():,} rows with missing values")
-if duplicates.any():
-    print(f"  2. Review {duplicates.sum():,} duplicate rows")
-if 'Negative Values' in issue_summary:
-    print(f"  3. Investigate {issue_summary['Negative Values']} negative values")
-if 'Zero Values' in issue_summary:
-    print(f"  4. Review {issue_summary['Zero Values']} zero values")
-if not issue_summary:
-    print("Data quality is excellent!")
-
-print("EDA COMPLETE")
-print(f"Completed at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
\ No newline at end of file
+        print("\n✓ No missing values found")
+
+    print("SECTION 6: STATISTICAL SUMMARY")
+
+    m = p.moments
+    std = np.sqrt(m.var())
+    median = [p.quantile(col, 0.5) for col in numeric_cols]
+    q1 = np.array([p.quantile(col, 0.25) for col in numeric_cols])
+    q3 = np.array([p.quantile(col, 0.75) for col in numeric_cols])
+
+    if numeric_cols:
+        print("\nNumerical Columns:")
+        print(pd.DataFrame({
+            'count': m.n, 'mean': m.mean, 'std': std, 'min': m.min,
+            '25%': q1, '50%': median, '75%': q3, 'max': m.max,
+        }, index=numeric_cols))
+
+        print("\nAdvanced Statistics:")
+        advanced_stats = pd.DataFrame({
+            'Column': numeric_cols,
+            'Median': median,
+            'Variance': m.var(),
+            'Skewness': m.skew(),
+            'Kurtosis': m.kurtosis(),
+            'IQR': q3 - q1,
+        })
+        print(advanced_stats.to_string(index=False))
+
+    # Counts are exact. For columns with more distinct values than the
+    # profiler tracks, only values above the bound are listed; every other
+    # value occurs at most that many times.
+    top = {col: p.top[col].top() for col in categorical_cols}
+    bound = {col: p.top[col].error for col in categorical_cols}
+    if categorical_cols:
+        print("Categorical Columns:")
+        cat_summary = pd.DataFrame({
+            'Column': categorical_cols,
+            'Unique (approx.)': [unique[col] for col in categorical_cols],
+            'Most Frequent': [top[col].index[0] if len(top[col]) else 'N/A' for col in categorical_cols],
+            'Frequency': [top[col].iloc[0] if len(top[col]) else f"<= {bound[col]:,}" for col in categorical_cols],
+            'Frequency %': [f"{(top[col].iloc[0]/n*100):.2f}%" if len(top[col]) else "N/A" for col in categorical_cols],
+            'Others at most': [f"{bound[col]:,}" if bound[col] else '-' for col in categorical_cols],
+        })
+        print(cat_summary.to_string(index=False))
+
+    print("SECTION 7: DATA QUALITY ISSUES")
+
+    issue_summary = {}
+    if p.missing_rows:
+        issue_summary['Missing Values'] = p.missing_rows
+        print(f"\nRows with Missing Values: {p.missing_rows:,} ({p.missing_rows/n*100:.2f}%)")
+
+    if p.duplicate_group_rows:
+        issue_summary['Duplicates'] = p.duplicate_group_rows
+        print(f"Duplicate Rows: {p.duplicate_group_rows:,} ({p.duplicate_group_rows/n*100:.2f}%)")
+
+    for col, count in p.negative[p.negative > 0].items():
+        issue_summary['Negative Values'] = issue_summary.get('Negative Values', 0) + count
+        print(f"Negative Values in '{col}': {count:,} ({count/n*100:.2f}%)")
+
+    for col, count in p.zero[p.zero > 0].items():
+        issue_summary['Zero Values'] = issue_summary.get('Zero Values', 0) + count
+        print(f"Zero Values in '{col}': {count:,} ({count/n*100:.2f}%)")
+
+    print("Outlier Detection (IQR Method, 3*IQR threshold):")
+    for col in numeric_cols:
+        count = p.outliers(col)
+        if count:
+            print(f"  {col}: {count:,} outliers ({count/n*100:.2f}%)")
+
+    for col, count in p.empty[p.empty > 0].items():
+        issue_summary['Empty Strings'] = issue_summary.get('Empty Strings', 0) + count
+        print(f"Empty Strings in '{col}': {count:,}")
+
+    print("DATA QUALITY SUMMARY")
+    total_problematic = p.problematic_rows
+    print(f"\nProblematic Rows: {total_problematic:,} ({total_problematic/n*100:.2f}%)")
+    print(f"Clean Rows: {n - total_problematic:,} ({(n-total_problematic)/n*100:.2f}%)")
+
+    if issue_summary:
+        print("\nIssue Breakdown:")
+        for issue, count in sorted(issue_summary.items(), key=lambda x: x[1], reverse=True):
+            print(f"  {issue}: {count:,}")
+
+    if total_problematic > 0:
+        print("Sample Problematic Rows (First 10):")
+        print(p.problem_sample)
+        if p.wrote_problems:
+            print(f"\n✓ Saved to: {p.problematic_path}")
+
+    print("SECTION 8: UNIQUE VALUES & CARDINALITY")
+
+    unique_analysis = pd.DataFrame({
+        'Column': p.all_columns,
+        'Unique (approx.)': [unique[col] for col in p.all_columns],
+        'Unique %': [f"{(unique[col]/n*100):.2f}%" for col in p.all_columns],
+        'Cardinality': ['High' if unique[col]/n > 0.5 else 'Medium' if unique[col]/n > 0.05 else 'Low' for col in p.all_columns]
+    })
+    print("\n" + unique_analysis.sort_values('Unique (approx.)', ascending=False).to_string(index=False))
+
+    print("Value Distributions (Low Cardinality Columns):")
+    for col in categorical_cols:
+        non_null = n - nulls[col]
+        print(f"\n{col} ({'' if p.unique_is_exact(col) else '~'}{unique[col]} unique values):")
+        for val, count in top[col].head(10).items():
+            print(f"  {str(val):<30} : {count:>8,} ({count / non_null * 100:>6.2f}%)")
+        if bound[col]:
+            print(f"  ... {max(len(top[col]) - 10, 0):,} more values occur more than {bound[col]:,} times, "
+                  f"every other value at most {bound[col]:,} times")
+        elif unique[col] > 10:
+            print(f"  ... and {unique[col] - 10} more values")
+
+    if len(numeric_cols) > 1:
+        print("SECTION 9: CORRELATION ANALYSIS")
+
+        corr_matrix = pd.DataFrame(p.correlation.matrix(), index=numeric_cols, columns=numeric_cols)
+        print("\nCorrelation Matrix:")
+        print(corr_matrix)
+
+        print("\nHighly Correlated Pairs (|r| > 0.7):")
+        high_corr = []
+        for i in range(len(corr_matrix.columns)):
+            for j in range(i+1, len(corr_matrix.columns)):
+                corr_val = corr_matrix.iloc[i, j]
+                if abs(corr_val) > 0.7:
+                    high_corr.append((corr_matrix.columns[i], corr_matrix.columns[j], corr_val))
+
+        if high_corr:
+            for col1, col2, corr in sorted(high_corr, key=lambda x: abs(x[2]), reverse=True):
+                print(f"  {col1} ↔ {col2}: {corr:.3f}")
+        else:
+            print("  None found")
+
+    print("SECTION 10: DISTRIBUTION CHARACTERISTICS")
+
+    skew, kurt = m.skew(), m.kurtosis()
+    for i, col in enumerate(numeric_cols):
+        print(f"\n{col}:")
+        print(f"  Range: [{m.min[i]:.2f}, {m.max[i]:.2f}]")
+        print(f"  Mean: {m.mean[i]:.2f}, Median: {median[i]:.2f}")
+        print(f"  Std Dev: {std[i]:.2f}")
+        print(f"  Skewness: {skew[i]:.2f} ({'Right-skewed' if skew[i] > 0 else 'Left-skewed' if skew[i] < 0 else 'Symmetric'})")
+        print(f"  Kurtosis: {kurt[i]:.2f} ({'Heavy-tailed' if kurt[i] > 0 else 'Light-tailed'})")
+
+    print("SECTION 11: FINAL SUMMARY & RECOMMENDATIONS")
+
+    print(f"\nDataset: {n:,} rows × {len(p.all_columns)} columns")
+    print(f"Numerical Columns: {len(numeric_cols)}")
+    print(f"Categorical Columns: {len(categorical_cols)}")
+    print(f"Memory: {p.parsed_memory / 1024**2:.2f} MB")
+
+    quality_score = ((n - total_problematic) / n) * 100
+    print(f"\nData Quality Score: {quality_score:.2f}%")
+    print(f"Clean Rows: {n - total_problematic:,}")
+    print(f"Problematic Rows: {total_problematic:,}")
+
+    print("\nRecommendations:")
+    if p.missing_rows:
+        print(f"  1. Handle {p.missing_rows:,} rows with missing values")
+    if p.duplicate_group_rows:
+        print(f"  2. Review {p.duplicate_group_rows:,} duplicate rows")
+    if 'Negative Values' in issue_summary:
+        print(f"  3. Investigate {issue_summary['Negative Values']} negative values")
+    if 'Zero Values' in issue_summary:
+        print(f"  4. Review {issue_summary['Zero Values']} zero values")
+    if not issue_summary:
+        print("Data quality is excellent!")
+
+
+if __name__ == "__main__":
+    input_path = sys.argv[1] if len(sys.argv) > 1 else INPUT_PATH
+    chunksize = int(sys.argv[2]) if len(sys.argv) > 2 else CHUNKSIZE
+    problematic_path = PROBLEMATIC_PATH if os.path.isdir(os.path.dirname(PROBLEMATIC_PATH)) else 'problematic_rows.csv'
+
+    print("COMPREHENSIVE EXPLORATORY DATA ANALYSIS")
+    print("Retail Transactional Dataset")
+    print(f"Analysis Start Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+    print_report(profile_csv(input_path, chunksize, problematic_path))
+
+    print("EDA COMPLETE")
+    print(f"Completed at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -0,0 +1,151 @@
+import os
+import json
+import time
+import hashlib
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+# Every figure is described by a job: the data it draws plus its parameters.
+# A job's key hashes both, and plots_dir/plot_manifest.json records the key
+# each PNG was rendered from, so only new or changed figures are drawn again.
+# Rendering happens in a process pool; matplotlib is imported by the workers
+# only, never by the process that builds the jobs.
+MANIFEST = "plot_manifest.json"
+PLOT_VERSION = 1
+
+
+def _digest(kind, data, params):
+    h = hashlib.blake2b(digest_size=16)
+    h.update(json.dumps([kind, PLOT_VERSION, params], sort_keys=True, default=str).encode())
+    for name in sorted(data):
+        value = data[name]
+        h.update(name.encode())
+        if isinstance(value, np.ndarray):
+            h.update(str(value.dtype).encode())
+            h.update(np.ascontiguousarray(value).tobytes())
+        else:
+            h.update(json.dumps(value, default=str).encode())
+    return h.hexdigest()
+
+
+def plot_job(kind, filename, data, **params):
+    return {"kind": kind, "file": filename, "data": data, "params": params, "key": _digest(kind, data, params)}
+
+
+def histogram_jobs(df, numeric_cols, bins=50):
+    jobs = []
+    for col in numeric_cols:
+        values = df[col].dropna().to_numpy()
+        if len(values):
+            jobs.append(plot_job("hist", f"hist_{col}.png", {"values": values}, col=col, bins=bins))
+    return jobs
+
+
+def boxplot_jobs(df, numeric_cols):
+    jobs = []
+    for col in numeric_cols:
+        values = df[col].dropna().to_numpy()
+        if len(values):
+            jobs.append(plot_job("box", f"box_{col}.png", {"values": values}, col=col))
+    return jobs
+
+
+def category_jobs(df, cat_cols, top_n=20):
+    jobs = []
+    for col in cat_cols:
+        vc = df[col].value_counts(dropna=False).head(top_n)
+        data = {"labels": [str(label) for label in vc.index], "counts": vc.to_numpy()}
+        jobs.append(plot_job("cat", f"cat_{col}.png", data, col=col))
+    return jobs
+
+
+def correlation_job(df, numeric_cols):
+    corr = df[numeric_cols].corr()
+    data = {"matrix": corr.to_numpy(), "columns": list(numeric_cols)}
+    return plot_job("corr", "correlation_matrix.png", data), corr
+
+
+def _hist(plt, data, col, bins):
+    plt.figure(figsize=(6, 4))
+    plt.hist(data["values"], bins=bins)
+    plt.title(f"Histogram: {col} (n={len(data['values'])})")
+    plt.xlabel(col)
+    plt.ylabel("count")
+
+
+def _box(plt, data, col):
+    plt.figure(figsize=(6, 3))
+    plt.boxplot(data["values"], vert=False)
+    plt.title(f"Boxplot: {col}")
+
+
+def _cat(plt, data, col):
+    plt.figure(figsize=(8, 4))
+    pd.Series(data["counts"], index=data["labels"]).plot(kind='bar')
+    plt.title(f"Top categories: {col}")
+
+
+def _corr(plt, data):
+    columns = data["columns"]
+    plt.figure(figsize=(8, 6))
+    plt.imshow(data["matrix"], interpolation='none', aspect='auto')
+    plt.colorbar()
+    plt.xticks(range(len(columns)), columns, rotation=90)
+    plt.yticks(range(len(columns)), columns)
+    plt.title("Correlation matrix (heatmap)")
+
+
+RENDERERS = {"hist": _hist, "box": _box, "cat": _cat, "corr": _corr}
+
+
+def render_job(job, plots_dir):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    RENDERERS[job["kind"]](plt, job["data"], **job["params"])
+    plt.tight_layout()
+    plt.savefig(os.path.join(plots_dir, job["file"]))
+    plt.close()
+    return job["file"], job["key"]
+
+
+def read_manifest(plots_dir):
+    path = os.path.join(plots_dir, MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_manifest(plots_dir, manifest):
+    path = os.path.join(plots_dir, MANIFEST)
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def render_plots(jobs, plots_dir, n_workers=None):
+    start = time.perf_counter()
+    os.makedirs(plots_dir, exist_ok=True)
+    manifest = read_manifest(plots_dir)
+    todo = [
+        job for job in jobs
+        if manifest.get(job["file"]) != job["key"] or not os.path.exists(os.path.join(plots_dir, job["file"]))
+    ]
+    if todo:
+        workers = min(n_workers or os.cpu_count() or 1, len(todo))
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(render_job, job, plots_dir) for job in todo]
+                for future in futures:
+                    filename, key = future.result()
+                    manifest[filename] = key
+        finally:
+            write_manifest(plots_dir, manifest)
+    return {
+        "rendered": len(todo),
+        "skipped": len(jobs) - len(todo),
+        "secs": time.perf_counter() - start,
+    }
@@ -0,0 +1,475 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.append(os.path.join(ROOT, 'ETL_Pipeline'))
+from ETL import parse_dates_vectorized
+from dedup_index import DedupIndex, row_hashes
+
+# One pass over a CSV in chunks. Every statistic in the EDA report is kept as
+# mergeable state, so memory depends on the number of columns, not rows. The
+# exception is duplicate detection, which keeps one 64-bit hash per distinct row.
+# Categorical columns with more than TOP_K distinct values are read a second
+# time, so their most frequent values are reported with exact counts.
+CHUNKSIZE = 100_000
+HLL_PRECISION = 14
+TOP_K = 1000
+SKETCH_K = 2000
+PREVIEW_ROWS = 5
+SAMPLE_ROWS = 10
+DATE_KEYWORDS = ['date', 'time', 'timestamp']
+CRITICAL_KEYWORDS = ['price', 'amount', 'quantity', 'total', 'cost']
+
+
+class HyperLogLog:
+    def __init__(self, precision=HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, values):
+        if len(values) == 0:
+            return self
+        hashes = pd.util.hash_array(np.asarray(values))
+        bits = 64 - self.precision
+        index = (hashes >> np.uint64(bits)).astype(np.intp)
+        rest = hashes & np.uint64((1 << bits) - 1)
+        bit_length = np.zeros(len(rest))
+        nonzero = rest > 0
+        bit_length[nonzero] = np.floor(np.log2(rest[nonzero].astype(float))) + 1
+        np.maximum.at(self.registers, index, (bits - bit_length + 1).astype(np.uint8))
+        return self
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        m = len(self.registers)
+        estimate = 0.7213 / (1 + 1.079 / m) * m * m / np.sum(2.0 ** -self.registers.astype(float))
+        zeros = np.count_nonzero(self.registers == 0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+
+# Misra-Gries summary: counts are exact while a column has at most k distinct
+# values, otherwise each count is low by at most `error`, and every value that
+# occurs more than `error` times is still a candidate. recount() counts the
+# candidates exactly in a second pass; after it, top() lists exact counts and
+# keeps only values above `error`, which no dropped value can outrank.
+class HeavyHitters:
+    def __init__(self, k=TOP_K):
+        self.k = k
+        self.counts = pd.Series(dtype='int64')
+        self.error = 0
+        self.recounted = None
+        self.verified = False
+
+    @property
+    def exact(self):
+        return self.error == 0
+
+    def update(self, values):
+        counts = self.counts.add(pd.Series(values).value_counts(), fill_value=0).astype('int64')
+        if len(counts) > self.k:
+            counts = counts.sort_values(ascending=False, kind='stable')
+            cut = counts.iloc[self.k]
+            counts = counts.iloc[:self.k] - cut
+            counts = counts[counts > 0]
+            self.error += cut
+        self.counts = counts
+        return self
+
+    def recount(self, values):
+        if self.recounted is None:
+            self.recounted = pd.Series(0, index=self.counts.index, dtype='int64')
+        counts = pd.Series(values).value_counts()
+        self.recounted += counts.reindex(self.recounted.index, fill_value=0).astype('int64')
+        return self
+
+    def finish_recount(self):
+        if self.recounted is not None:
+            self.counts, self.recounted = self.recounted, None
+        self.verified = True
+        return self
+
+    def top(self, n=None):
+        top = self.counts.sort_values(ascending=False, kind='stable')
+        if self.verified and not self.exact:
+            top = top[top > self.error]
+        return top if n is None else top.head(n)
+
+
+# Count, mean and central moments M2..M4 per column, combined chunk by chunk
+# with the pairwise update formulas, plus min and max.
+class Moments:
+    def __init__(self, n_cols):
+        self.n = np.zeros(n_cols)
+        self.mean = np.zeros(n_cols)
+        self.m2 = np.zeros(n_cols)
+        self.m3 = np.zeros(n_cols)
+        self.m4 = np.zeros(n_cols)
+        self.min = np.full(n_cols, np.inf)
+        self.max = np.full(n_cols, -np.inf)
+
+    def update(self, values):
+        nb = np.count_nonzero(~np.isnan(values), axis=0).astype(float)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mb = np.where(nb > 0, np.nansum(values, axis=0) / np.maximum(nb, 1), self.mean)
+            d = values - mb
+            m2b, m3b, m4b = (np.nansum(d ** p, axis=0) for p in (2, 3, 4))
+        self.min = np.minimum(self.min, np.where(np.isnan(values), np.inf, values).min(axis=0))
+        self.max = np.maximum(self.max, np.where(np.isnan(values), -np.inf, values).max(axis=0))
+
+        na = self.n
+        n = na + nb
+        safe = np.maximum(n, 1)
+        delta = mb - self.mean
+        m2, m3 = self.m2, self.m3
+        self.m4 = (self.m4 + m4b + delta ** 4 * na * nb * (na ** 2 - na * nb + nb ** 2) / safe ** 3
+                   + 6 * delta ** 2 * (na ** 2 * m2b + nb ** 2 * m2) / safe ** 2
+                   + 4 * delta * (na * m3b - nb * m3) / safe)
+        self.m3 = (m3 + m3b + delta ** 3 * na * nb * (na - nb) / safe ** 2
+                   + 3 * delta * (na * m2b - nb * m2) / safe)
+        self.m2 = m2 + m2b + delta ** 2 * na * nb / safe
+        self.mean = self.mean + delta * nb / safe
+        self.n = n
+        return self
+
+    def var(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.n > 1, self.m2 / (self.n - 1), np.nan)
+
+    def skew(self):
+        n, m2, m3 = self.n, self.m2 / np.maximum(self.n, 1), self.m3 / np.maximum(self.n, 1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result = np.sqrt(n * (n - 1)) / (n - 2) * m3 / m2 ** 1.5
+        return np.where(n < 3, np.nan, np.where(m2 == 0, 0, result))
+
+    def kurtosis(self):
+        n = self.n
+        with np.errstate(invalid='ignore', divide='ignore'):
+            denom = (n - 2) * (n - 3) * self.m2 ** 2
+            result = n * (n + 1) * (n - 1) * self.m4 / denom - 3 * (n - 1) ** 2 / ((n - 2) * (n - 3))
+        return np.where(n < 4, np.nan, np.where(denom == 0, 0, result))
+
+
+# Pairwise-complete sums for the correlation matrix, like DataFrame.corr().
+# Values are shifted by the first chunk's means to limit cancellation.
+class Correlation:
+    def __init__(self, n_cols):
+        self.shift = None
+        self.n = np.zeros((n_cols, n_cols))
+        self.sx = np.zeros((n_cols, n_cols))
+        self.sxx = np.zeros((n_cols, n_cols))
+        self.sxy = np.zeros((n_cols, n_cols))
+
+    def update(self, values):
+        if self.shift is None:
+            with np.errstate(invalid='ignore'):
+                self.shift = np.nan_to_num(np.nanmean(values, axis=0))
+        present = (~np.isnan(values)).astype(float)
+        z = np.nan_to_num(values - self.shift)
+        self.n += present.T @ present
+        self.sx += z.T @ present
+        self.sxx += (z ** 2).T @ present
+        self.sxy += z.T @ z
+        return self
+
+    def matrix(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cov = self.sxy - self.sx * self.sx.T / self.n
+            var_x = self.sxx - self.sx ** 2 / self.n
+            corr = cov / np.sqrt(var_x * var_x.T)
+        corr[self.n < 1] = np.nan
+        return np.clip(corr, -1, 1)
+
+
+# KLL-style quantile sketch, the same algorithm as the RFM scoring sketch in
+# DB Creation, kept here so the profiler doesn't depend on that package.
+# Items at level h stand for 2**h values; a full level is sorted and every
+# other item is promoted, so the sketch keeps O(k log(n/k)) items with rank
+# error around 1/k.
+class QuantileSketch:
+    def __init__(self, k=SKETCH_K, seed=0):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                leftover = items[len(items) - len(items) % 2:]
+                items = items[:len(items) - len(items) % 2]
+                promoted = items[self._rng.integers(2)::2]
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+                self.levels[level] = leftover
+            level += 1
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        self.n += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def _sorted(self):
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2 ** h) for h, items in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        return items[order], np.cumsum(weights[order])
+
+    def quantiles(self, qs):
+        items, cumulative = self._sorted()
+        ranks = np.asarray(qs) * cumulative[-1]
+        return items[np.minimum(np.searchsorted(cumulative, ranks, side='left'), len(items) - 1)]
+
+    def rank(self, values, side='left'):
+        items, cumulative = self._sorted()
+        return np.concatenate([[0], cumulative])[np.searchsorted(items, values, side=side)]
+
+
+def _date_columns(columns):
+    return [col for col in columns if any(keyword in col.lower() for keyword in DATE_KEYWORDS)]
+
+
+class StreamProfile:
+    def __init__(self, problematic_path=None, seed=0):
+        self.problematic_path = problematic_path
+        self.rng = np.random.default_rng(seed)
+        self.rows = 0
+        self.chunks = 0
+        self.columns = None
+        self.dtypes = None
+        self.memory = 0
+        self.parsed_memory = 0
+        self.head = None
+        self.tail = None
+        self.sample = None
+        self.sample_keys = np.empty(0)
+        self.seen_rows = DedupIndex()
+        self.repeats = []
+        self.issue_hashes = []
+        self.missing_rows = 0
+        self.problem_sample = None
+        self.wrote_problems = False
+
+    def _start(self, chunk):
+        self.columns = chunk.columns.tolist()
+        self.date_cols = _date_columns(self.columns)
+        self.all_columns = self.columns + [col + '_parsed' for col in self.date_cols]
+        self.dtypes = chunk.dtypes
+        self.numeric_cols = chunk.select_dtypes(include=[np.number]).columns.tolist()
+        self.categorical_cols = chunk.select_dtypes(include=['object', 'category']).columns.tolist()
+        self.critical_cols = [col for col in self.numeric_cols if any(kw in col.lower() for kw in CRITICAL_KEYWORDS)]
+
+        self.nulls = pd.Series(0, index=self.all_columns)
+        self.distinct = {col: HyperLogLog() for col in self.all_columns}
+        self.top = {col: HeavyHitters() for col in self.categorical_cols}
+        self.empty = pd.Series(0, index=self.categorical_cols)
+        self.moments = Moments(len(self.numeric_cols))
+        self.correlation = Correlation(len(self.numeric_cols))
+        self.sketches = {col: QuantileSketch(SKETCH_K) for col in self.numeric_cols}
+        self.negative = pd.Series(0, index=self.numeric_cols)
+        self.zero = pd.Series(0, index=self.critical_cols)
+        self.dates = {col: {
+            'original_sample': chunk[col].head(SAMPLE_ROWS),
+            'parsed_sample': None, 'parsed': 0, 'unparsed': 0, 'unparsed_sample': [],
+            'min': pd.NaT, 'max': pd.NaT, 'future': 0, 'future_sample': [],
+        } for col in self.date_cols}
+        self.parsed_values = {col: pd.Series(dtype='datetime64[ns]') for col in self.date_cols}
+        self.head = chunk.head(PREVIEW_ROWS)
+
+    def _preview(self, chunk):
+        self.tail = pd.concat([self.tail, chunk.tail(PREVIEW_ROWS)]).tail(PREVIEW_ROWS)
+        keys = np.concatenate([self.sample_keys, self.rng.random(len(chunk))])
+        candidates = pd.concat([self.sample, chunk]) if self.sample is not None else chunk
+        keep = np.argsort(keys, kind='stable')[:PREVIEW_ROWS]
+        self.sample, self.sample_keys = candidates.iloc[keep], keys[keep]
+
+    def _parse_column(self, col, values):
+        # Values repeat across chunks, so each distinct value is parsed once.
+        cache = self.parsed_values[col]
+        new = pd.Index(values.dropna().unique()).difference(cache.index)
+        if len(new):
+            cache = pd.concat([cache, pd.Series(parse_dates_vectorized(pd.Series(new)).to_numpy(), index=new)])
+            self.parsed_values[col] = cache
+        return pd.Series(values.map(cache).to_numpy(dtype='datetime64[ns]'), index=values.index, name=col + '_parsed')
+
+    def _parse_dates(self, chunk, now):
+        for col in self.date_cols:
+            parsed = self._parse_column(col, chunk[col])
+            stats = self.dates[col]
+            if stats['parsed_sample'] is None:
+                stats['parsed_sample'] = parsed.head(SAMPLE_ROWS)
+            stats['parsed'] += int(parsed.notna().sum())
+            stats['unparsed'] += int(parsed.isna().sum() - chunk[col].isna().sum())
+            unparsed = parsed.isna() & chunk[col].notna()
+            if len(stats['unparsed_sample']) < SAMPLE_ROWS and unparsed.any():
+                stats['unparsed_sample'].append(chunk.loc[unparsed, col].head(SAMPLE_ROWS))
+            if parsed.notna().any():
+                stats['min'] = min(stats['min'], parsed.min()) if pd.notna(stats['min']) else parsed.min()
+                stats['max'] = max(stats['max'], parsed.max()) if pd.notna(stats['max']) else parsed.max()
+            future = parsed > now
+            stats['future'] += int(future.sum())
+            if len(stats['future_sample']) < PREVIEW_ROWS and future.any():
+                stats['future_sample'].append(
+                    pd.DataFrame({col: chunk.loc[future, col], col + '_parsed': parsed[future]}).head(PREVIEW_ROWS)
+                )
+            chunk[col + '_parsed'] = parsed
+        return chunk
+
+    def _repeated_rows(self, chunk):
+        hashes = row_hashes(chunk)
+        repeated = self.seen_rows.check(hashes)
+        self.repeats.append(hashes[repeated])
+        return hashes, repeated
+
+    def _issues(self, chunk, nulls, repeated):
+        issues = pd.Series('', index=chunk.index)
+        missing = nulls.any(axis=1)
+        self.missing_rows += int(missing.sum())
+        issues[missing] += 'Missing values; '
+        issues[repeated] += 'Duplicate; '
+        other = missing.to_numpy().copy()
+        for col in self.numeric_cols:
+            negative = chunk[col] < 0
+            self.negative[col] += int(negative.sum())
+            issues[negative] += f'Negative {col}; '
+            other |= negative.to_numpy()
+        for col in self.critical_cols:
+            zero = chunk[col] == 0
+            self.zero[col] += int(zero.sum())
+            issues[zero] += f'Zero {col}; '
+            other |= zero.to_numpy()
+        for col in self.categorical_cols:
+            distinct = pd.Series(chunk[col].dropna().unique())
+            empty = chunk[col].isin(distinct[distinct.astype(str).str.strip() == ''])
+            self.empty[col] += int(empty.sum())
+            issues[empty] += f'Empty {col}; '
+            other |= empty.to_numpy()
+        return issues, other
+
+    def update(self, chunk):
+        if self.columns is None:
+            self._start(chunk)
+        for col in self.numeric_cols:
+            if not pd.api.types.is_numeric_dtype(chunk[col]):
+                chunk[col] = pd.to_numeric(chunk[col], errors='coerce')
+        self.rows += len(chunk)
+        self.chunks += 1
+        memory = chunk.memory_usage(deep=True).sum()
+        self.memory += memory
+        self._preview(chunk)
+
+        chunk = self._parse_dates(chunk.copy(), pd.Timestamp.now())
+        self.parsed_memory += memory + 8 * len(chunk) * len(self.date_cols)
+        nulls = chunk.isnull()
+        self.nulls += nulls.sum()
+        for col in self.all_columns:
+            present = chunk[col][~nulls[col]]
+            self.distinct[col].update(present.to_numpy())
+            if col in self.top:
+                self.top[col].update(present)
+
+        values = chunk[self.numeric_cols].to_numpy(dtype=float, na_value=np.nan)
+        self.moments.update(values)
+        self.correlation.update(values)
+        for i, col in enumerate(self.numeric_cols):
+            self.sketches[col].update(values[:, i])
+
+        # A repeat is flagged where it occurs; the first copy of a duplicated
+        # row is only known at the end, so it counts in finish() but is not
+        # written to the problematic rows file.
+        hashes, repeated = self._repeated_rows(chunk)
+        issues, other = self._issues(chunk, nulls, repeated)
+        self.issue_hashes.append(hashes[other])
+
+        flagged = (issues != '').to_numpy()
+        if flagged.any():
+            problems = chunk[flagged].assign(Data_Quality_Issues=issues[flagged])
+            if self.problem_sample is None or len(self.problem_sample) < SAMPLE_ROWS:
+                self.problem_sample = pd.concat([self.problem_sample, problems]).head(SAMPLE_ROWS)
+            if self.problematic_path:
+                problems.to_csv(self.problematic_path, mode='a' if self.wrote_problems else 'w',
+                                header=not self.wrote_problems, index=False)
+                self.wrote_problems = True
+        return self
+
+    # Categorical columns whose top values are only bounds after the first
+    # pass; profile_csv reads them once more to count their candidates.
+    def recount_columns(self):
+        return [col for col in self.categorical_cols if not self.top[col].exact]
+
+    def recount(self, chunk):
+        for col in chunk.columns:
+            self.top[col].recount(chunk[col].dropna())
+        return self
+
+    def finish(self):
+        for hh in self.top.values():
+            hh.finish_recount()
+        repeats = np.concatenate(self.repeats) if self.repeats else np.empty(0, dtype=np.uint64)
+        repeated = np.unique(repeats)
+        issue_hashes = np.concatenate(self.issue_hashes) if self.issue_hashes else np.empty(0, dtype=np.uint64)
+        self.duplicate_rows = len(repeats)
+        self.duplicate_group_rows = len(repeats) + len(repeated)
+        self.problematic_rows = int(
+            len(issue_hashes) + self.duplicate_group_rows - np.isin(issue_hashes, repeated).sum()
+        )
+        self.seen_rows, self.repeats, self.issue_hashes = DedupIndex(), [], []
+        return self
+
+    def quantile(self, col, q):
+        return float(self.sketches[col].quantiles([q])[0])
+
+    def outliers(self, col, factor=3):
+        q1, q3 = self.quantile(col, 0.25), self.quantile(col, 0.75)
+        iqr = q3 - q1
+        sketch = self.sketches[col]
+        below = sketch.rank([q1 - factor * iqr], side='left')[0]
+        above = sketch.n - sketch.rank([q3 + factor * iqr], side='right')[0]
+        return int(below + above)
+
+    # Exact for categorical columns that fit in the heavy-hitter summary,
+    # otherwise the HyperLogLog estimate capped at the non-null count.
+    def unique_is_exact(self, col):
+        return col in self.top and self.top[col].exact
+
+    def unique(self, col):
+        if self.unique_is_exact(col):
+            return len(self.top[col].counts)
+        return min(self.distinct[col].count(), self.rows - int(self.nulls[col]))
+
+
+def profile_csv(path, chunksize=CHUNKSIZE, problematic_path=None, **read_kwargs):
+    profile = StreamProfile(problematic_path)
+    for chunk in pd.read_csv(path, chunksize=chunksize, **read_kwargs):
+        profile.update(chunk)
+    columns = profile.recount_columns()
+    if columns:
+        for chunk in pd.read_csv(path, chunksize=chunksize, **{**read_kwargs, 'usecols': columns}):
+            profile.recount(chunk)
+    return profile.finish()
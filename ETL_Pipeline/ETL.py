@@ -1,22 +1,37 @@
+import os
+import shutil
 import pandas as pd
 import numpy as np
 from datetime import datetime
 import warnings
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from schema import RETAIL_SCHEMA, memory_report, read_retail_csv
+from dedup_index import DedupIndex, duplicate_rows
+from instrumentation import StageMetrics
+from quarantine import QuarantineStore
+from validation_rules import RETAIL_RULES, ColumnCache, RuleSet
 warnings.filterwarnings('ignore')
 
+DATE_FORMATS = [
+    '%m-%d-%y', '%d-%m-%y', '%m/%d/%y', '%d/%m/%y',
+    '%m-%d-%Y', '%d-%m-%Y', '%m/%d/%Y', '%d/%m/%Y',
+    '%Y-%m-%d', '%Y/%m/%d', '%d.%m.%Y', '%d.%m.%y',
+    '%Y%m%d', '%m%d%Y', '%b %d, %Y', '%B %d, %Y',
+    '%d %b %Y', '%d %B %Y',
+]
+
+# Time-only values, which dateutil parses as times today. strptime also takes
+# single-digit minutes and seconds, so only values shaped like TIME_PATTERN
+# are tried with these.
+TIME_FORMATS = ['%H:%M:%S', '%H:%M']
+TIME_PATTERN = r'\d{1,2}:[0-5]\d(:[0-5]\d)?'
+
 def parse_date_robust(date_str):
     if pd.isna(date_str) or str(date_str).strip() == '':
         return pd.NaT
     
-    date_formats = [
-        '%m-%d-%y', '%d-%m-%y', '%m/%d/%y', '%d/%m/%y',
-        '%m-%d-%Y', '%d-%m-%Y', '%m/%d/%Y', '%d/%m/%Y',
-        '%Y-%m-%d', '%Y/%m/%d', '%d.%m.%Y', '%d.%m.%y',
-        '%Y%m%d', '%m%d%Y', '%b %d, %Y', '%B %d, %Y',
-        '%d %b %Y', '%d %B %Y',
-    ]
-    
-    for fmt in date_formats:
+    for fmt in DATE_FORMATS:
         try:
             parsed = pd.to_datetime(date_str, format=fmt)
             if fmt.endswith('%y') and parsed.year > 2050:
@@ -26,10 +41,63 @@ def parse_date_robust(date_str):
             continue
     
     try:
-        return pd.to_datetime(date_str, infer_datetime_format=True)
+        return pd.to_datetime(date_str, format='mixed')
     except:
         return pd.NaT
 
+def detect_date_formats(values):
+    remaining = pd.Series(values, dtype=object)
+    remaining = remaining[remaining.notna() & (remaining.astype(str).str.strip() != '')]
+    parsed = pd.Series(pd.NaT, index=remaining.index, dtype='datetime64[ns]')
+    formats = pd.Series(None, index=remaining.index, dtype=object)
+    
+    today = pd.Timestamp.today().normalize()
+    is_time = remaining.astype(str).str.fullmatch(TIME_PATTERN)
+    
+    for fmt in TIME_FORMATS + DATE_FORMATS:
+        if remaining.empty:
+            break
+        attempt = pd.to_datetime(remaining, format=fmt, errors='coerce')
+        hit = attempt.notna()
+        if fmt in TIME_FORMATS:
+            hit &= is_time[hit.index]
+        if not hit.any():
+            continue
+        attempt = attempt[hit]
+        if fmt in TIME_FORMATS:
+            attempt = today + (attempt - attempt.dt.normalize())
+        if fmt.endswith('%y'):
+            rollback = attempt.dt.year > 2050
+            attempt[rollback] = attempt[rollback] - pd.DateOffset(years=100)
+        parsed[attempt.index] = attempt
+        formats[attempt.index] = fmt
+        remaining = remaining[~hit]
+    
+    # Whatever no known format matched is parsed value by value in one call.
+    # The parsed column is timezone-naive, so values with a UTC offset are
+    # left unparsed; pandas warns when their offsets differ.
+    if not remaining.empty:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', FutureWarning)
+            attempt = pd.to_datetime(remaining, format='mixed', errors='coerce')
+        if attempt.dtype == object:
+            attempt = pd.to_datetime(attempt.map(lambda v: pd.NaT if getattr(v, 'tzinfo', None) else v))
+        if pd.api.types.is_datetime64_dtype(attempt):
+            attempt = attempt[attempt.notna()]
+            parsed[attempt.index] = attempt
+            formats[attempt.index] = 'inferred'
+    
+    return parsed, formats
+
+def parse_dates_vectorized(series):
+    codes, uniques = pd.factorize(series)
+    parsed, _ = detect_date_formats(uniques)
+    lookup = parsed.reindex(range(len(uniques))).to_numpy(dtype='datetime64[ns]')
+    result = np.full(len(codes), np.datetime64('NaT'), dtype='datetime64[ns]')
+    found = codes >= 0
+    result[found] = lookup[codes[found]]
+    return pd.Series(result, index=series.index, name=series.name)
+
 def clean_text(text):
     if pd.isna(text):
         return text
@@ -53,12 +121,156 @@ def clean_numeric(val):
     except:
         return np.nan
 
+def _map_unique_values(series, fn):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        if len(series.cat.categories) == 0:
+            return series
+        mapped_codes, categories = pd.factorize(fn(pd.Series(series.cat.categories, dtype=object)))
+        codes = series.cat.codes.to_numpy()
+        codes = np.where(codes >= 0, mapped_codes[codes], -1)
+        return pd.Series(pd.Categorical.from_codes(codes, categories=categories), index=series.index, name=series.name)
+    
+    codes, uniques = pd.factorize(series)
+    mapped = fn(pd.Series(uniques, dtype=object)).to_numpy(dtype=object)
+    values = series.to_numpy(dtype=object)
+    found = codes >= 0
+    values[found] = mapped[codes[found]]
+    return pd.Series(values, index=series.index, name=series.name).infer_objects()
+
+def _clean_text_values(values):
+    text = values.astype(str).str.split().str.join(' ')
+    return text.where(text != '', np.nan)
+
+def _standardize_phone_values(values):
+    phone = values.astype(str).str.replace(r'\D', '', regex=True)
+    phone = phone.where(phone.str.len() >= 10, np.nan)
+    non_ascii = values.astype(str).str.contains(r'[^\x00-\x7f]', regex=True)
+    phone[non_ascii] = values[non_ascii].apply(standardize_phone)
+    return phone
+
+def clean_text_vectorized(series):
+    return _map_unique_values(series, _clean_text_values)
+
+def standardize_phone_vectorized(series):
+    return _map_unique_values(series, _standardize_phone_values)
+
+def clean_numeric_vectorized(series):
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        if pd.api.types.is_extension_array_dtype(series):
+            return series.mask((series < 0).fillna(False))
+        numeric = series.astype(float)
+        return numeric.where(~(numeric < 0), np.nan)
+    
+    numeric = pd.to_numeric(series, errors='coerce')
+    unconverted = numeric.isna() & series.notna()
+    numeric = numeric.astype(object).where(~unconverted, series[unconverted].apply(clean_numeric))
+    numeric = pd.to_numeric(numeric, errors='coerce').astype('float64')
+    return numeric.where(~(numeric < 0), np.nan)
+
+def date_columns(columns):
+    return [col for col in columns if 'date' in col.lower()]
+
+def time_columns(columns):
+    return [col for col in columns if 'time' in col.lower() and 'date' not in col.lower()]
+
+# Steps 1, 2 and 4 only flag dates, times and numbers, so columns the schema
+# reads as text or categories get no Invalid bit. Without a schema any other
+# column may load as numbers, so all of them keep one.
+def build_error_codes(columns, rules=RETAIL_RULES, schema=None):
+    date_cols = date_columns(columns)
+    time_cols = time_columns(columns)
+    text_cols = {col for col, dtype in (schema or {}).items() if dtype in ('object', 'category')}
+    other_cols = [col for col in columns if col not in date_cols + time_cols and col not in text_cols]
+    
+    errors = [f'Invalid {col}' for col in date_cols + time_cols + other_cols]
+    errors += ['Missing values', 'Duplicate']
+    errors += [rule['name'] for rule in rules]
+    if len(set(errors)) != len(errors):
+        raise ValueError("Rule names must not repeat the built-in validation errors")
+    if len(errors) > 63:
+        raise ValueError(f"{len(errors)} validation errors do not fit in a 64-bit error code")
+    return {error: 1 << bit for bit, error in enumerate(errors)}
+
+def render_validation_errors(error_codes, error_bits):
+    messages = {
+        code: ''.join(f'{error}; ' for error, bit in error_bits.items() if code & bit)
+        for code in pd.unique(error_codes)
+    }
+    return error_codes.map(messages)
+
+def error_codes_path(bad_path):
+    return os.path.splitext(bad_path.rstrip(os.sep))[0] + '_error_codes.csv'
+
+OUTPUT_FORMATS = {'csv': '.csv', 'parquet': '.parquet', 'ipc': '.arrow'}
+
+def _partitioning():
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    return ds.partitioning(pa.schema([('Year', pa.int64()), ('Month', pa.string())]), flavor='hive')
+
+def write_partitioned(df, base_dir, output_format='parquet', part=0):
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    
+    if part == 0 and os.path.isdir(base_dir):
+        shutil.rmtree(base_dir)
+    out = df.copy()
+    out['Year'] = out['Year'].astype('Int64')
+    table = pa.Table.from_pandas(out, preserve_index=False)
+    ds.write_dataset(
+        table, base_dir, format=output_format, partitioning=_partitioning(),
+        basename_template=f'part-{part}-{{i}}{OUTPUT_FORMATS[output_format]}',
+        existing_data_behavior='overwrite_or_ignore',
+    )
+    return base_dir
+
+def read_partitioned(base_dir, columns=None, filters=None, output_format='parquet'):
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+    
+    dataset = ds.dataset(base_dir, format=output_format, partitioning=_partitioning())
+    expression = pq.filters_to_expression(filters) if filters else None
+    return dataset.to_table(columns=columns, filter=expression).to_pandas()
+
+# Workers record their steps in their own StageMetrics, with the parent's
+# run id and tags, and hand the records back for the parent to write.
+def _clean_partition(raw, rules, error_bits, context=None, profile=None, profile_dir=None, trace_memory=False):
+    etl = RetailETL(None, rules=rules)
+    etl.verbose = False
+    etl.metrics = StageMetrics(None, profile, profile_dir, trace_memory, **(context or {}))
+    etl.error_bits = error_bits
+    df_clean, error_codes = etl._clean_and_validate(raw)
+    return df_clean, error_codes | etl._validate_business_rules(df_clean), etl.metrics.records
+
 class RetailETL:
-    def __init__(self, input_path):
+    def __init__(self, input_path, chunksize=None, n_workers=1, output_format='csv', schema=RETAIL_SCHEMA, dedup_path=None,
+                 metrics_path=None, profile=None, rules=RETAIL_RULES, quarantine_path=None, trace_memory=False):
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"output_format must be one of {list(OUTPUT_FORMATS)}")
         self.input_path = input_path
+        self.chunksize = chunksize
+        self.n_workers = n_workers
+        self.output_format = output_format
+        self.schema = schema
+        self.dedup_path = dedup_path
+        self.rules = RuleSet(rules)
+        self.quarantine_path = quarantine_path
         self.df = None
         self.good_df = None
         self.bad_df = None
+        self.verbose = True
+        self.total_records = 0
+        self.good_records = 0
+        self.bad_records = 0
+        self.error_bits = None
+        self._dedup = None
+        self._pool = None
+        self._quarantine = None
+        self.metrics = StageMetrics(metrics_path, profile, trace_memory=trace_memory)
+    
+    def _log(self, message):
+        if self.verbose:
+            print(message)
         
     def extract(self):
         print("="*80)
@@ -68,90 +280,229 @@ class RetailETL:
         
         print("STEP 1: EXTRACT")
         print("-"*80)
-        self.df = pd.read_csv(self.input_path)
+        if self.chunksize:
+            print(f"Streaming {self.input_path} in chunks of {self.chunksize:,} records")
+            return self
+        with self.metrics.stage('extract') as record:
+            self.df = self._read()
+            record['rows'] = len(self.df)
+        self.total_records = len(self.df)
         print(f"Loaded {len(self.df):,} records with {len(self.df.columns)} columns")
+        if self.schema:
+            print(memory_report(self.df))
         return self
     
-    def transform(self):
-        print("\nSTEP 2: TRANSFORM & CLEAN")
-        print("-"*80)
+    def _read(self, **kwargs):
+        if self.schema:
+            return read_retail_csv(self.input_path, self.schema, **kwargs)
+        return pd.read_csv(self.input_path, **kwargs)
+    
+    @contextmanager
+    def _workers(self):
+        if self.n_workers <= 1:
+            yield
+            return
+        with ProcessPoolExecutor(max_workers=self.n_workers) as pool:
+            self._pool = pool
+            try:
+                yield
+            finally:
+                self._pool = None
+    
+    @contextmanager
+    def _dedup_index(self):
+        self._dedup = DedupIndex(self.dedup_path)
+        if self.dedup_path:
+            print(f"Dedup index: {self.dedup_path} ({len(self._dedup):,} rows loaded before)")
+        try:
+            yield
+            if self._dedup.save():
+                print(f"✓ Dedup index saved: {self.dedup_path} ({len(self._dedup):,} rows)")
+        finally:
+            self._dedup = None
+    
+    # Rejected rows also go to the quarantine store, with their raw values,
+    # replacing whatever an earlier run over the same input left there.
+    @contextmanager
+    def _quarantine_store(self):
+        if not self.quarantine_path:
+            yield
+            return
+        self._quarantine = QuarantineStore(self.quarantine_path)
+        self._quarantine.clear_source(os.path.abspath(self.input_path))
+        try:
+            yield
+            print(f"✓ Quarantined rows saved: {self.quarantine_path} (rules version {self.rules.version})")
+        finally:
+            self._quarantine.close()
+            self._quarantine = None
+    
+    def _quarantine_rows(self, raw, bad_df):
+        if self._quarantine is not None:
+            self._quarantine.save_rules(self.rules.version, self.error_bits)
+            self._quarantine.add(raw.loc[bad_df.index], bad_df['Error_Code'], os.path.abspath(self.input_path),
+                                 self.rules.version, self.output_format)
+    
+    def _find_duplicates(self, df_clean):
+        return duplicate_rows(df_clean, index=self._dedup)
+    
+    def _clean_and_validate(self, raw):
+        df_clean = raw.copy()
+        error_codes = pd.Series(0, index=df_clean.index, dtype='int64')
+        
+        rows = len(raw)
         
-        df_clean = self.df.copy()
-        validation_flags = pd.DataFrame(index=df_clean.index)
-        validation_flags['errors'] = ''
-        validation_flags['is_valid'] = True
-        
-        print("\n[1/8] Standardizing Date Columns")
-        date_cols = [col for col in df_clean.columns if 'date' in col.lower()]
-        for col in date_cols:
-            df_clean[col] = df_clean[col].apply(parse_date_robust)
-            invalid_dates = df_clean[col].isna() & self.df[col].notna()
-            if invalid_dates.any():
-                validation_flags.loc[invalid_dates, 'errors'] += f'Invalid {col}; '
-                validation_flags.loc[invalid_dates, 'is_valid'] = False
-                print(f"  - {col}: {invalid_dates.sum()} invalid dates flagged")
-        
-        print("\n[2/8] Standardizing Time Columns")
-        time_cols = [col for col in df_clean.columns if 'time' in col.lower() and 'date' not in col.lower()]
-        for col in time_cols:
-            df_clean[col] = pd.to_datetime(df_clean[col], format='%H:%M:%S', errors='coerce').dt.time
-            invalid_times = df_clean[col].isna() & self.df[col].notna()
-            if invalid_times.any():
-                validation_flags.loc[invalid_times, 'errors'] += f'Invalid {col}; '
-                validation_flags.loc[invalid_times, 'is_valid'] = False
-                print(f"  - {col}: {invalid_times.sum()} invalid times flagged")
-        
-        print("\n[3/8] Cleaning Text Columns")
-        text_cols = df_clean.select_dtypes(include=['object']).columns
+        self._log("\n[1/8] Standardizing Date Columns")
+        date_cols = date_columns(df_clean.columns)
+        with self.metrics.stage('transform.dates', rows):
+            for col in date_cols:
+                with self.metrics.stage('transform.dates', rows, column=col) as record:
+                    df_clean[col] = parse_dates_vectorized(df_clean[col])
+                    invalid_dates = df_clean[col].isna() & raw[col].notna()
+                    record['flagged'] = int(invalid_dates.sum())
+                if invalid_dates.any():
+                    error_codes[invalid_dates] |= self.error_bits[f'Invalid {col}']
+                    self._log(f"  - {col}: {invalid_dates.sum()} invalid dates flagged")
+        
+        self._log("\n[2/8] Standardizing Time Columns")
+        time_cols = time_columns(df_clean.columns)
+        with self.metrics.stage('transform.times', rows):
+            for col in time_cols:
+                with self.metrics.stage('transform.times', rows, column=col) as record:
+                    df_clean[col] = pd.to_datetime(df_clean[col], format='%H:%M:%S', errors='coerce').dt.time
+                    invalid_times = df_clean[col].isna() & raw[col].notna()
+                    record['flagged'] = int(invalid_times.sum())
+                if invalid_times.any():
+                    error_codes[invalid_times] |= self.error_bits[f'Invalid {col}']
+                    self._log(f"  - {col}: {invalid_times.sum()} invalid times flagged")
+        
+        self._log("\n[3/8] Cleaning Text Columns")
+        text_cols = df_clean.select_dtypes(include=['object', 'category']).columns
         text_cols = [col for col in text_cols if col not in date_cols and col not in time_cols]
-        for col in text_cols:
-            if col.lower() == 'phone':
-                df_clean[col] = df_clean[col].apply(standardize_phone)
-            else:
-                df_clean[col] = df_clean[col].apply(clean_text)
-        print(f"  - Cleaned {len(text_cols)} text columns")
+        with self.metrics.stage('transform.text', rows):
+            for col in text_cols:
+                with self.metrics.stage('transform.text', rows, column=col):
+                    if col.lower() == 'phone':
+                        df_clean[col] = standardize_phone_vectorized(df_clean[col])
+                    else:
+                        df_clean[col] = clean_text_vectorized(df_clean[col])
+        self._log(f"  - Cleaned {len(text_cols)} text columns")
         
-        print("\n[4/8] Validating Numeric Columns")
+        self._log("\n[4/8] Validating Numeric Columns")
         numeric_cols = df_clean.select_dtypes(include=[np.number]).columns.tolist()
-        for col in numeric_cols:
-            original_vals = df_clean[col].copy()
-            df_clean[col] = df_clean[col].apply(clean_numeric)
-            invalid_numeric = df_clean[col].isna() & original_vals.notna()
-            if invalid_numeric.any():
-                validation_flags.loc[invalid_numeric, 'errors'] += f'Invalid {col}; '
-                validation_flags.loc[invalid_numeric, 'is_valid'] = False
-                print(f"  - {col}: {invalid_numeric.sum()} invalid values flagged")
-        
-        print("\n[5/8] Detecting Missing Values")
-        missing_rows = df_clean.isnull().any(axis=1)
+        with self.metrics.stage('transform.numeric', rows):
+            for col in numeric_cols:
+                with self.metrics.stage('transform.numeric', rows, column=col) as record:
+                    original_vals = df_clean[col].copy()
+                    df_clean[col] = clean_numeric_vectorized(df_clean[col])
+                    invalid_numeric = df_clean[col].isna() & original_vals.notna()
+                    record['flagged'] = int(invalid_numeric.sum())
+                if invalid_numeric.any():
+                    error_codes[invalid_numeric] |= self.error_bits[f'Invalid {col}']
+                    self._log(f"  - {col}: {invalid_numeric.sum()} invalid values flagged")
+        
+        self._log("\n[5/8] Detecting Missing Values")
+        with self.metrics.stage('transform.missing', rows) as record:
+            missing_rows = df_clean.isnull().any(axis=1)
+            record['flagged'] = int(missing_rows.sum())
         if missing_rows.any():
-            validation_flags.loc[missing_rows, 'errors'] += 'Missing values; '
-            validation_flags.loc[missing_rows, 'is_valid'] = False
-            print(f"  - {missing_rows.sum()} rows with missing values flagged")
+            error_codes[missing_rows] |= self.error_bits['Missing values']
+            self._log(f"  - {missing_rows.sum()} rows with missing values flagged")
+        
+        return df_clean, error_codes
+    
+    def _validate_business_rules(self, df_clean):
+        error_codes = pd.Series(0, index=df_clean.index, dtype='int64')
         
-        print("\n[6/8] Detecting Duplicates")
-        duplicates = df_clean.duplicated(keep='first')
+        self._log("\n[7/8] Validating Business Rules")
+        columns = ColumnCache(df_clean)
+        applicable = self.rules.applicable(df_clean.columns)
+        with self.metrics.stage('transform.business_rules', len(df_clean)) as step:
+            for rule, mask in applicable:
+                with self.metrics.stage('transform.business_rules', len(df_clean), column=rule['column'],
+                                        rule=rule['name']) as record:
+                    rejected = mask(columns)
+                    record['flagged'] = int(rejected.sum())
+                if record['flagged']:
+                    error_codes[rejected] |= self.error_bits[rule['name']]
+                    self._log(f"  - {rule['name']}: {record['flagged']} rows rejected ({record['wall_secs'] * 1000:.1f} ms)")
+        self._log(f"  - Checked {len(applicable)} of {len(self.rules)} rules in {step['wall_secs'] * 1000:.1f} ms")
+        
+        return error_codes
+    
+    def _transform_frame(self, raw):
+        self.error_bits = build_error_codes(raw.columns, self.rules.rules, self.schema)
+        if self.n_workers > 1:
+            self._log(f"\n[1-5,7/8] Cleaning and validating {len(raw):,} records on {self.n_workers} workers")
+            size = -(-len(raw) // self.n_workers)
+            partitions = [raw.iloc[start:start + size] for start in range(0, len(raw), size)]
+            contexts = [{**self.metrics.context, **self.metrics.tags, 'partition': i} for i in range(len(partitions))]
+            with self.metrics.stage('transform.partitions', len(raw), workers=self.n_workers):
+                results = list(self._pool.map(
+                    _clean_partition, partitions, [self.rules.rules] * len(partitions),
+                    [self.error_bits] * len(partitions), contexts,
+                    [self.metrics.profile] * len(partitions), [self.metrics.profile_dir] * len(partitions),
+                    [self.metrics.trace_memory] * len(partitions),
+                ))
+            for record in (record for r in results for record in r[2]):
+                self.metrics.emit(record, parent='transform.partitions')
+            df_clean = pd.concat([r[0] for r in results])
+            error_codes = pd.concat([r[1] for r in results])
+        else:
+            df_clean, error_codes = self._clean_and_validate(raw)
+        
+        self._log("\n[6/8] Detecting Duplicates")
+        with self.metrics.stage('transform.duplicates', len(df_clean)) as record:
+            duplicates = self._find_duplicates(df_clean)
+            record['flagged'] = int(duplicates.sum())
         if duplicates.any():
-            validation_flags.loc[duplicates, 'errors'] += 'Duplicate; '
-            validation_flags.loc[duplicates, 'is_valid'] = False
-            print(f"  - {duplicates.sum()} duplicate rows flagged")
-        
-        print("\n[7/8] Validating Business Rules")
-        critical_cols = [col for col in numeric_cols if any(kw in col.lower() for kw in ['price', 'amount', 'quantity', 'total'])]
-        for col in critical_cols:
-            zero_vals = df_clean[col] == 0
-            if zero_vals.any():
-                validation_flags.loc[zero_vals, 'errors'] += f'Zero {col}; '
-                validation_flags.loc[zero_vals, 'is_valid'] = False
-                print(f"  - {col}: {zero_vals.sum()} zero values flagged")
-        
-        print("\n[8/8] Separating Good and Bad Records")
-        good_mask = validation_flags['is_valid']
-        bad_mask = ~good_mask
-        
-        self.good_df = df_clean[good_mask].copy()
-        self.bad_df = df_clean[bad_mask].copy()
-        self.bad_df['Validation_Errors'] = validation_flags.loc[bad_mask, 'errors']
+            error_codes[duplicates] |= self.error_bits['Duplicate']
+            self._log(f"  - {duplicates.sum()} duplicate rows flagged")
+        
+        if self.n_workers <= 1:
+            error_codes |= self._validate_business_rules(df_clean)
+        
+        self._log("\n[8/8] Separating Good and Bad Records")
+        with self.metrics.stage('transform.separate', len(df_clean)) as record:
+            good_mask = error_codes == 0
+            bad_mask = ~good_mask
+            
+            good_df = df_clean[good_mask].copy()
+            bad_df = df_clean[bad_mask].copy()
+            bad_df['Error_Code'] = error_codes[bad_mask]
+            record['flagged'] = len(bad_df)
+        return good_df, bad_df
+    
+    def _with_error_messages(self, bad_df):
+        bad_out = bad_df.copy()
+        messages = render_validation_errors(bad_df['Error_Code'], self.error_bits)
+        bad_out.insert(bad_out.columns.get_loc('Error_Code'), 'Validation_Errors', messages)
+        return bad_out
+    
+    def _write(self, df, path, part=0):
+        if self.output_format == 'csv':
+            mode, header = ('w', True) if part == 0 else ('a', False)
+            df.to_csv(path, mode=mode, header=header, index=False)
+        else:
+            write_partitioned(df, path, self.output_format, part)
+    
+    def save_error_codes(self, path):
+        legend = pd.DataFrame({
+            'Error_Bit': range(len(self.error_bits)),
+            'Error_Code': list(self.error_bits.values()),
+            'Validation_Error': list(self.error_bits.keys()),
+        })
+        legend.to_csv(path, index=False)
+        return path
+    
+    def transform(self):
+        print("\nSTEP 2: TRANSFORM & CLEAN")
+        print("-"*80)
+        
+        with self._workers(), self._dedup_index(), self.metrics.stage('transform', len(self.df)):
+            self.good_df, self.bad_df = self._transform_frame(self.df)
+        self.good_records = len(self.good_df)
+        self.bad_records = len(self.bad_df)
         
         print(f"  - Good records: {len(self.good_df):,} ({len(self.good_df)/len(self.df)*100:.2f}%)")
         print(f"  - Bad records: {len(self.bad_df):,} ({len(self.bad_df)/len(self.df)*100:.2f}%)")
@@ -162,45 +513,103 @@ class RetailETL:
         print("\nSTEP 3: LOAD")
         print("-"*80)
         
-        self.good_df.to_csv(good_path, index=False)
+        with self.metrics.stage('load', len(self.good_df), output='good'):
+            self._write(self.good_df, good_path)
         print(f"✓ Good data saved: {good_path}")
         print(f"  Records: {len(self.good_df):,}")
         print(f"  Columns: {len(self.good_df.columns)}")
         
-        if len(self.bad_df) > 0:
-            self.bad_df.to_csv(bad_path, index=False)
-            print(f"\n✓ Bad data saved: {bad_path}")
-            print(f"  Records: {len(self.bad_df):,}")
-            print(f"  Columns: {len(self.bad_df.columns)}")
-        else:
-            print("\n✓ No bad records to save")
+        with self._quarantine_store():
+            if len(self.bad_df) > 0:
+                with self.metrics.stage('load', len(self.bad_df), output='bad'):
+                    bad_out = self._with_error_messages(self.bad_df)
+                    self._write(bad_out, bad_path)
+                    self._quarantine_rows(self.df, self.bad_df)
+                print(f"\n✓ Bad data saved: {bad_path}")
+                print(f"  Records: {len(bad_out):,}")
+                print(f"  Columns: {len(bad_out.columns)}")
+                print(f"  Error codes: {self.save_error_codes(error_codes_path(bad_path))}")
+            else:
+                print("\n✓ No bad records to save")
+        
+        return self
+    
+    def stream(self, good_path='/kaggle/working/good_data.csv', bad_path='/kaggle/working/bad_data.csv'):
+        print("\nSTEP 2-3: TRANSFORM & LOAD (STREAMING)")
+        print("-"*80)
+        
+        self.verbose = False
+        self.total_records = self.good_records = self.bad_records = 0
+        
+        with self._workers(), self._dedup_index(), self._quarantine_store():
+            for i, chunk in enumerate(self.metrics.iterate('extract', self._read(chunksize=self.chunksize))):
+                with self.metrics.tagged(chunk=i):
+                    with self.metrics.stage('transform', len(chunk)):
+                        good_df, bad_df = self._transform_frame(chunk)
+                    with self.metrics.stage('load', len(good_df), output='good'):
+                        self._write(good_df, good_path, part=i)
+                    with self.metrics.stage('load', len(bad_df), output='bad'):
+                        self._write(self._with_error_messages(bad_df), bad_path, part=i)
+                        self._quarantine_rows(chunk, bad_df)
+                
+                self.total_records += len(chunk)
+                self.good_records += len(good_df)
+                self.bad_records += len(bad_df)
+                print(f"  - Chunk {i + 1}: {len(chunk):,} records ({len(good_df):,} good, {len(bad_df):,} bad)")
+        
+        self.verbose = True
+        
+        print(f"\n✓ Good data saved: {good_path}")
+        print(f"  Records: {self.good_records:,} ({self.good_records/self.total_records*100:.2f}%)")
+        print(f"✓ Bad data saved: {bad_path}")
+        print(f"  Records: {self.bad_records:,} ({self.bad_records/self.total_records*100:.2f}%)")
+        print(f"  Error codes: {self.save_error_codes(error_codes_path(bad_path))}")
         
         return self
     
+    def print_stage_metrics(self):
+        summary = self.metrics.summary()
+        steps = summary[summary['column'] == '']
+        print("\nStage Timings")
+        print("-"*80)
+        for row in steps.itertuples():
+            rate = f"{row.rows_per_sec:>12,.0f} rows/s" if pd.notna(row.rows_per_sec) else ''
+            alloc = f" {row.alloc_peak_mb:>8,.0f} MB allocated at peak" if pd.notna(row.alloc_peak_mb) else ''
+            print(f"  {row.stage:<26} {row.wall_secs:>8.2f}s wall {row.cpu_secs:>8.2f}s CPU "
+                  f"{row.process_peak_rss_mb:>8,.0f} MB process peak {rate}{alloc}")
+        if self.metrics.path:
+            print(f"✓ Stage metrics saved: {self.metrics.path}")
+    
     def run(self, good_path='/kaggle/working/good_data.csv', bad_path='/kaggle/working/bad_data.csv'):
         self.extract()
-        self.transform()
-        self.load(good_path, bad_path)
+        if self.chunksize:
+            self.stream(good_path, bad_path)
+        else:
+            self.transform()
+            self.load(good_path, bad_path)
         
         print("\n" + "="*80)
         print("ETL PIPELINE COMPLETED")
         print("="*80)
         print(f"End Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"\nData Quality: {len(self.good_df)/len(self.df)*100:.2f}%")
+        print(f"\nData Quality: {self.good_records/self.total_records*100:.2f}%")
         print("="*80)
+        self.print_stage_metrics()
         
         return self
 
-etl = RetailETL('/kaggle/input/retail-transactional-dataset/retail_data.csv')
-etl.run()
-
-print("\n" + "="*80)
-print("GOOD DATA SAMPLE (First 5 rows)")
-print("="*80)
-print(etl.good_df.head())
+if __name__ == '__main__':
+    etl = RetailETL('/kaggle/input/retail-transactional-dataset/retail_data.csv',
+                    metrics_path='/kaggle/working/etl_metrics.jsonl')
+    etl.run()
 
-if len(etl.bad_df) > 0:
     print("\n" + "="*80)
-    print("BAD DATA SAMPLE (First 5 rows)")
+    print("GOOD DATA SAMPLE (First 5 rows)")
     print("="*80)
-    print(etl.bad_df[['Validation_Errors']].head())
+    print(etl.good_df.head())
+
+    if len(etl.bad_df) > 0:
+        print("\n" + "="*80)
+        print("BAD DATA SAMPLE (First 5 rows)")
+        print("="*80)
+        print(render_validation_errors(etl.bad_df['Error_Code'], etl.error_bits).head())
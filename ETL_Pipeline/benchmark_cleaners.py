@@ -0,0 +1,61 @@
+import sys
+import time
+import numpy as np
+import pandas as pd
+from ETL import (
+    clean_text, standardize_phone, clean_numeric,
+    clean_text_vectorized, standardize_phone_vectorized, clean_numeric_vectorized,
+)
+
+INPUT_PATH = '/kaggle/input/retail-transactional-dataset/retail_data.csv'
+
+EDGE_CASES = {
+    'text': pd.Series([' John   Doe ', '\tA\nB ', '', '   ', None, np.nan, 'x\xa0y', 12, ' ü  ö ']),
+    'phone': pd.Series(['(123) 456-7890', '123-456-7890', '12345', None, np.nan, '12²3456789012', 2200037745.0, '']),
+    'numeric': pd.Series(['1', '-2', ' 3 ', '1_000', 'abc', None, np.nan, 'inf', 5, -1.5, '1e3'], dtype=object),
+}
+
+CLEANERS = {
+    'text': (clean_text, clean_text_vectorized),
+    'phone': (standardize_phone, standardize_phone_vectorized),
+    'numeric': (clean_numeric, clean_numeric_vectorized),
+}
+
+def time_call(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+if __name__ == '__main__':
+    input_path = sys.argv[1] if len(sys.argv) > 1 else INPUT_PATH
+    df = pd.read_csv(input_path)
+
+    print("="*80)
+    print("CLEANER PARITY & TIMING")
+    print("="*80)
+
+    print("\nEdge-case parity:")
+    for kind, series in EDGE_CASES.items():
+        scalar, vectorized = CLEANERS[kind]
+        print(f"  {kind:<8}: {series.apply(scalar).equals(vectorized(series))}")
+
+    columns = {'phone': ['Phone']}
+    columns['text'] = [col for col in df.select_dtypes(include=['object']).columns if col.lower() != 'phone']
+    columns['numeric'] = df.select_dtypes(include=[np.number]).columns.tolist()
+    phone_as_text = df['Phone'].astype('Int64').astype(str).where(df['Phone'].notna())
+
+    print(f"\nRows: {len(df):,}")
+    print(f"{'Cleaner':<10} {'Columns':>8} {'apply (s)':>11} {'vectorized (s)':>15} {'Speedup':>9} {'Identical':>10}")
+    for kind, cols in columns.items():
+        scalar, vectorized = CLEANERS[kind]
+        scalar_secs = vectorized_secs = 0.0
+        identical = True
+        for col in cols:
+            series = phone_as_text if kind == 'phone' else df[col]
+            expected, secs = time_call(series.apply, scalar)
+            scalar_secs += secs
+            result, secs = time_call(vectorized, series)
+            vectorized_secs += secs
+            identical &= expected.equals(result)
+        print(f"{kind:<10} {len(cols):>8} {scalar_secs:>11.2f} {vectorized_secs:>15.2f} "
+              f"{scalar_secs/vectorized_secs:>8.1f}x {str(identical):>10}")
@@ -0,0 +1,40 @@
+import sys
+import time
+import pandas as pd
+from ETL import parse_date_robust, parse_dates_vectorized, detect_date_formats
+
+INPUT_PATH = '/kaggle/input/retail-transactional-dataset/retail_data.csv'
+
+def time_call(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+if __name__ == '__main__':
+    input_path = sys.argv[1] if len(sys.argv) > 1 else INPUT_PATH
+    df = pd.read_csv(input_path, usecols=['Date'])
+    dates = df['Date']
+
+    print("="*80)
+    print("DATE PARSING BENCHMARK")
+    print("="*80)
+    print(f"Rows: {len(dates):,}")
+    print(f"Unique values: {dates.nunique():,}")
+
+    _, formats = detect_date_formats(dates.dropna().unique())
+    print("\nDetected formats (unique values):")
+    for fmt, count in formats.value_counts().items():
+        print(f"  {fmt:<12} : {count:>8,}")
+
+    robust, robust_secs = time_call(dates.apply, parse_date_robust)
+    vectorized, vectorized_secs = time_call(parse_dates_vectorized, dates)
+
+    same_nat = (robust.isna() == vectorized.isna()).all()
+    same_values = (robust[robust.notna()] == vectorized[robust.notna()]).all()
+    invalid = (vectorized.isna() & dates.notna()).sum()
+
+    print(f"\nparse_date_robust (apply): {robust_secs:>8.2f}s")
+    print(f"parse_dates_vectorized   : {vectorized_secs:>8.2f}s")
+    print(f"Speedup                  : {robust_secs/vectorized_secs:>8.1f}x")
+    print(f"\nInvalid dates flagged: {invalid:,}")
+    print(f"Results identical: {bool(same_nat and same_values)}")
@@ -0,0 +1,178 @@
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from datetime import datetime
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.append(os.path.join(ROOT, 'DB Creation'))
+sys.path.append(os.path.join(ROOT, 'EDA'))
+from ETL import RetailETL
+from synthetic_data import SEED, generate_csv, parse_size
+
+WORK_DIR = os.path.join(tempfile.gettempdir(), 'retail_benchmark')
+RESULTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_results.jsonl')
+# A stage is flagged when it takes this much longer than in the previous run
+# at the same size, and at least MIN_REGRESSION_SECS longer.
+REGRESSION_RATIO = 1.2
+MIN_REGRESSION_SECS = 0.05
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def timed(records, stage, rows, fn, *args, **kwargs):
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        result = fn(*args, **kwargs)
+    secs = time.perf_counter() - start
+    records.append({'stage': stage, 'rows': rows, 'secs': round(secs, 4),
+                    'rows_per_sec': round(rows / secs) if secs else None, 'peak_rss_mb': round(peak_rss_mb())})
+    return result
+
+def dataset(rows, work_dir, seed, records):
+    path = os.path.join(work_dir, f'retail_{rows}_{seed}.csv')
+    if not os.path.exists(path):
+        timed(records, 'generate', rows, generate_csv, path + '.tmp', rows, seed)
+        os.replace(path + '.tmp', path)
+    return path
+
+# One dataset size end to end, in its own process so peak memory belongs to
+# this size alone.
+def run_size(rows, work_dir, seed):
+    from sqlalchemy import create_engine
+    from bulk_loader import bulk_load
+    from customer_aggregates import aggregate_transactions, derive_analytics, state_to_sql
+    from db_creation_kritika import (
+        INDEXES, build_customer_master, build_loyalty_transactions, build_sales_transactions,
+        create_schema, load_good_data, prepare_raw,
+    )
+    from dimensions import build_dimensions, encode_facts
+    from entity_resolution import resolve_customers
+    from loyalty_ledger import with_balances
+    from loyalty_snapshots import build_snapshots, snapshot_dates
+    from rollups import build_rollups
+    from stream_profiler import profile_csv
+
+    records = []
+    raw_path = dataset(rows, work_dir, seed, records)
+    good_path = os.path.join(work_dir, f'good_{rows}.csv')
+    bad_path = os.path.join(work_dir, f'bad_{rows}.csv')
+    db_path = os.path.join(work_dir, f'retail_{rows}.db')
+
+    etl = RetailETL(raw_path)
+    timed(records, 'etl.extract', rows, etl.extract)
+    timed(records, 'etl.transform', rows, etl.transform)
+    timed(records, 'etl.load', rows, etl.load, good_path, bad_path)
+    del etl
+
+    raw = timed(records, 'load_good_data', rows, load_good_data, good_path)
+    raw = timed(records, 'prepare_raw', rows, prepare_raw, raw)
+    cm = timed(records, 'build_customer_master', rows, build_customer_master, raw)
+    cm['master_customer_id'] = timed(records, 'resolve_customers', rows, resolve_customers, cm)[0]
+    st = timed(records, 'build_sales_transactions', rows, build_sales_transactions, raw)
+    del raw
+    dims = timed(records, 'build_dimensions', rows, build_dimensions, st)
+    facts = timed(records, 'encode_facts', rows, encode_facts, st, dims)
+    state = timed(records, 'aggregate_transactions', rows, aggregate_transactions, st)
+    analytics = timed(records, 'derive_analytics', rows, derive_analytics, state, st['date'].max())
+    ledger = timed(records, 'build_loyalty_transactions', rows, build_loyalty_transactions, st)
+    cm = timed(records, 'with_balances', rows, with_balances, cm, ledger)
+    dates = snapshot_dates(ledger['event_date'].min(), ledger['event_date'].max())
+    snapshots = timed(records, 'build_snapshots', rows, build_snapshots, ledger, dates)
+
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    engine = create_engine(f'sqlite:///{db_path}')
+    timed(records, 'create_schema', rows, create_schema, engine)
+    timed(records, 'bulk_load', rows, bulk_load, engine, {
+        'customer_master': cm,
+        **dims,
+        'sales_transactions': facts,
+        'customer_aggregates': state_to_sql(state),
+        'customer_analytics': analytics,
+        'loyalty_transactions': ledger,
+        'loyalty_balance_snapshots': snapshots,
+    }, indexes=INDEXES)
+    with engine.begin() as conn:
+        timed(records, 'build_rollups', rows, build_rollups, conn)
+    engine.dispose()
+
+    timed(records, 'eda.profile_csv', rows, profile_csv, raw_path)
+    return records
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def read_results(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def previous_run(results, rows, run_id):
+    runs = sorted({r['run_id'] for r in results if r['rows'] == rows and r['run_id'] < run_id})
+    return {r['stage']: r for r in results if runs and r['run_id'] == runs[-1] and r['rows'] == rows}
+
+def print_size(records, previous):
+    rows = records[0]['rows']
+    print(f"\n{rows:,} rows" + (f" (compared with run {next(iter(previous.values()))['run_id']})" if previous else ''))
+    print(f"{'Stage':<28} {'Time (s)':>9} {'Rows/s':>12} {'Peak RSS (MB)':>14} {'Previous (s)':>13} {'Change':>8}")
+    regressions = 0
+    for r in records:
+        before = previous.get(r['stage'])
+        change = ''
+        if before and before['secs']:
+            ratio = r['secs'] / before['secs']
+            slower = ratio >= REGRESSION_RATIO and r['secs'] - before['secs'] >= MIN_REGRESSION_SECS
+            regressions += slower
+            change = f"{ratio:.2f}x" + (' ⚠️' if slower else '')
+        previous_secs = f"{before['secs']:.2f}" if before else '-'
+        print(f"{r['stage']:<28} {r['secs']:>9.2f} {r['rows_per_sec'] or 0:>12,} {r['peak_rss_mb']:>14,} "
+              f"{previous_secs:>13} {change:>8}")
+    print(f"{'total':<28} {sum(r['secs'] for r in records):>9.2f}")
+    return regressions
+
+if __name__ == '__main__':
+    sizes = [parse_size(s) for s in (sys.argv[1] if len(sys.argv) > 1 else '300K').split(',')]
+    work_dir = sys.argv[2] if len(sys.argv) > 2 else WORK_DIR
+    results_path = sys.argv[3] if len(sys.argv) > 3 else RESULTS_PATH
+    os.makedirs(work_dir, exist_ok=True)
+
+    run = {
+        'run_id': datetime.now().strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'cpus': os.cpu_count(),
+        'seed': SEED,
+    }
+    history = read_results(results_path)
+
+    print("="*80)
+    print("END-TO-END PIPELINE BENCHMARK")
+    print("="*80)
+    print(f"Run {run['run_id']} at commit {run['commit']}, {run['cpus']} CPUs; data in {work_dir}")
+
+    regressions = 0
+    for rows in sizes:
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            records = pool.submit(run_size, rows, work_dir, SEED).result()
+        records = [{**run, **r} for r in records]
+        regressions += print_size(records, previous_run(history, rows, run['run_id']))
+        with open(results_path, 'a') as f:
+            for r in records:
+                f.write(json.dumps(r) + '\n')
+
+    print(f"\n✓ Results appended to {results_path}")
+    if regressions:
+        print(f"⚠️  {regressions} stage(s) at least {REGRESSION_RATIO}x slower than the previous run")
@@ -0,0 +1,61 @@
+import io
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+import pandas as pd
+from ETL import RetailETL, read_partitioned
+
+INPUT_PATH = '/kaggle/input/retail-transactional-dataset/retail_data.csv'
+SUBSET_COLUMNS = ['Customer_ID', 'Date', 'Total_Amount']
+PARTITION_FILTER = [('Year', '=', 2023), ('Month', '=', 'April')]
+
+def size_mb(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path) / 1024**2
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, files in os.walk(path) for name in files
+    ) / 1024**2
+
+def time_call(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+def read_csv_partition(path):
+    df = pd.read_csv(path, usecols=SUBSET_COLUMNS + ['Year', 'Month'], parse_dates=['Date'])
+    return df[(df['Year'] == 2023) & (df['Month'] == 'April')][SUBSET_COLUMNS]
+
+if __name__ == '__main__':
+    input_path = sys.argv[1] if len(sys.argv) > 1 else INPUT_PATH
+    etl = RetailETL(input_path)
+    with redirect_stdout(io.StringIO()):
+        etl.extract().transform()
+
+    print("="*80)
+    print("OUTPUT FORMAT BENCHMARK (good records)")
+    print("="*80)
+    print(f"Rows: {len(etl.good_df):,}\n")
+    print(f"{'Format':<8} {'Size (MB)':>10} {'Write (s)':>10} {'Full read (s)':>14} "
+          f"{'3 cols (s)':>11} {'1 month (s)':>12}")
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        for output_format in ['csv', 'parquet', 'ipc']:
+            path = os.path.join(out_dir, f'good_data.{output_format}')
+            etl.output_format = output_format
+            _, write_secs = time_call(etl._write, etl.good_df, path)
+
+            if output_format == 'csv':
+                _, full_secs = time_call(pd.read_csv, path, parse_dates=['Date'])
+                _, cols_secs = time_call(pd.read_csv, path, usecols=SUBSET_COLUMNS, parse_dates=['Date'])
+                _, part_secs = time_call(read_csv_partition, path)
+            else:
+                _, full_secs = time_call(read_partitioned, path, output_format=output_format)
+                _, cols_secs = time_call(read_partitioned, path, columns=SUBSET_COLUMNS, output_format=output_format)
+                _, part_secs = time_call(read_partitioned, path, columns=SUBSET_COLUMNS,
+                                         filters=PARTITION_FILTER, output_format=output_format)
+
+            print(f"{output_format:<8} {size_mb(path):>10.2f} {write_secs:>10.2f} {full_secs:>14.2f} "
+                  f"{cols_secs:>11.3f} {part_secs:>12.3f}")
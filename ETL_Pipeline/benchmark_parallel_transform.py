@@ -0,0 +1,37 @@
+import io
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+from ETL import RetailETL
+from schema import read_retail_csv
+
+INPUT_PATH = '/kaggle/input/retail-transactional-dataset/retail_data.csv'
+WORKER_COUNTS = [1, 2, 4, 8]
+
+def timed_transform(df, n_workers):
+    etl = RetailETL(None, n_workers=n_workers)
+    etl.df = df
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        etl.transform()
+    return etl, time.perf_counter() - start
+
+if __name__ == '__main__':
+    input_path = sys.argv[1] if len(sys.argv) > 1 else INPUT_PATH
+    df = read_retail_csv(input_path)
+
+    print("="*80)
+    print("PARALLEL TRANSFORM SCALING BENCHMARK")
+    print("="*80)
+    print(f"Rows: {len(df):,}")
+    print(f"CPU cores: {os.cpu_count()}\n")
+
+    serial, serial_secs = timed_transform(df, 1)
+    print(f"{'Workers':>8} {'Seconds':>10} {'Speedup':>10} {'Identical':>10}")
+    print(f"{1:>8} {serial_secs:>10.2f} {1.0:>9.2f}x {'-':>10}")
+
+    for n_workers in WORKER_COUNTS[1:]:
+        etl, secs = timed_transform(df, n_workers)
+        identical = etl.good_df.equals(serial.good_df) and etl.bad_df.equals(serial.bad_df)
+        print(f"{n_workers:>8} {secs:>10.2f} {serial_secs/secs:>9.2f}x {str(identical):>10}")
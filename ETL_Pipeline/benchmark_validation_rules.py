@@ -0,0 +1,80 @@
+import sys
+import time
+import numpy as np
+import pandas as pd
+from ETL import RetailETL, build_error_codes
+from validation_rules import STRICT_RETAIL_RULES, RuleSet
+
+INPUT_PATH = '/kaggle/input/retail-transactional-dataset/retail_data.csv'
+REPEATS = 3
+# The strict rule set at 1x, 2x and 4x its size: copies of every rule under new
+# names, the way a growing rule set keeps adding checks on the same columns.
+SCALES = [1, 2, 4]
+
+def cleaned(input_path):
+    etl = RetailETL(input_path)
+    etl.verbose = False
+    etl.df = etl._read()
+    etl.error_bits = build_error_codes(etl.df.columns, schema=etl.schema)
+    return etl._clean_and_validate(etl.df)[0]
+
+def scaled_rules(scale):
+    return [{**rule, 'name': f"{rule['name']} #{i}" if i else rule['name']} for i in range(scale) for rule in STRICT_RETAIL_RULES]
+
+# One pandas pass per rule over the full column, as step 7 used to work.
+def per_rule_masks(df, rules):
+    masks = {}
+    for rule in rules:
+        col = df[rule['column']]
+        if rule['check'] == 'nonzero':
+            mask = col == 0
+        elif rule['check'] == 'type':
+            mask = col % 1 > 0
+        elif rule['check'] == 'range':
+            mask = (col < rule.get('min', -np.inf)) | (col > rule.get('max', np.inf))
+        elif rule['check'] == 'allowed':
+            mask = col.notna() & ~col.astype(object).isin(rule['values'])
+        elif rule['check'] == 'regex':
+            mask = col.notna() & ~col.astype(str).str.fullmatch(rule['pattern'])
+        else:
+            expected = np.prod([df[f].astype('float64') for f in rule['factors']], axis=0)
+            mask = (col - expected).abs() > rule['tolerance']
+        masks[rule['name']] = mask.fillna(False).to_numpy(dtype=bool)
+    return masks
+
+def per_rule_codes(df, rules, error_bits):
+    codes = np.zeros(len(df), dtype='int64')
+    for name, mask in per_rule_masks(df, rules).items():
+        codes[mask] |= error_bits[name]
+    return codes
+
+def best_of(fn, *args):
+    secs = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = fn(*args)
+        secs.append(time.perf_counter() - start)
+    return result, min(secs)
+
+if __name__ == '__main__':
+    input_path = sys.argv[1] if len(sys.argv) > 1 else INPUT_PATH
+    df = cleaned(input_path)
+
+    print("="*80)
+    print("BUSINESS RULES: RULE ENGINE vs ONE PASS PER RULE")
+    print("="*80)
+    print(f"Rows: {len(df):,}   Columns: {len(df.columns)}")
+
+    print(f"\n{'Rules':>6} {'Per rule (ms)':>14} {'Engine (ms)':>12} {'Speedup':>8} {'Same codes':>11}")
+    for scale in SCALES:
+        rules = scaled_rules(scale)
+        error_bits = {rule['name']: 1 << (bit % 63) for bit, rule in enumerate(rules)}
+        expected, per_rule_secs = best_of(per_rule_codes, df, rules, error_bits)
+        (codes, report), engine_secs = best_of(RuleSet(rules).evaluate, df, error_bits)
+        print(f"{len(rules):>6} {per_rule_secs * 1000:>14.1f} {engine_secs * 1000:>12.1f} "
+              f"{per_rule_secs / engine_secs:>7.1f}x {str(np.array_equal(expected, codes.to_numpy())):>11}")
+
+    _, report = RuleSet(STRICT_RETAIL_RULES).evaluate(df, build_error_codes(df.columns, STRICT_RETAIL_RULES))
+    print(f"\n{'Rule':<32} {'Check':<8} {'Rejected':>9} {'Time (ms)':>10}")
+    for row in report.itertuples():
+        print(f"{row.rule:<32} {row.check:<8} {row.rejected:>9,} {row.secs * 1000:>10.2f}")
@@ -0,0 +1,105 @@
+import os
+import numpy as np
+import pandas as pd
+
+# 64-bit row hashes over normalized values: numbers as float64, dates as
+# nanoseconds and text stripped, so the same row hashes the same whatever
+# dtypes a run happened to load it with. Text is stripped and hashed in
+# vectorized passes, over the distinct values unless almost all of them are.
+# The per-column hashes are mixed in column order. DedupIndex
+# keeps the hashes of every row accepted so far as a sorted array, optionally
+# saved to disk, so later batches and later runs are checked against
+# everything loaded before.
+MIX = np.uint64(0x100000001b3)
+
+# The hash pd.util.hash_array gives missing values, kept so that indexes
+# saved by earlier runs still match.
+MISSING_HASH = np.uint64(np.iinfo(np.uint64).max)
+
+def _hash_text(values):
+    values = pd.Series(values, dtype=object)
+    try:
+        stripped = values.str.strip()
+    except AttributeError:
+        stripped = pd.Series(np.nan, index=values.index, dtype=object)
+    missing = values.isna().to_numpy()
+    # .str gives NaN for values that are not strings; those hash as their str()
+    other = stripped.isna().to_numpy() & ~missing
+    if other.any():
+        stripped[other] = values[other].map(str)
+    hashes = pd.util.hash_array(stripped.to_numpy(dtype=object), categorize=False)
+    hashes[missing] = MISSING_HASH
+    return hashes
+
+# Factorizing first strips and hashes each distinct value once, which pays
+# off unless nearly every value is distinct, as with names, emails and
+# addresses; a sample from the start of the column decides.
+DISTINCT_SAMPLE = 10_000
+
+def _mostly_distinct(values):
+    sample = values[:DISTINCT_SAMPLE]
+    return len(pd.unique(sample)) > len(sample) // 2
+
+def column_hash(series):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # missing values have code -1, which picks the trailing MISSING_HASH
+        categories = _hash_text(series.cat.categories.to_numpy(dtype=object))
+        return np.append(categories, MISSING_HASH)[series.cat.codes.to_numpy()]
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return pd.util.hash_array(series.to_numpy(dtype='datetime64[ns]').view('int64'))
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_numeric_dtype(series):
+        return pd.util.hash_array(series.to_numpy(dtype='float64', na_value=np.nan))
+    values = series.to_numpy(dtype=object)
+    if _mostly_distinct(values) and pd.api.types.infer_dtype(values, skipna=True) == 'string':
+        return _hash_text(values)
+    codes, uniques = pd.factorize(values)
+    return np.append(_hash_text(uniques), MISSING_HASH)[codes]
+
+def row_hashes(df, columns=None):
+    columns = list(df.columns if columns is None else columns)
+    hashes = np.zeros(len(df), dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for col in columns:
+            hashes = (hashes ^ column_hash(df[col])) * MIX
+    return hashes
+
+class DedupIndex:
+    def __init__(self, path=None):
+        self.path = path
+        if path and os.path.exists(path):
+            self.hashes = np.load(path)
+        else:
+            self.hashes = np.empty(0, dtype=np.uint64)
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def contains(self, hashes):
+        pos = np.searchsorted(self.hashes, hashes)
+        in_range = pos < len(self.hashes)
+        found = np.zeros(len(hashes), dtype=bool)
+        found[in_range] = self.hashes[pos[in_range]] == hashes[in_range]
+        return found
+
+    def add(self, hashes):
+        new = np.unique(hashes)
+        new = new[~self.contains(new)]
+        self.hashes = np.insert(self.hashes, np.searchsorted(self.hashes, new), new)
+        return len(new)
+
+    def check(self, hashes):
+        duplicates = pd.Series(hashes).duplicated(keep='first').to_numpy() | self.contains(hashes)
+        self.add(hashes[~duplicates])
+        return duplicates
+
+    def save(self):
+        if not self.path:
+            return None
+        tmp = self.path + '.tmp.npy'
+        np.save(tmp, self.hashes)
+        os.replace(tmp, self.path)
+        return self.path
+
+def duplicate_rows(df, columns=None, index=None):
+    index = DedupIndex() if index is None else index
+    return pd.Series(index.check(row_hashes(df, columns)), index=df.index)
@@ -0,0 +1,264 @@
+import cProfile
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+import pandas as pd
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Structured metrics for pipeline stages, one JSON line per stage: wall and
+# CPU seconds, the process's peak RSS so far (process_peak_rss_mb, which
+# never goes down, so it is not the stage's own peak), the resident memory
+# the stage added (rss_delta_mb) and rows per second. Stages nest, so a
+# transform step and each column it touches are recorded separately and
+# 'parent' names the enclosing stage. Tags such as the chunk number are added
+# to every record taken while they are set.
+#
+# While tracemalloc is running, each record also has the memory the stage
+# allocated and kept (alloc_delta_mb) and the most it had allocated at once
+# (alloc_peak_mb); otherwise both are None. trace_memory=True runs
+# tracemalloc for every stage, which slows Python-level work down.
+#
+# Any single stage can be profiled by name, or by 'name:column' for one
+# column. cProfile writes a .prof file that loads with pstats; tracemalloc
+# traces the stage and writes its top allocation sites. Only the outermost
+# profiled stage is profiled.
+PROFILERS = ('cprofile', 'tracemalloc')
+TOP_ALLOCATIONS = 25
+MB = 1024 * 1024
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / MB if sys.platform == 'darwin' else peak / 1024
+
+def rss_mb():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / MB
+    except (OSError, ValueError, AttributeError):
+        return peak_rss_mb()
+
+def _json_default(value):
+    return value.item() if hasattr(value, 'item') else str(value)
+
+def _rounded(value, digits):
+    return None if value is None else round(value, digits)
+
+class StageMetrics:
+    def __init__(self, path=None, profile=None, profile_dir=None, trace_memory=False, **context):
+        profile = dict(profile or {})
+        if set(profile.values()) - set(PROFILERS):
+            raise ValueError(f"profilers must be one of {list(PROFILERS)}")
+        self.path = path
+        self.profile = profile
+        self.profile_dir = profile_dir or (os.path.dirname(os.path.abspath(path)) if path else '.')
+        self.trace_memory = trace_memory
+        self.context = {'run_id': datetime.now().strftime('%Y-%m-%dT%H:%M:%S'), **context}
+        self.tags = {}
+        self.records = []
+        self._stack = []
+        self._profiling = False
+
+    @contextmanager
+    def tagged(self, **tags):
+        previous = self.tags
+        self.tags = {**previous, **tags}
+        try:
+            yield
+        finally:
+            self.tags = previous
+
+    @contextmanager
+    def stage(self, name, rows=None, **fields):
+        state = self._begin(name, rows, fields)
+        try:
+            yield state['record']
+        except BaseException as e:
+            state['record']['error'] = type(e).__name__
+            raise
+        finally:
+            self.emit(self._end(state))
+
+    def call(self, name, fn, *args, rows=None, **kwargs):
+        with self.stage(name, rows):
+            return fn(*args, **kwargs)
+
+    # Times pulling each item from an iterable, such as chunks from a reader,
+    # as its own stage; the final pull that finds nothing is not recorded.
+    def iterate(self, name, items):
+        items = iter(items)
+        for i in range(sys.maxsize):
+            state = self._begin(name, None, {'chunk': i})
+            item = next(items, None)
+            record = self._end(state)
+            if item is None:
+                return
+            record['rows'] = len(item)
+            record['rows_per_sec'] = round(len(item) / record['wall_secs']) if record['wall_secs'] else None
+            self.emit(record)
+            yield item
+
+    def emit(self, record, parent=None):
+        if parent and record.get('parent') is None:
+            record = {**record, 'parent': parent}
+        self.records.append(record)
+        if self.path:
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(record, default=_json_default) + '\n')
+        return record
+
+    def _begin(self, name, rows, fields):
+        record = {**self.context, **self.tags, 'stage': name, **fields,
+                  'parent': self._stack[-1]['record']['stage'] if self._stack else None, 'rows': rows}
+        state = {'record': record, 'profiler': self._start_profile(name, fields)}
+        state['traced'] = self.trace_memory and not tracemalloc.is_tracing()
+        if state['traced']:
+            tracemalloc.start()
+        state['alloc'] = self._start_alloc()
+        self._stack.append(state)
+        state['rss'] = rss_mb()
+        state['wall'] = time.perf_counter()
+        state['cpu'] = time.process_time()
+        return state
+
+    def _end(self, state):
+        wall = time.perf_counter() - state['wall']
+        cpu = time.process_time() - state['cpu']
+        rss = rss_mb()
+        alloc_delta, alloc_peak = self._end_alloc(state['alloc'])
+        self._stack.pop()
+        record = state['record']
+        rows = record['rows']
+        record.update({
+            'wall_secs': round(wall, 4),
+            'cpu_secs': round(cpu, 4),
+            'process_peak_rss_mb': _rounded(peak_rss_mb(), 1),
+            'rss_delta_mb': _rounded(rss - state['rss'] if rss is not None and state['rss'] is not None else None, 1),
+            'alloc_delta_mb': _rounded(alloc_delta, 1),
+            'alloc_peak_mb': _rounded(alloc_peak, 1),
+            'rows_per_sec': round(rows / wall) if rows and wall else None,
+        })
+        self._stop_profile(state['profiler'], record)
+        if state['traced']:
+            tracemalloc.stop()
+        return record
+
+    # tracemalloc keeps a single peak, so each stage resets it when it starts.
+    # Before the reset, the enclosing stage keeps the peak it had reached, and
+    # at its end takes the larger of that and the peak since.
+    def _start_alloc(self):
+        if not tracemalloc.is_tracing():
+            return None
+        current, peak = tracemalloc.get_traced_memory()
+        parent = self._stack[-1]['alloc'] if self._stack else None
+        if parent is not None:
+            parent['peak'] = max(parent['peak'], peak)
+        tracemalloc.reset_peak()
+        return {'start': current, 'peak': current}
+
+    def _end_alloc(self, alloc):
+        if alloc is None or not tracemalloc.is_tracing():
+            return None, None
+        current, peak = tracemalloc.get_traced_memory()
+        return (current - alloc['start']) / MB, (max(alloc['peak'], peak) - alloc['start']) / MB
+
+    def _profile_path(self, name, fields, extension):
+        labels = {**self.context, **self.tags, **fields}
+        parts = [name] + [str(v) for k, v in labels.items() if k != 'run_id']
+        filename = '-'.join(parts).replace(os.sep, '_').replace(' ', '_')
+        return os.path.join(self.profile_dir, f"{self.context['run_id'].replace(':', '')}-{filename}{extension}")
+
+    def _start_profile(self, name, fields):
+        kind = self.profile.get(f"{name}:{fields['column']}") if 'column' in fields else None
+        kind = kind or self.profile.get(name)
+        if not kind or self._profiling:
+            return None
+        self._profiling = True
+        if kind == 'cprofile':
+            profiler = cProfile.Profile()
+            profiler.enable()
+            return {'kind': kind, 'profiler': profiler, 'path': self._profile_path(name, fields, '.prof')}
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        return {'kind': kind, 'started': started, 'before': tracemalloc.take_snapshot(),
+                'path': self._profile_path(name, fields, '.txt')}
+
+    def _stop_profile(self, profile, record):
+        if profile is None:
+            return
+        self._profiling = False
+        os.makedirs(self.profile_dir, exist_ok=True)
+        if profile['kind'] == 'cprofile':
+            profile['profiler'].disable()
+            profile['profiler'].dump_stats(profile['path'])
+        else:
+            after = tracemalloc.take_snapshot()
+            if profile['started']:
+                tracemalloc.stop()
+            with open(profile['path'], 'w') as f:
+                for stat in after.compare_to(profile['before'], 'lineno')[:TOP_ALLOCATIONS]:
+                    f.write(f"{stat}\n")
+        record['profile'] = profile['path']
+
+    def summary(self, records=None):
+        return summarize(self.records if records is None else records)
+
+def read_metrics(path, run_id=None):
+    with open(path) as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    run_id = run_id or (records[-1]['run_id'] if records else None)
+    return [r for r in records if r['run_id'] == run_id]
+
+# Totals per stage (summed over chunks and partitions) and per column, in
+# the order stages first ran.
+def summarize(records):
+    # metrics files from before the RSS peak was renamed
+    df = pd.DataFrame(records).rename(columns={'peak_rss_mb': 'process_peak_rss_mb'})
+    if df.empty:
+        return df
+    for col in ('column', 'alloc_delta_mb', 'alloc_peak_mb'):
+        if col not in df:
+            df[col] = None
+    df['column'] = df['column'].fillna('')
+    summary = df.groupby(['stage', 'column'], sort=False).agg(
+        runs=('wall_secs', 'size'),
+        rows=('rows', lambda rows: rows.sum(min_count=1)),
+        wall_secs=('wall_secs', 'sum'),
+        cpu_secs=('cpu_secs', 'sum'),
+        process_peak_rss_mb=('process_peak_rss_mb', 'max'),
+        rss_delta_mb=('rss_delta_mb', 'sum'),
+        alloc_delta_mb=('alloc_delta_mb', lambda alloc: alloc.sum(min_count=1)),
+        alloc_peak_mb=('alloc_peak_mb', 'max'),
+    ).reset_index()
+    summary['rows'] = summary['rows'].astype('Int64')
+    summary['rows_per_sec'] = (summary['rows'] / summary['wall_secs']).round().astype('Int64')
+    return summary
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print("Usage: python instrumentation.py <metrics.jsonl> [run_id] [top_columns]")
+        sys.exit(1)
+    records = read_metrics(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
+    top_columns = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+    summary = summarize(records)
+
+    print("="*80)
+    print(f"STAGE METRICS - RUN {records[0]['run_id'] if records else '-'}")
+    print("="*80)
+    with pd.option_context('display.width', 200, 'display.max_columns', None, 'display.float_format', '{:,.2f}'.format):
+        print(summary[summary['column'] == ''].drop(columns='column').to_string(index=False))
+        columns = summary[summary['column'] != ''].sort_values('wall_secs', ascending=False).head(top_columns)
+        if len(columns):
+            print("\nSlowest columns")
+            print(columns.to_string(index=False))
@@ -0,0 +1,233 @@
+import io
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime
+import pandas as pd
+from schema import RETAIL_SCHEMA, read_retail_csv
+from validation_rules import RETAIL_RULES
+
+# Rejected rows are kept with their raw values as text, so reprocessing
+# parses them exactly as a fresh read of the input would. Each row records the
+# error code and rules version of its last check, and the format of the good
+# output its run wrote; quarantine_rules holds the error names behind each
+# version's bits. Rows are keyed by source file and row number, and a new ETL
+# run over a source replaces that source's rows.
+META_COLUMNS = ['source', 'source_row', 'error_code', 'rules_version', 'output_format', 'quarantined_at', 'checked_at',
+                'promoted_at']
+DDL = """
+CREATE TABLE IF NOT EXISTS quarantine (
+    source VARCHAR NOT NULL,
+    source_row INTEGER NOT NULL,
+    error_code INTEGER NOT NULL,
+    rules_version VARCHAR NOT NULL,
+    output_format VARCHAR,
+    quarantined_at TIMESTAMP NOT NULL,
+    checked_at TIMESTAMP NOT NULL,
+    promoted_at TIMESTAMP,
+    PRIMARY KEY (source, source_row)
+);
+CREATE INDEX IF NOT EXISTS idx_quarantine_pending ON quarantine(promoted_at);
+CREATE TABLE IF NOT EXISTS quarantine_rules (
+    rules_version VARCHAR NOT NULL,
+    error_bit INT NOT NULL,
+    error_code INT NOT NULL,
+    validation_error VARCHAR NOT NULL,
+    PRIMARY KEY (rules_version, error_bit)
+);
+"""
+
+def _now():
+    return datetime.now().isoformat(sep=' ', timespec='seconds')
+
+def _as_text(df):
+    return pd.DataFrame({col: df[col].astype(str).where(df[col].notna(), None) for col in df.columns}, index=df.index)
+
+class QuarantineStore:
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(DDL)
+        # stores written before the output format was recorded
+        if 'output_format' not in self._columns():
+            self.conn.execute("ALTER TABLE quarantine ADD COLUMN output_format VARCHAR")
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def _columns(self):
+        return [row[1] for row in self.conn.execute("PRAGMA table_info(quarantine)")]
+
+    def raw_columns(self):
+        return [col for col in self._columns() if col not in META_COLUMNS]
+
+    def _add_columns(self, columns):
+        known = set(self.raw_columns())
+        for col in columns:
+            if col not in known:
+                self.conn.execute(f'ALTER TABLE quarantine ADD COLUMN "{col}" TEXT')
+
+    def save_rules(self, rules_version, error_bits):
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO quarantine_rules VALUES (?, ?, ?, ?)",
+            [(rules_version, bit, code, error) for bit, (error, code) in enumerate(error_bits.items())]
+        )
+
+    def clear_source(self, source):
+        return self.conn.execute("DELETE FROM quarantine WHERE source = ?", (source,)).rowcount
+
+    def add(self, raw_bad, error_codes, source, rules_version, output_format):
+        if raw_bad.empty:
+            return 0
+        self._add_columns(raw_bad.columns)
+        now = _now()
+        rows = _as_text(raw_bad)
+        rows.insert(0, 'source', source)
+        rows.insert(1, 'source_row', raw_bad.index.astype('int64'))
+        rows.insert(2, 'error_code', error_codes.to_numpy(dtype='int64'))
+        rows.insert(3, 'rules_version', rules_version)
+        rows.insert(4, 'output_format', output_format)
+        rows.insert(5, 'quarantined_at', now)
+        rows.insert(6, 'checked_at', now)
+        columns = ', '.join(f'"{col}"' for col in rows.columns)
+        self.conn.executemany(
+            f"INSERT OR REPLACE INTO quarantine ({columns}) VALUES ({', '.join('?' * len(rows.columns))})",
+            rows.itertuples(index=False, name=None)
+        )
+        return len(rows)
+
+    def pending(self):
+        columns = ', '.join(f'"{col}"' for col in ['source', 'source_row', 'error_code', 'rules_version'] + self.raw_columns())
+        return pd.read_sql(f"SELECT {columns} FROM quarantine WHERE promoted_at IS NULL", self.conn)
+
+    # The good output the pending rows will be appended to must be written in
+    # the format their run used.
+    def output_format(self):
+        formats = [row[0] for row in self.conn.execute(
+            "SELECT DISTINCT output_format FROM quarantine WHERE promoted_at IS NULL"
+        )]
+        if None in formats:
+            raise ValueError("Some quarantined rows have no recorded output format; pass output_format")
+        if len(formats) > 1:
+            raise ValueError(f"Quarantined rows were written as {sorted(formats)}; pass output_format")
+        return formats[0] if formats else None
+
+    def error_code_of(self, error):
+        return dict(self.conn.execute(
+            "SELECT rules_version, error_code FROM quarantine_rules WHERE validation_error = ?", (error,)
+        ).fetchall())
+
+    def record_checks(self, checked, rules_version, promoted):
+        now = _now()
+        self.conn.executemany(
+            """
+            UPDATE quarantine SET error_code = ?, rules_version = ?, checked_at = ?,
+                promoted_at = CASE WHEN ? THEN ? END
+            WHERE source = ? AND source_row = ?
+            """,
+            [(int(code), rules_version, now, bool(ok), now, source, int(row))
+             for code, ok, source, row in zip(checked['error_code'], promoted, checked['source'], checked['source_row'])]
+        )
+
+    def summary(self):
+        return pd.read_sql(
+            """
+            SELECT rules_version,
+                   SUM(promoted_at IS NULL) AS quarantined,
+                   SUM(promoted_at IS NOT NULL) AS promoted
+            FROM quarantine GROUP BY rules_version ORDER BY MAX(checked_at)
+            """,
+            self.conn
+        )
+
+# Re-validates the quarantined rows against the current rules. Steps 1-5
+# and 7 are rerun on the stored raw values. Duplicates depend on the rest of
+# the data rather than on the rules, so a row's Duplicate bit is carried
+# over. Rows that now pass are appended to the good output, in the format
+# recorded with them unless output_format is given, and when promoted_path is
+# given, they are also written there as CSV on their own for the database
+# load.
+def reprocess(store_path, good_path, rules=RETAIL_RULES, output_format=None, promoted_path=None, schema=RETAIL_SCHEMA):
+    from ETL import RetailETL, build_error_codes
+
+    start = time.perf_counter()
+    store = QuarantineStore(store_path)
+    try:
+        pending = store.pending()
+        raw_columns = [col for col in pending.columns if col not in META_COLUMNS]
+        result = {'pending': len(pending), 'promoted': 0, 'still_bad': 0}
+        if pending.empty:
+            result['secs'] = time.perf_counter() - start
+            return result
+        output_format = output_format or store.output_format()
+
+        buffer = io.StringIO()
+        pending[raw_columns].to_csv(buffer, index=False)
+        buffer.seek(0)
+        raw = read_retail_csv(buffer, schema) if schema else pd.read_csv(buffer)
+
+        etl = RetailETL(None, output_format=output_format, rules=rules)
+        etl.verbose = False
+        etl.error_bits = build_error_codes(raw.columns, etl.rules.rules, schema)
+        df_clean, error_codes = etl._clean_and_validate(raw)
+        error_codes |= etl._validate_business_rules(df_clean)
+        duplicate_bits = pending['rules_version'].map(store.error_code_of('Duplicate')).fillna(0).astype('int64')
+        was_duplicate = (pending['error_code'] & duplicate_bits) != 0
+        error_codes[was_duplicate.to_numpy()] |= etl.error_bits['Duplicate']
+
+        promoted = (error_codes == 0).to_numpy()
+        good_df = df_clean[promoted]
+        if len(good_df):
+            # appending: CSV output gets no second header, and columnar
+            # output gets new part files next to the existing ones
+            part = 0 if output_format == 'csv' and not os.path.exists(good_path) else datetime.now().strftime('r%Y%m%d%H%M%S')
+            etl._write(good_df, good_path, part=part)
+            if promoted_path:
+                good_df.to_csv(promoted_path, index=False)
+
+        version = etl.rules.version
+        store.save_rules(version, etl.error_bits)
+        store.record_checks(pending.assign(error_code=error_codes.to_numpy()), version, promoted)
+        result.update(promoted=int(promoted.sum()), still_bad=int((~promoted).sum()),
+                      rejected_by=_rejected_by(error_codes[~promoted], etl.error_bits))
+        result['secs'] = time.perf_counter() - start
+        return result
+    finally:
+        store.close()
+
+def _rejected_by(error_codes, error_bits):
+    codes = error_codes.to_numpy()
+    counts = {error: int(((codes & bit) != 0).sum()) for error, bit in error_bits.items()}
+    return {error: count for error, count in counts.items() if count}
+
+if __name__ == '__main__':
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--format=')]
+    if len(args) < 2:
+        print("Usage: python quarantine.py <quarantine.db> <good_path> [db_url] [--format=csv|parquet|ipc]")
+        sys.exit(1)
+    store_path, good_path = args[0], args[1]
+    db_url = args[2] if len(args) > 2 else None
+    # the format recorded with the quarantined rows, unless given
+    output_format = next((arg.split('=', 1)[1] for arg in sys.argv[1:] if arg.startswith('--format=')), None)
+    promoted_path = None
+    if db_url:
+        promoted_path = os.path.join(os.path.dirname(os.path.abspath(store_path)),
+                                     f"promoted_{datetime.now():%Y%m%d%H%M%S}.csv")
+
+    print("="*80)
+    print("REPROCESSING QUARANTINED ROWS")
+    print("="*80)
+    result = reprocess(store_path, good_path, output_format=output_format, promoted_path=promoted_path)
+    print(f"Rows checked: {result['pending']:,} in {result['secs']:.2f}s")
+    print(f"✓ Promoted to {good_path}: {result['promoted']:,}")
+    print(f"  Still quarantined: {result['still_bad']:,}")
+    for error, count in result.get('rejected_by', {}).items():
+        print(f"  - {error}: {count:,}")
+
+    if db_url and result['promoted']:
+        sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'DB Creation'))
+        from incremental_etl import run_incremental
+        print(f"\n🔹 Loading promoted rows into {db_url}")
+        run_incremental(promoted_path, db_url, use_watermark=False)
@@ -0,0 +1,92 @@
+import sys
+import numpy as np
+import pandas as pd
+
+# Column types for the retail dataset. Numeric columns follow
+# EDA/eda_reports 1/dtype_suggestions.csv, narrowed to the value ranges in the
+# EDA report; text columns with a handful of distinct values are categoricals.
+RETAIL_SCHEMA = {
+    'Transaction_ID': 'Int32',
+    'Customer_ID': 'Int32',
+    'Name': 'object',
+    'Email': 'object',
+    'Phone': 'Int64',
+    'Address': 'object',
+    'City': 'category',
+    'State': 'category',
+    'Zipcode': 'Int32',
+    'Country': 'category',
+    'Age': 'Int8',
+    'Gender': 'category',
+    'Income': 'category',
+    'Customer_Segment': 'category',
+    'Date': 'object',
+    'Year': 'Int16',
+    'Month': 'category',
+    'Time': 'object',
+    'Total_Purchases': 'Int8',
+    'Amount': 'float64',
+    'Total_Amount': 'float64',
+    'Product_Category': 'category',
+    'Product_Brand': 'category',
+    'Product_Type': 'category',
+    'Feedback': 'category',
+    'Shipping_Method': 'category',
+    'Payment_Method': 'category',
+    'Order_Status': 'category',
+    'Ratings': 'Int8',
+    'products': 'category',
+}
+
+INTEGER_DTYPES = {'Int8', 'Int16', 'Int32', 'Int64'}
+
+def read_dtypes(schema=RETAIL_SCHEMA):
+    return {col: dtype for col, dtype in schema.items() if dtype in ('object', 'category')}
+
+def apply_schema(df, schema=RETAIL_SCHEMA):
+    for col, dtype in schema.items():
+        if col not in df.columns or dtype not in INTEGER_DTYPES:
+            continue
+        values = df[col]
+        if not pd.api.types.is_numeric_dtype(values):
+            continue
+        present = values.dropna()
+        info = np.iinfo(dtype.lower())
+        integral = (present % 1 == 0).all()
+        in_range = present.empty or (present.min() >= info.min and present.max() <= info.max)
+        if integral and in_range:
+            df[col] = values.astype(dtype)
+    return df
+
+def read_retail_csv(path, schema=RETAIL_SCHEMA, **kwargs):
+    dtypes = read_dtypes(schema)
+    for col in kwargs.get('parse_dates') or []:
+        dtypes.pop(col, None)
+    df = pd.read_csv(path, dtype=dtypes, **kwargs)
+    if isinstance(df, pd.DataFrame):
+        return apply_schema(df, schema)
+    return (apply_schema(chunk, schema) for chunk in df)
+
+def default_memory_usage(df):
+    total = df.index.memory_usage()
+    for col in df.columns:
+        values = df[col]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            counts = values.value_counts(dropna=False)
+            total += 8 * len(values) + sum(
+                sys.getsizeof(np.nan if pd.isna(value) else value) * count
+                for value, count in counts.items()
+            )
+        elif pd.api.types.is_extension_array_dtype(values.dtype) and pd.api.types.is_numeric_dtype(values):
+            total += 8 * len(values)
+        else:
+            total += values.memory_usage(index=False, deep=True)
+    return total
+
+def memory_report(df):
+    compact = df.memory_usage(deep=True).sum()
+    default = default_memory_usage(df)
+    return (
+        f"Memory: {compact / 1024**2:.2f} MB "
+        f"(default dtypes: {default / 1024**2:.2f} MB, saved {(default - compact) / 1024**2:.2f} MB)"
+    )
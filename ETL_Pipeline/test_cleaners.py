@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+from ETL import (
+    clean_text, standardize_phone, clean_numeric,
+    clean_text_vectorized, standardize_phone_vectorized, clean_numeric_vectorized,
+)
+
+# The vectorized cleaners must return exactly what Series.apply gives with the
+# row-by-row cleaners, including for the inputs that take their fallbacks.
+TEXT = [' John   Doe ', '\tA\nB ', 'Café', ' ü  ö ', 'x\xa0y', '　東京　', '', '   ', None, np.nan, 12]
+PHONES = [
+    '(123) 456-7890', '123-456-7890', '123-456-789', '123456789', '1234567890',
+    '+1 (234) 567-8901', '+44 20 7946 0958', '555.123.4567', '12345', '',
+    '12²3456789012', '１２３４５６７８９０', None, np.nan, 2200037745.0, 123456789.0,
+]
+NUMBERS = [
+    '1', ' 3 ', '1e3', '0', '-0', '-2', '-1.5', '$12.50', '€5', '12.50 USD', '1,000', '1_000',
+    'abc', 'inf', '-inf', '', None, np.nan, 5, -1.5, 0.0,
+]
+
+def assert_same(scalar, vectorized, series):
+    pd.testing.assert_series_equal(vectorized(series), series.apply(scalar))
+
+@pytest.mark.parametrize('value', TEXT)
+def test_clean_text_value(value):
+    assert_same(clean_text, clean_text_vectorized, pd.Series([value], dtype=object))
+
+def test_clean_text_column():
+    assert_same(clean_text, clean_text_vectorized, pd.Series(TEXT * 3, dtype=object))
+
+def test_clean_text_categorical():
+    series = pd.Series(TEXT[:6] * 2 + [None], dtype='category')
+    result = clean_text_vectorized(series)
+    expected = series.astype(object).apply(clean_text)
+    pd.testing.assert_series_equal(result.astype(object), expected.astype(object))
+
+@pytest.mark.parametrize('value', PHONES)
+def test_standardize_phone_value(value):
+    assert_same(standardize_phone, standardize_phone_vectorized, pd.Series([value], dtype=object))
+
+def test_standardize_phone_column():
+    assert_same(standardize_phone, standardize_phone_vectorized, pd.Series(PHONES * 3, dtype=object))
+
+def test_phone_digit_counts():
+    result = standardize_phone_vectorized(pd.Series(['123-456-789', '(123) 456-7890', '+1 234 567 8901']))
+    assert result.isna().tolist() == [True, False, False]
+    assert result.iloc[1] == '1234567890'
+    assert result.iloc[2] == '12345678901'
+
+@pytest.mark.parametrize('value', NUMBERS)
+def test_clean_numeric_value(value):
+    series = pd.Series([value], dtype=object)
+    # apply keeps an all-None column as object; the cleaned column is float
+    pd.testing.assert_series_equal(clean_numeric_vectorized(series), series.apply(clean_numeric).astype('float64'))
+
+def test_clean_numeric_integer_strings():
+    assert_same(clean_numeric, clean_numeric_vectorized, pd.Series(['1', '2', '-3', '40'], dtype=object))
+
+def test_clean_numeric_column():
+    assert_same(clean_numeric, clean_numeric_vectorized, pd.Series(NUMBERS * 3, dtype=object))
+
+@pytest.mark.parametrize('series', [
+    pd.Series([1.5, -2.0, 0.0, np.nan, 3.0]),
+    pd.Series([1, -2, 0, 3]),
+])
+def test_clean_numeric_typed(series):
+    assert_same(clean_numeric, clean_numeric_vectorized, series)
+
+def test_clean_numeric_nullable():
+    series = pd.Series([1, -2, None, 4], dtype='Int64')
+    result = clean_numeric_vectorized(series)
+    assert result.isna().tolist() == [False, True, True, False]
+    assert result.dropna().tolist() == [1, 4]
+
+def test_negative_and_currency_become_nan():
+    result = clean_numeric_vectorized(pd.Series(['-2', '$12.50', '12.50', None], dtype=object))
+    assert result.isna().tolist() == [True, True, False, True]
+    assert result.iloc[2] == 12.5
@@ -0,0 +1,45 @@
+import warnings
+import numpy as np
+import pandas as pd
+import pytest
+from ETL import detect_date_formats, parse_date_robust, parse_dates_vectorized
+
+# parse_dates_vectorized must give what parse_date_robust gives value by
+# value, for known formats, two-digit years, time-only values and whatever
+# is left to the mixed-format fallback.
+DATES = [
+    '03-15-23', '15-03-23', '03/15/2023', '2023-03-15', '2023/03/15', '15.03.2023', '20230315',
+    'Mar 15, 2023', 'March 15, 2023', '15 Mar 2023', '01-01-99', '12/31/49',
+    '16:30:04', '5:38:08', '05:38', '24:00:00', '12:00:60', '1:2', '16:30:04.5', '7:05 PM',
+    'Tue, 7 Mar 2023', '2023-03-05T10:00:00', '2023', 'garbage', '2023-13-45', '', '   ', None, np.nan,
+]
+
+def test_matches_row_by_row():
+    series = pd.Series(DATES, dtype=object)
+    expected = series.apply(parse_date_robust).astype('datetime64[ns]')
+    pd.testing.assert_series_equal(parse_dates_vectorized(series), expected)
+
+def test_repeated_values():
+    series = pd.Series(DATES * 3, dtype=object)
+    expected = series.apply(parse_date_robust).astype('datetime64[ns]')
+    pd.testing.assert_series_equal(parse_dates_vectorized(series), expected)
+
+def test_fallback_does_not_warn():
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        detect_date_formats(['Tue, 7 Mar 2023', '16:30:04', 'garbage'])
+
+def test_detected_formats():
+    _, formats = detect_date_formats(['2023-03-15', '16:30:04', 'Tue, 7 Mar 2023', 'garbage'])
+    assert formats[:3].tolist() == ['%Y-%m-%d', '%H:%M:%S', 'inferred']
+    assert pd.isna(formats[3])
+
+@pytest.mark.parametrize('values', [
+    ['2023-03-05 10:00:00+02:00', 'Tue, 7 Mar 2023'],
+    ['2023-03-05 10:00:00+02:00', '2023-03-05 10:00:00-05:00', 'Tue, 7 Mar 2023'],
+])
+def test_utc_offsets_are_left_unparsed(values):
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        parsed, _ = detect_date_formats(values)
+    assert parsed.isna().tolist() == [True] * (len(values) - 1) + [False]
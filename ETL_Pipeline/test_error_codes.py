@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+from ETL import RetailETL, build_error_codes
+from schema import RETAIL_SCHEMA
+from validation_rules import RETAIL_RULES, STRICT_RETAIL_RULES
+
+COLUMNS = list(RETAIL_SCHEMA)
+CHECKED = ['Date', 'Time', 'Transaction_ID', 'Customer_ID', 'Phone', 'Zipcode', 'Age', 'Year',
+           'Total_Purchases', 'Amount', 'Total_Amount', 'Ratings']
+
+def extra_rules(n):
+    return [{'name': f'Extra {i}', 'column': 'Age', 'check': 'range', 'max': 100 + i} for i in range(n)]
+
+def invalid_columns(error_bits):
+    return [error[len('Invalid '):] for error in error_bits if error.startswith('Invalid ')]
+
+def test_invalid_bits_follow_the_schema():
+    assert sorted(invalid_columns(build_error_codes(COLUMNS, RETAIL_RULES, RETAIL_SCHEMA))) == sorted(CHECKED)
+
+def test_columns_outside_the_schema_keep_a_bit():
+    error_bits = build_error_codes(COLUMNS + ['Discount'], RETAIL_RULES, RETAIL_SCHEMA)
+    assert 'Invalid Discount' in error_bits
+
+def test_without_schema_every_column_has_a_bit():
+    assert invalid_columns(build_error_codes(COLUMNS)) == ['Date', 'Time'] + [
+        col for col in COLUMNS if col not in ('Date', 'Time')
+    ]
+
+@pytest.mark.parametrize('rules', [RETAIL_RULES, STRICT_RETAIL_RULES])
+def test_room_for_more_rules(rules):
+    room = 63 - len(CHECKED) - 2 - len(rules)
+    assert room >= 25
+    error_bits = build_error_codes(COLUMNS, rules + extra_rules(room), RETAIL_SCHEMA)
+    assert max(error_bits.values()) == 1 << 62
+    with pytest.raises(ValueError):
+        build_error_codes(COLUMNS, rules + extra_rules(room + 1), RETAIL_SCHEMA)
+
+def test_steps_only_set_allocated_bits():
+    raw = pd.DataFrame({
+        'Date': ['2023-03-15', 'not a date', '2023-03-16'],
+        'Time': ['10:00:00', '10:00:00', '25:00:00'],
+        'Name': ['  Jane ', 'Bob', None],
+        'Gender': pd.Series(['Female', 'Male', 'Other'], dtype='category'),
+        'Amount': [10.0, -1.0, 5.0],
+    })
+    etl = RetailETL(None, rules=[])
+    etl.verbose = False
+    etl.error_bits = build_error_codes(raw.columns, [], RETAIL_SCHEMA)
+    _, error_codes = etl._clean_and_validate(raw)
+    bits = etl.error_bits
+    assert 'Invalid Name' not in bits and 'Invalid Gender' not in bits
+    assert error_codes.tolist() == [
+        0,
+        bits['Invalid Date'] | bits['Invalid Amount'] | bits['Missing values'],
+        bits['Invalid Time'] | bits['Missing values'],
+    ]
@@ -0,0 +1,52 @@
+import tracemalloc
+import numpy as np
+from instrumentation import MB, StageMetrics
+
+def allocate(mb):
+    return np.ones(int(mb * MB), dtype=np.uint8)
+
+def by_stage(metrics):
+    return {record['stage']: record for record in metrics.records}
+
+def test_untraced_stages_still_have_alloc_fields():
+    metrics = StageMetrics()
+    with metrics.stage('step'):
+        allocate(1)
+    record = metrics.records[0]
+    assert record['alloc_delta_mb'] is None and record['alloc_peak_mb'] is None
+    assert 'process_peak_rss_mb' in record and 'peak_rss_mb' not in record
+
+def test_peaks_are_per_stage():
+    metrics = StageMetrics(trace_memory=True)
+    with metrics.stage('outer'):
+        allocate(20)
+        with metrics.stage('inner'):
+            kept = allocate(2)
+        with metrics.stage('after'):
+            pass
+    records = by_stage(metrics)
+    assert 1.9 <= records['inner']['alloc_peak_mb'] <= 2.1
+    assert 1.9 <= records['inner']['alloc_delta_mb'] <= 2.1
+    assert records['after']['alloc_peak_mb'] < 0.1
+    assert 19.9 <= records['outer']['alloc_peak_mb'] <= 22.1
+    assert not tracemalloc.is_tracing()
+    del kept
+
+def test_inner_peak_reaches_the_outer_stage():
+    metrics = StageMetrics(trace_memory=True)
+    with metrics.stage('outer'):
+        with metrics.stage('inner'):
+            allocate(20)
+        with metrics.stage('next'):
+            allocate(1)
+    records = by_stage(metrics)
+    assert 19.9 <= records['inner']['alloc_peak_mb'] <= 20.1
+    assert records['next']['alloc_peak_mb'] < 1.1
+    assert records['outer']['alloc_peak_mb'] >= 19.9
+
+def test_profiled_stage_is_traced_on_its_own(tmp_path):
+    metrics = StageMetrics(profile={'step': 'tracemalloc'}, profile_dir=str(tmp_path))
+    with metrics.stage('step'):
+        allocate(5)
+    assert 4.9 <= metrics.records[0]['alloc_peak_mb'] <= 5.1
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,42 @@
+import io
+from contextlib import redirect_stdout
+import pandas as pd
+import pytest
+from ETL import OUTPUT_FORMATS, RetailETL, read_partitioned
+from quarantine import QuarantineStore, reprocess
+from synthetic_data import generate_csv
+
+def quarantined_run(tmp_path, output_format):
+    input_path = tmp_path / 'retail.csv'
+    generate_csv(input_path, 200, bad_rates={'zero_amount': 0.1})
+    store_path = str(tmp_path / 'quarantine.db')
+    good_path = str(tmp_path / ('good.csv' if output_format == 'csv' else 'good'))
+    etl = RetailETL(str(input_path), output_format=output_format, quarantine_path=store_path)
+    with redirect_stdout(io.StringIO()):
+        etl.run(good_path, str(tmp_path / 'bad.csv'))
+    return store_path, good_path, len(etl.good_df), len(etl.bad_df)
+
+def good_rows(good_path, output_format):
+    if output_format == 'csv':
+        return len(pd.read_csv(good_path))
+    return len(read_partitioned(good_path, output_format=output_format))
+
+@pytest.mark.parametrize('output_format', list(OUTPUT_FORMATS))
+def test_reprocess_writes_the_recorded_format(tmp_path, output_format):
+    store_path, good_path, good, bad = quarantined_run(tmp_path, output_format)
+    store = QuarantineStore(store_path)
+    assert store.output_format() == output_format
+    store.close()
+    result = reprocess(store_path, good_path, rules=[])
+    assert result['pending'] == bad and result['promoted'] > 0
+    assert good_rows(good_path, output_format) == good + result['promoted']
+
+def test_stores_without_a_format_need_one(tmp_path):
+    store_path, good_path, good, _ = quarantined_run(tmp_path, 'ipc')
+    store = QuarantineStore(store_path)
+    store.conn.execute("UPDATE quarantine SET output_format = NULL")
+    store.close()
+    with pytest.raises(ValueError):
+        reprocess(store_path, good_path, rules=[])
+    result = reprocess(store_path, good_path, rules=[], output_format='ipc')
+    assert good_rows(good_path, 'ipc') == good + result['promoted']
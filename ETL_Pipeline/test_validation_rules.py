@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+import pytest
+from validation_rules import CHECKS, RETAIL_RULES, STRICT_RETAIL_RULES, ColumnCache, RuleSet
+
+# A row every rule accepts, and for each rule a change that breaks it.
+VALID = {
+    'Age': 30, 'Ratings': 4, 'Total_Purchases': 3, 'Amount': 100.0, 'Total_Amount': 300.0,
+    'Gender': 'Male', 'Income': 'Low', 'Customer_Segment': 'New', 'Country': 'USA', 'Month': 'January',
+    'Product_Category': 'Books', 'Feedback': 'Good', 'Shipping_Method': 'Express', 'Payment_Method': 'Cash',
+    'Order_Status': 'Pending', 'Email': 'jane@example.com',
+}
+INVALID = {
+    'Zero Total_Purchases': {'Total_Purchases': 0, 'Total_Amount': 0.0},
+    'Zero Amount': {'Amount': 0.0, 'Total_Amount': 0.0},
+    'Zero Total_Amount': {'Total_Amount': 0.0, 'Amount': 0.0},
+    'Fractional Total_Purchases': {'Total_Purchases': 2.5, 'Total_Amount': 250.0},
+    'Out of range Age': {'Age': 71},
+    'Out of range Ratings': {'Ratings': 0},
+    'Out of range Total_Purchases': {'Total_Purchases': 11, 'Total_Amount': 1100.0},
+    'Out of range Amount': {'Amount': 500.5, 'Total_Purchases': 1, 'Total_Amount': 500.5},
+    'Out of range Total_Amount': {'Total_Amount': 5000.5},
+    'Unknown Gender': {'Gender': 'Other'},
+    'Unknown Income': {'Income': 'Very High'},
+    'Unknown Customer_Segment': {'Customer_Segment': 'VIP'},
+    'Unknown Country': {'Country': 'France'},
+    'Unknown Month': {'Month': 'Jan'},
+    'Unknown Product_Category': {'Product_Category': 'Toys'},
+    'Unknown Feedback': {'Feedback': 'Great'},
+    'Unknown Shipping_Method': {'Shipping_Method': 'Drone'},
+    'Unknown Payment_Method': {'Payment_Method': 'Bitcoin'},
+    'Unknown Order_Status': {'Order_Status': 'Lost'},
+    'Malformed Email': {'Email': 'jane@example'},
+    'Mismatched Total_Amount': {'Total_Amount': 300.02},
+}
+# Rules that cannot be broken alone: a zero factor makes Total_Amount zero,
+# and with Amount <= 500 and Total_Purchases <= 10 a Total_Amount over 5000
+# is never their product.
+ALSO_REJECTED = {
+    'Zero Total_Purchases': {'Zero Total_Amount'},
+    'Zero Amount': {'Zero Total_Amount'},
+    'Zero Total_Amount': {'Zero Amount'},
+    'Out of range Total_Amount': {'Mismatched Total_Amount'},
+}
+RULES = {rule['name']: rule for rule in STRICT_RETAIL_RULES}
+
+def flagged(rule, df):
+    return CHECKS[rule['check']](rule)(ColumnCache(df)).tolist()
+
+def frame(*rows):
+    return pd.DataFrame([{**VALID, **row} for row in rows])
+
+def test_every_rule_has_a_case():
+    assert set(INVALID) == set(RULES)
+
+def test_defaults_are_the_zero_checks():
+    assert RuleSet().names == ['Zero Total_Purchases', 'Zero Amount', 'Zero Total_Amount']
+    assert STRICT_RETAIL_RULES[:len(RETAIL_RULES)] == RETAIL_RULES
+
+def test_defaults_accept_what_only_strict_rejects():
+    df = frame(*[INVALID[name] for name in INVALID if name not in RuleSet().names])
+    codes, _ = RuleSet().evaluate(df, {name: 1 for name in RuleSet().names})
+    assert not codes.any()
+
+@pytest.mark.parametrize('name', list(INVALID))
+def test_rule_mask(name):
+    rule = RULES[name]
+    missing = {rule['column']: None}
+    assert flagged(rule, frame({}, INVALID[name], missing)) == [False, True, False]
+
+@pytest.mark.parametrize('name', list(INVALID))
+def test_only_that_rule_rejects(name):
+    df = frame({}, INVALID[name])
+    rejected = {rule['name'] for rule in STRICT_RETAIL_RULES if any(flagged(rule, df))}
+    assert rejected == {name} | ALSO_REJECTED.get(name, set())
+
+def test_range_bounds_are_inclusive():
+    df = frame({'Age': 17}, {'Age': 18}, {'Age': 70}, {'Age': 71}, {'Age': np.nan})
+    assert flagged(RULES['Out of range Age'], df) == [True, False, False, True, False]
+
+def test_fractional_total_purchases():
+    df = frame({'Total_Purchases': 3.0}, {'Total_Purchases': 3.5}, {'Total_Purchases': np.nan})
+    assert flagged(RULES['Fractional Total_Purchases'], df) == [False, True, False]
+
+def test_product_tolerance():
+    df = frame(
+        {'Total_Amount': 300.0}, {'Total_Amount': 300.01}, {'Total_Amount': 299.99},
+        {'Total_Amount': 300.02}, {'Total_Amount': 299.98},
+    )
+    assert flagged(RULES['Mismatched Total_Amount'], df) == [False, False, False, True, True]
+
+@pytest.mark.parametrize('column', ['Total_Amount', 'Amount', 'Total_Purchases'])
+def test_product_skips_missing_inputs(column):
+    df = frame({column: np.nan}, {column: None})
+    assert flagged(RULES['Mismatched Total_Amount'], df) == [False, False]
+
+def test_numbers_from_text():
+    df = frame({'Total_Amount': '300.0'}, {'Total_Amount': 'abc'}, {'Total_Amount': '0'})
+    assert flagged(RULES['Mismatched Total_Amount'], df) == [False, False, True]
+    assert flagged(RULES['Zero Total_Amount'], df) == [False, False, True]
+
+def test_allowed_is_case_sensitive():
+    df = frame({'Gender': 'Female'}, {'Gender': 'female'}, {'Gender': ' Male'})
+    assert flagged(RULES['Unknown Gender'], df) == [False, True, True]
+
+def test_allowed_categorical():
+    df = frame({'Country': 'UK'}, {'Country': 'France'}, {'Country': None}, {'Country': 'UK'})
+    df['Country'] = df['Country'].astype('category')
+    assert flagged(RULES['Unknown Country'], df) == [False, True, False, False]
+
+def test_regex_must_match_whole_value():
+    df = frame({'Email': 'a@b.co'}, {'Email': 'a@b.co '}, {'Email': 'a b@c.de'}, {'Email': '@b.co'})
+    assert flagged(RULES['Malformed Email'], df) == [False, True, True, True]
+
+def test_evaluate_sets_each_bit():
+    rules = RuleSet(STRICT_RETAIL_RULES)
+    bits = {name: 1 << bit for bit, name in enumerate(rules.names)}
+    df = frame({}, {'Age': 90, 'Gender': 'Other'}, INVALID['Malformed Email'])
+    codes, report = rules.evaluate(df, bits)
+    assert codes.tolist() == [0, bits['Out of range Age'] | bits['Unknown Gender'], bits['Malformed Email']]
+    assert report.set_index('rule')['rejected'].sum() == 3
+
+def test_rules_need_their_columns():
+    rules = RuleSet(STRICT_RETAIL_RULES)
+    applicable = [rule['name'] for rule, _ in rules.applicable(['Amount', 'Total_Amount'])]
+    assert applicable == ['Zero Amount', 'Zero Total_Amount', 'Out of range Amount', 'Out of range Total_Amount']
+
+def test_invalid_rule_sets():
+    with pytest.raises(ValueError):
+        RuleSet([RULES['Zero Amount'], RULES['Zero Amount']])
+    with pytest.raises(ValueError):
+        RuleSet([{'name': 'Bad', 'column': 'Age', 'check': 'between'}])
+    with pytest.raises(ValueError):
+        RuleSet([{'name': 'Bad', 'column': 'Age', 'check': 'type', 'type': 'float'}])
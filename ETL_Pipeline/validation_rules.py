@@ -0,0 +1,197 @@
+import hashlib
+import json
+import re
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+# Bump when steps 1-6 in ETL.py change what they accept or the error bits
+# they set, so quarantined rows record that they were checked by different
+# code.
+CLEANING_VERSION = 2
+
+MONTHS = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August', 'September', 'October',
+          'November', 'December']
+
+# Business rules for the cleaned retail data, checked in step 7. Each rule
+# names the error it sets in Error_Code, the column it checks and one of the
+# CHECKS below. Rules only flag values that are present; missing values are
+# step 5's job, and negative numbers are already invalid after step 4. The
+# default rules are the zero checks the pipeline has always made.
+RETAIL_RULES = [
+    {'name': 'Zero Total_Purchases', 'column': 'Total_Purchases', 'check': 'nonzero'},
+    {'name': 'Zero Amount', 'column': 'Amount', 'check': 'nonzero'},
+    {'name': 'Zero Total_Amount', 'column': 'Total_Amount', 'check': 'nonzero'},
+]
+
+# Opt-in rules that also reject what the EDA report never saw: ranges,
+# allowed values, malformed emails and totals that don't add up. The zero
+# checks come first so they keep the same bits in both rule sets.
+STRICT_RETAIL_RULES = RETAIL_RULES + [
+    {'name': 'Fractional Total_Purchases', 'column': 'Total_Purchases', 'check': 'type', 'type': 'integer'},
+    {'name': 'Out of range Age', 'column': 'Age', 'check': 'range', 'min': 18, 'max': 70},
+    {'name': 'Out of range Ratings', 'column': 'Ratings', 'check': 'range', 'min': 1, 'max': 5},
+    {'name': 'Out of range Total_Purchases', 'column': 'Total_Purchases', 'check': 'range', 'max': 10},
+    {'name': 'Out of range Amount', 'column': 'Amount', 'check': 'range', 'max': 500},
+    {'name': 'Out of range Total_Amount', 'column': 'Total_Amount', 'check': 'range', 'max': 5000},
+    {'name': 'Unknown Gender', 'column': 'Gender', 'check': 'allowed', 'values': ['Male', 'Female']},
+    {'name': 'Unknown Income', 'column': 'Income', 'check': 'allowed', 'values': ['Low', 'Medium', 'High']},
+    {'name': 'Unknown Customer_Segment', 'column': 'Customer_Segment', 'check': 'allowed',
+     'values': ['New', 'Regular', 'Premium']},
+    {'name': 'Unknown Country', 'column': 'Country', 'check': 'allowed',
+     'values': ['USA', 'UK', 'Germany', 'Australia', 'Canada']},
+    {'name': 'Unknown Month', 'column': 'Month', 'check': 'allowed', 'values': MONTHS},
+    {'name': 'Unknown Product_Category', 'column': 'Product_Category', 'check': 'allowed',
+     'values': ['Electronics', 'Grocery', 'Clothing', 'Books', 'Home Decor']},
+    {'name': 'Unknown Feedback', 'column': 'Feedback', 'check': 'allowed',
+     'values': ['Excellent', 'Good', 'Average', 'Bad']},
+    {'name': 'Unknown Shipping_Method', 'column': 'Shipping_Method', 'check': 'allowed',
+     'values': ['Same-Day', 'Express', 'Standard']},
+    {'name': 'Unknown Payment_Method', 'column': 'Payment_Method', 'check': 'allowed',
+     'values': ['Credit Card', 'Debit Card', 'Cash', 'PayPal']},
+    {'name': 'Unknown Order_Status', 'column': 'Order_Status', 'check': 'allowed',
+     'values': ['Delivered', 'Shipped', 'Processing', 'Pending']},
+    {'name': 'Malformed Email', 'column': 'Email', 'check': 'regex', 'pattern': r'[^@\s]+@[^@\s]+\.[^@\s]+'},
+    # Total_Amount is Amount x Total_Purchases to within a cent in the raw data
+    {'name': 'Mismatched Total_Amount', 'column': 'Total_Amount', 'check': 'product',
+     'factors': ['Amount', 'Total_Purchases'], 'tolerance': 0.01},
+]
+
+# Each rule is compiled once into a function from a ColumnCache to a boolean
+# mask of the rows it rejects. The cache converts a column to a float array,
+# or factorizes it into codes and distinct values, the first time any rule
+# asks for it, so rules over the same column share that work. Text checks
+# run on the distinct values only and are mapped back through the codes.
+class ColumnCache:
+    def __init__(self, df):
+        self.df = df
+        self._numbers = {}
+        self._factors = {}
+
+    def numbers(self, col):
+        if col not in self._numbers:
+            self._numbers[col] = pd.to_numeric(self.df[col], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+        return self._numbers[col]
+
+    def factors(self, col):
+        if col not in self._factors:
+            values = self.df[col]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                codes, uniques = values.cat.codes.to_numpy(), values.cat.categories.to_numpy(dtype=object)
+            else:
+                codes, uniques = pd.factorize(values)
+            self._factors[col] = (codes, np.array([str(v) for v in uniques], dtype=object))
+        return self._factors[col]
+
+    def unique_mask(self, col, fn):
+        codes, uniques = self.factors(col)
+        flagged = np.append(fn(uniques).astype(bool), False)
+        # missing values have code -1, which picks the trailing False
+        return flagged[codes]
+
+def _nonzero(rule):
+    col = rule['column']
+    return lambda columns: columns.numbers(col) == 0
+
+def _type(rule):
+    col, kind = rule['column'], rule['type']
+    if kind != 'integer':
+        raise ValueError(f"Rule {rule['name']!r}: type must be 'integer'")
+    return lambda columns: np.mod(columns.numbers(col), 1) > 0
+
+def _range(rule):
+    col, low, high = rule['column'], rule.get('min', -np.inf), rule.get('max', np.inf)
+    def mask(columns):
+        values = columns.numbers(col)
+        return (values < low) | (values > high)
+    return mask
+
+def _allowed(rule):
+    col, allowed = rule['column'], np.array([str(v) for v in rule['values']], dtype=object)
+    return lambda columns: columns.unique_mask(col, lambda uniques: ~np.isin(uniques, allowed))
+
+def _regex(rule):
+    col, pattern = rule['column'], re.compile(rule['pattern'])
+    return lambda columns: columns.unique_mask(
+        col, lambda uniques: np.array([pattern.fullmatch(v) is None for v in uniques], dtype=bool)
+    )
+
+def _product(rule):
+    col, factors, tolerance = rule['column'], rule['factors'], rule.get('tolerance', 0.01)
+    def mask(columns):
+        expected = np.prod([columns.numbers(f) for f in factors], axis=0)
+        return np.abs(columns.numbers(col) - expected) > tolerance
+    return mask
+
+CHECKS = {
+    'nonzero': _nonzero,
+    'type': _type,
+    'range': _range,
+    'allowed': _allowed,
+    'regex': _regex,
+    'product': _product,
+}
+
+def rule_columns(rule):
+    return [rule['column']] + list(rule.get('factors', []))
+
+class RuleSet:
+    def __init__(self, rules=RETAIL_RULES):
+        names = [rule['name'] for rule in rules]
+        if len(set(names)) != len(names):
+            raise ValueError("Rule names must be unique")
+        for rule in rules:
+            if rule.get('check') not in CHECKS:
+                raise ValueError(f"Rule {rule['name']!r}: check must be one of {list(CHECKS)}")
+        self.rules = list(rules)
+        self._masks = [CHECKS[rule['check']](rule) for rule in self.rules]
+
+    def __len__(self):
+        return len(self.rules)
+
+    @property
+    def names(self):
+        return [rule['name'] for rule in self.rules]
+
+    # Identifies the rule set in quarantined rows: a hash of the rules and
+    # the version of the cleaning steps that run before them.
+    @property
+    def version(self):
+        spec = json.dumps([CLEANING_VERSION, self.rules], sort_keys=True, default=str)
+        return hashlib.sha1(spec.encode()).hexdigest()[:12]
+
+    # Rules whose columns are all in the frame, with their compiled masks.
+    def applicable(self, columns):
+        columns = set(columns)
+        return [(rule, mask) for rule, mask in zip(self.rules, self._masks) if set(rule_columns(rule)) <= columns]
+
+    def evaluate(self, df, error_bits):
+        columns = ColumnCache(df)
+        error_codes = np.zeros(len(df), dtype='int64')
+        report = []
+        for rule, mask in self.applicable(df.columns):
+            start = time.perf_counter()
+            rejected = mask(columns)
+            error_codes[rejected] |= error_bits[rule['name']]
+            report.append({'rule': rule['name'], 'check': rule['check'], 'columns': ','.join(rule_columns(rule)),
+                           'rejected': int(rejected.sum()), 'secs': time.perf_counter() - start})
+        return pd.Series(error_codes, index=df.index), pd.DataFrame(report)
+
+if __name__ == '__main__':
+    from schema import read_retail_csv
+
+    args = [arg for arg in sys.argv[1:] if arg != '--strict']
+    if not args:
+        print("Usage: python validation_rules.py <good_or_raw_data.csv> [--strict]")
+        sys.exit(1)
+    rules = RuleSet(STRICT_RETAIL_RULES if '--strict' in sys.argv else RETAIL_RULES)
+    df = read_retail_csv(args[0])
+    _, report = rules.evaluate(df, {name: 1 << bit for bit, name in enumerate(rules.names)})
+
+    print("="*80)
+    print(f"VALIDATION RULES - {len(df):,} rows")
+    print("="*80)
+    for row in report.itertuples():
+        print(f"  {row.rule:<32} {row.check:<8} {row.rejected:>8,} rejected {row.secs * 1000:>8.2f} ms")
+    print(f"\n{len(report)} rules in {report['secs'].sum() * 1000:.1f} ms")